@@ -0,0 +1,8 @@
+"""Measure the performance of the lexedata command line tools.
+
+`lexedata.benchmark.synthetic` generates wordlists (and the Excel workbooks
+the importers read) of any size from a random seed, and
+`lexedata.benchmark.run` runs the command line tools on them, recording wall
+time, peak memory and throughput. Neither needs network access.
+
+"""
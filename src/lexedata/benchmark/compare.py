@@ -0,0 +1,299 @@
+"""Compare two benchmark runs from the history and flag regressions.
+
+For every benchmark at every scale that both runs have, the median wall time
+and the median peak memory of the candidate run are compared to those of the
+baseline run. A change counts as a regression if the candidate is slower (or
+needs more memory) by more than the tolerance, and if a one-sided
+Mann-Whitney U test on the repetitions finds the difference significant. With
+too few repetitions for the test to ever reach the significance level, the
+tolerance alone decides. A benchmark that succeeded in the baseline and fails
+in the candidate is always a regression.
+
+The command exits with an error status if it finds any regression, so it can
+be used as a gate before upgrading lexedata.
+
+"""
+
+import math
+import statistics
+import typing as t
+from pathlib import Path
+
+from lexedata import cli
+from lexedata.benchmark.history import Run, read_runs, select_run
+
+
+class Change(t.NamedTuple):
+    """The change of one measurement of a benchmark between two runs."""
+
+    benchmark: str
+    scale: str
+    #: "seconds", "peak_rss" or "status"
+    metric: str
+    baseline: float
+    candidate: float
+    #: The p-value of the test, or None if there were too few repetitions
+    p: t.Optional[float]
+    regression: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.candidate / self.baseline if self.baseline else math.inf
+
+
+def _u_distribution(n: int, m: int) -> t.List[int]:
+    # Number of orderings of n and m values with each value of U, by the
+    # recursion on whether the largest value is from the first or second sample
+    counts = [[[1] for _ in range(m + 1)] for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            distribution = [0] * (i * j + 1)
+            for u, c in enumerate(counts[i - 1][j]):
+                distribution[u + j] += c
+            for u, c in enumerate(counts[i][j - 1]):
+                distribution[u] += c
+            counts[i][j] = distribution
+    return counts[n][m]
+
+
+def mann_whitney_p(
+    larger: t.Sequence[float], smaller: t.Sequence[float]
+) -> t.Optional[float]:
+    """Test whether the values of `larger` tend to be larger than those of `smaller`.
+
+    Return the exact one-sided p-value of the Mann-Whitney U test. Ties count
+    against the hypothesis, which makes the test conservative. Return None if
+    a sample is empty.
+
+    >>> mann_whitney_p([5, 6, 7], [1, 2, 3])
+    0.05
+    >>> mann_whitney_p([1, 2, 3], [5, 6, 7])
+    1.0
+
+    """
+    if not larger or not smaller:
+        return None
+    u = sum(x > y for x in larger for y in smaller)
+    distribution = _u_distribution(len(larger), len(smaller))
+    return sum(distribution[u:]) / sum(distribution)
+
+
+def smallest_p(n: int, m: int) -> float:
+    """The smallest p-value the test can give for samples of sizes n and m.
+
+    >>> smallest_p(3, 3)
+    0.05
+
+    """
+    return 1 / math.comb(n + m, n)
+
+
+def compare_measurements(
+    baseline: t.Sequence[float],
+    candidate: t.Sequence[float],
+    tolerance: float = 0.1,
+    alpha: float = 0.05,
+) -> t.Tuple[float, float, t.Optional[float], bool]:
+    """Compare the repetitions of a measurement, where larger values are worse.
+
+    Return the two medians, the p-value (None if there are too few repetitions
+    to reach `alpha`) and whether the candidate is a regression.
+    Significant means p ≤ `alpha`.
+
+    >>> compare_measurements([1.0], [1.5])
+    (1.0, 1.5, None, True)
+    >>> compare_measurements([1.0, 1.1, 1.5], [1.3, 1.4, 1.6])
+    (1.1, 1.4, 0.2, False)
+
+    """
+    old = statistics.median(baseline)
+    new = statistics.median(candidate)
+    p: t.Optional[float] = None
+    if smallest_p(len(candidate), len(baseline)) <= alpha:
+        p = mann_whitney_p(candidate, baseline)
+    regression = new > old * (1 + tolerance) and (p is None or p <= alpha)
+    return old, new, p, regression
+
+
+def compare_runs(
+    baseline: Run,
+    candidate: Run,
+    time_tolerance: float = 0.1,
+    memory_tolerance: float = 0.1,
+    alpha: float = 0.05,
+) -> t.List[Change]:
+    """Compare the benchmarks that both runs have, at the scales both have."""
+    old_results = {(r.benchmark, r.scale): r for r in baseline.results}
+    changes = []
+    for result in candidate.results:
+        old = old_results.get((result.benchmark, result.scale))
+        if old is None:
+            continue
+        if old.status == 0 and result.status != 0:
+            changes.append(
+                Change(
+                    result.benchmark,
+                    result.scale,
+                    "status",
+                    old.status,
+                    result.status,
+                    None,
+                    True,
+                )
+            )
+            continue
+        if old.status != 0 or result.status != 0:
+            continue
+        for metric, tolerance in [
+            ("seconds", time_tolerance),
+            ("peak_rss", memory_tolerance),
+        ]:
+            changes.append(
+                Change(
+                    result.benchmark,
+                    result.scale,
+                    metric,
+                    *compare_measurements(
+                        getattr(old, metric),
+                        getattr(result, metric),
+                        tolerance=tolerance,
+                        alpha=alpha,
+                    ),
+                )
+            )
+    return changes
+
+
+def default_baseline(runs: t.Sequence[Run], candidate: int) -> t.Optional[Run]:
+    """Find the latest run on the same machine before the candidate at that position."""
+    for run in reversed(runs[:candidate]):
+        if run.fingerprint == runs[candidate].fingerprint:
+            return run
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}.{Path(__file__).stem}",
+        description=__doc__.split("\n\n")[0],
+        epilog=__doc__.split("\n\n", 1)[1],
+    )
+    parser.add_argument(
+        "history",
+        type=Path,
+        help="The history file that lexedata.benchmark.run --history wrote to",
+    )
+    parser.add_argument(
+        "--candidate",
+        default="-1",
+        help="The run to check: a position in the history, or a git revision (prefix) (default: the latest run)",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="The run to compare to, in the same form (default: the latest earlier run on the same machine)",
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.1,
+        help="Relative increase of the wall time that is tolerated (default: 0.1)",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.1,
+        help="Relative increase of the peak memory that is tolerated (default: 0.1)",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level of the test (default: 0.05)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        default=False,
+        help="List all measurements, not only the regressions",
+    )
+    cli.add_log_controls(parser)
+    args = parser.parse_args()
+    logger = cli.setup_logging(args)
+
+    if not args.history.exists():
+        cli.Exit.FILE_NOT_FOUND(f"History file {args.history} not found.")
+    runs = read_runs(args.history)
+    try:
+        position = select_run(runs, args.candidate)
+        candidate = runs[position]
+        if args.baseline is None:
+            baseline = default_baseline(runs, position)
+            if baseline is None:
+                cli.Exit.INVALID_INPUT(
+                    "There is no earlier run on this machine to compare to. Give --baseline."
+                )
+        else:
+            baseline = runs[select_run(runs, args.baseline)]
+    except KeyError as e:
+        cli.Exit.CLI_ARGUMENT_ERROR(e.args[0])
+    if baseline.fingerprint != candidate.fingerprint:
+        logger.warning(
+            "The runs are from different machines (%s and %s), so their times may not be comparable.",
+            baseline.machine,
+            candidate.machine,
+        )
+    logger.info(
+        "Comparing %s (revision %s, Python %s) to the baseline %s (revision %s, Python %s).",
+        candidate.timestamp,
+        candidate.revision,
+        candidate.python,
+        baseline.timestamp,
+        baseline.revision,
+        baseline.python,
+    )
+
+    changes = compare_runs(
+        baseline,
+        candidate,
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+        alpha=args.alpha,
+    )
+    regressions = [change for change in changes if change.regression]
+    print(
+        tabulate(
+            [
+                (
+                    change.benchmark,
+                    change.scale,
+                    change.metric,
+                    change.baseline,
+                    change.candidate,
+                    change.ratio,
+                    change.p,
+                    "REGRESSION" if change.regression else "",
+                )
+                for change in (changes if args.all else regressions)
+            ],
+            headers=[
+                "Benchmark",
+                "Scale",
+                "Measurement",
+                "Baseline",
+                "Candidate",
+                "Ratio",
+                "p",
+                "",
+            ],
+            floatfmt=["", "", "", ".6g", ".6g", ".3f", ".3g"],
+        )
+    )
+    if regressions:
+        cli.Exit.INVALID_INPUT(
+            f"{len(regressions):d} of {len(changes):d} measurements regressed."
+        )
@@ -0,0 +1,162 @@
+"""Keep a history of benchmark runs in a plain file.
+
+The history is a JSON Lines file with one benchmark run per line: the results
+of all benchmarks of the run, together with the git revision of lexedata, the
+Python version and a fingerprint of the machine, so that runs can be compared
+across versions of lexedata on the same machine.
+
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import typing as t
+from pathlib import Path
+
+import lexedata
+from lexedata.benchmark.run import Result
+
+
+class Run(t.NamedTuple):
+    """A benchmark run, and where it ran."""
+
+    #: The git revision of lexedata, with a "-dirty" suffix for uncommitted changes
+    revision: t.Optional[str]
+    #: The version of lexedata
+    version: str
+    #: The Python version
+    python: str
+    #: A short hash of the machine description
+    fingerprint: str
+    machine: t.Dict[str, str]
+    #: When the run finished, in UTC
+    timestamp: str
+    seed: int
+    results: t.List[Result]
+
+
+def git_revision(
+    directory: Path = Path(lexedata.__file__).parent,
+) -> t.Optional[str]:
+    """Find the git revision of the working tree that `directory` is in.
+
+    Return None if `directory` is not in a git working tree, or git is not
+    available.
+
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--abbrev=40"],
+            cwd=directory,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _proc_value(path: str, key: str) -> str:
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                if name.strip() == key:
+                    return value.strip()
+    except OSError:
+        pass
+    return ""
+
+
+def machine() -> t.Dict[str, str]:
+    """Describe the machine: operating system, processor and memory."""
+    return {
+        "system": platform.system(),
+        "release": platform.release(),
+        "architecture": platform.machine(),
+        "processor": _proc_value("/proc/cpuinfo", "model name") or platform.processor(),
+        "cpus": str(os.cpu_count()),
+        "memory": _proc_value("/proc/meminfo", "MemTotal"),
+    }
+
+
+def fingerprint(description: t.Dict[str, str]) -> str:
+    """Hash a machine description into a short fingerprint.
+
+    >>> fingerprint({"cpus": "4", "system": "Linux"})
+    '65100fe52be8'
+
+    """
+    return hashlib.sha1(
+        json.dumps(description, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+
+
+def new_run(results: t.Sequence[Result], seed: int = 0) -> Run:
+    """Describe a benchmark run that just finished on this machine."""
+    description = machine()
+    return Run(
+        revision=git_revision(),
+        version=lexedata.__version__,
+        python=platform.python_version(),
+        fingerprint=fingerprint(description),
+        machine=description,
+        timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+        seed=seed,
+        results=list(results),
+    )
+
+
+def append_run(path: Path, run: Run) -> None:
+    """Add a run to the end of the history file, creating it if necessary."""
+    record = run._asdict()
+    record["results"] = [result._asdict() for result in run.results]
+    with path.open("a", encoding="utf-8") as history:
+        history.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_runs(path: Path) -> t.List[Run]:
+    """Read all runs from a history file, oldest first."""
+    runs = []
+    with path.open(encoding="utf-8") as history:
+        for line in history:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record["results"] = [Result(**result) for result in record["results"]]
+            runs.append(Run(**record))
+    return runs
+
+
+def select_run(runs: t.Sequence[Run], key: str) -> int:
+    """Find the position of a run, given by its position or a revision prefix.
+
+    Positions count from 0, and negative positions count from the end, as for
+    Python lists. A revision prefix selects the latest run with a matching
+    revision. Return the position of the run, counted from 0.
+
+    >>> runs = [Run("abc", "", "", "", {}, "", 0, []), Run("abd", "", "", "", {}, "", 0, [])]
+    >>> select_run(runs, "-2")
+    0
+    >>> select_run(runs, "ab")
+    1
+
+    """
+    try:
+        position = int(key)
+    except ValueError:
+        pass
+    else:
+        if not -len(runs) <= position < len(runs):
+            raise KeyError(f"There is no run number {key} in the history.")
+        return position % len(runs)
+    for position in reversed(range(len(runs))):
+        revision = runs[position].revision
+        if revision and revision.startswith(key):
+            return position
+    raise KeyError(f"There is no run of revision {key} in the history.")
@@ -0,0 +1,515 @@
+"""Run the lexedata command line tools on synthetic wordlists and measure them.
+
+Every benchmark runs one command line tool, as a separate Python process, on a
+fresh copy of a synthetic wordlist of each scale, and records its wall time,
+its peak resident memory and the number of rows per second it processed. Some
+benchmarks first run other tools, outside the measurement, to create their
+input files. Tools that need the CLTS or Concepticon catalogs are skipped
+unless --with-catalogs is given, so that the benchmarks run offline.
+
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from lexedata import cli
+from lexedata.benchmark.synthetic import (
+    SCALES,
+    Shape,
+    synthetic_rows,
+    synthetic_wordlist,
+    synthetic_workbooks,
+)
+
+Command = t.Tuple[str, t.Sequence[str]]
+
+
+class Benchmark(t.NamedTuple):
+    """A command line tool to run, and how to count the rows it processes.
+
+    The arguments may refer to the synthetic workbooks as ``{matrix}``,
+    ``{interleaved}`` and ``{long}``. All commands run in the directory of a
+    fresh copy of the wordlist.
+
+    """
+
+    #: The module of the command line tool
+    module: str
+    #: The arguments to pass to the tool
+    arguments: t.Sequence[str] = ()
+    #: The table whose rows the tool processes
+    rows: str = "FormTable"
+    #: Commands that prepare the input of the tool, not measured
+    setup: t.Sequence[Command] = ()
+    #: The catalog the tool needs, if any
+    needs: t.Optional[str] = None
+    #: A name to distinguish several benchmarks of the same tool
+    variant: t.Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        name = self.module.replace("lexedata.", "", 1)
+        if self.variant:
+            name += f"[{self.variant}]"
+        return name
+
+
+BENCHMARKS: t.List[Benchmark] = [
+    # Importers
+    Benchmark(
+        "lexedata.importer.excel_matrix",
+        ["{matrix}"],
+    ),
+    Benchmark(
+        "lexedata.importer.excel_interleaved",
+        ["{interleaved}", "--directory", "."],
+    ),
+    Benchmark(
+        "lexedata.importer.excel_long_format",
+        ["{long}", "--ignore-missing-columns", "--ignore-superfluous-columns"],
+    ),
+    Benchmark(
+        "lexedata.importer.cognates",
+        ["cognates.xlsx"],
+        rows="CognateTable",
+        setup=[("lexedata.exporter.cognates", ["cognates.xlsx"])],
+    ),
+    Benchmark(
+        "lexedata.importer.edictor",
+        ["--input-file", "cognate.tsv"],
+        setup=[("lexedata.exporter.edictor", ["--output-file", "cognate.tsv"])],
+    ),
+    # Exporters
+    Benchmark(
+        "lexedata.exporter.cognates",
+        ["cognates.xlsx"],
+        rows="CognateTable",
+    ),
+    Benchmark(
+        "lexedata.exporter.cognates",
+        ["cognates.xlsx", "--add-singletons", "--by-segment"],
+        rows="CognateTable",
+        variant="singletons",
+    ),
+    Benchmark(
+        "lexedata.exporter.edictor",
+        ["--output-file", "cognate.tsv"],
+    ),
+    Benchmark(
+        "lexedata.exporter.matrix",
+        ["matrix.xlsx"],
+    ),
+    Benchmark(
+        "lexedata.exporter.phylogenetics",
+        ["--format", "nexus", "--output-file", "data.nex"],
+        rows="CognateTable",
+    ),
+    # Edit scripts
+    Benchmark("lexedata.edit.add_central_concepts", rows="CognatesetTable"),
+    Benchmark(
+        "lexedata.edit.add_cognate_table",
+        ["--unique-id", "dataset"],
+        rows="CognateTable",
+    ),
+    Benchmark(
+        "lexedata.edit.add_concepticon", rows="ParameterTable", needs="concepticon"
+    ),
+    Benchmark("lexedata.edit.add_metadata", ["--metadata", "guessed-metadata.json"]),
+    Benchmark("lexedata.edit.add_segments", ["--overwrite"], needs="clts"),
+    Benchmark("lexedata.edit.add_singleton_cognatesets", ["--by-segment"]),
+    Benchmark("lexedata.edit.add_status_column"),
+    Benchmark("lexedata.edit.add_table", ["CodeTable"], rows="FormTable"),
+    Benchmark("lexedata.edit.align", rows="CognateTable"),
+    Benchmark(
+        "lexedata.edit.change_id_column",
+        ["LanguageTable", "ID", "Name"],
+        rows="LanguageTable",
+    ),
+    Benchmark("lexedata.edit.clean_forms"),
+    Benchmark("lexedata.edit.detect_cognates", needs="clts"),
+    Benchmark(
+        "lexedata.edit.merge_cognate_sets",
+        ["overlaps.txt"],
+        rows="CognateTable",
+        setup=[
+            (
+                "lexedata.report.nonconcatenative_morphemes",
+                ["--output-file", "overlaps.txt"],
+            )
+        ],
+    ),
+    Benchmark(
+        "lexedata.edit.merge_homophones",
+        ["homophones.txt"],
+        setup=[("lexedata.report.homophones", ["--output-file", "homophones.txt"])],
+    ),
+    Benchmark("lexedata.edit.normalize_unicode"),
+    Benchmark(
+        "lexedata.edit.replace_id",
+        ["LanguageTable", "l0", "language0"],
+    ),
+    Benchmark(
+        "lexedata.edit.replace_id_column",
+        ["LanguageTable", "Name"],
+    ),
+    Benchmark("lexedata.edit.simplify_ids"),
+    # Reports
+    Benchmark("lexedata.report.coverage"),
+    Benchmark("lexedata.report.extended_cldf_validate"),
+    Benchmark("lexedata.report.filter", ["Form", "a", "FormTable"]),
+    Benchmark("lexedata.report.homophones", ["--output-file", "homophones.txt"]),
+    Benchmark("lexedata.report.judgements", rows="CognateTable"),
+    Benchmark("lexedata.report.nonconcatenative_morphemes", rows="CognateTable"),
+    Benchmark("lexedata.report.references"),
+    Benchmark("lexedata.report.segment_inventories", needs="clts"),
+]
+
+
+class Result(t.NamedTuple):
+    """The measurements of one benchmark at one scale."""
+
+    benchmark: str
+    scale: str
+    rows: int
+    #: Wall time of each repetition, in seconds
+    seconds: t.List[float]
+    #: Peak resident memory of each repetition, in KiB
+    peak_rss: t.List[int]
+    #: Exit status of the last repetition; negative if killed by a signal
+    status: int
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / min(self.seconds)
+
+
+#: Run a module like ``python -m``, and write its peak resident memory on exit
+RUN_MODULE = """
+import atexit, runpy, sys
+
+report, module = sys.argv[1:3]
+del sys.argv[1:3]
+
+
+def peak():
+    with open("/proc/self/status") as status, open(report, "w") as out:
+        out.writelines(line for line in status if line.startswith("VmHWM:"))
+
+
+atexit.register(peak)
+runpy.run_module(module, run_name="__main__", alter_sys=True)
+"""
+
+
+def measure(
+    module: str,
+    arguments: t.Sequence[str],
+    cwd: Path,
+    timeout: t.Optional[float] = None,
+) -> t.Tuple[float, int, int]:
+    """Run a Python module as a separate process and measure it.
+
+    Return the wall time in seconds, the peak resident memory of the process
+    in KiB, and its exit status. The output of the process goes to a file
+    ``<module>.log`` in `cwd`.
+
+    The resource usage of the child that the operating system reports
+    includes the memory of this process, which the child starts as a copy of,
+    so the child reports its own peak memory when it exits. Only if it could
+    not do that (eg. because it was killed), the usage from the operating
+    system is used.
+
+    """
+    report = cwd / f"{module}.memory"
+    with (cwd / f"{module}.log").open("wb") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-c", RUN_MODULE, str(report), module, *arguments],
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        timer = threading.Timer(timeout, process.kill) if timeout else None
+        if timer:
+            timer.start()
+        try:
+            # Unlike process.wait(), os.wait4 reports the resources used by
+            # this very child. Its maximal resident set size is in KiB.
+            _, status, usage = os.wait4(process.pid, 0)
+        finally:
+            if timer:
+                timer.cancel()
+        seconds = time.perf_counter() - start
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    try:
+        peak = int(report.read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        peak = usage.ru_maxrss
+    return seconds, peak, process.returncode
+
+
+def prepare(
+    shape: Shape, directory: Path, seed: int = 0
+) -> t.Tuple[Path, t.Dict[str, int]]:
+    """Generate the synthetic wordlist and workbooks of a shape in `directory`.
+
+    Return the path of the wordlist and the number of rows of each table.
+
+    """
+    dataset = synthetic_wordlist(directory / "wordlist", shape, seed=seed)
+    synthetic_workbooks(dataset, directory, shape)
+    return directory / "wordlist", {
+        table: len(rows) for table, rows in synthetic_rows(shape, seed).items()
+    }
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    scale: str,
+    wordlist: Path,
+    rows: t.Dict[str, int],
+    repeat: int = 1,
+    timeout: t.Optional[float] = None,
+    logger: logging.Logger = cli.logger,
+) -> Result:
+    """Run one benchmark `repeat` times, each time on a fresh copy of the wordlist."""
+    workbooks = {
+        name: str(wordlist.parent / f"{name}.xlsx")
+        for name in ["matrix", "interleaved", "long"]
+    }
+    arguments = [argument.format(**workbooks) for argument in benchmark.arguments]
+    seconds: t.List[float] = []
+    peak_rss: t.List[int] = []
+    status = 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="lexedata-benchmark-") as work:
+            cwd = Path(work) / "wordlist"
+            shutil.copytree(wordlist, cwd)
+            for module, setup_arguments in benchmark.setup:
+                _, _, setup_status = measure(module, setup_arguments, cwd, timeout)
+                if setup_status != 0:
+                    logger.warning(
+                        "Preparing %s: %s exited with status %d.",
+                        benchmark.name,
+                        module,
+                        setup_status,
+                    )
+            time_taken, memory, status = measure(
+                benchmark.module, arguments, cwd, timeout
+            )
+            if status != 0:
+                logger.warning(
+                    "%s exited with status %d at scale %s: %s",
+                    benchmark.name,
+                    status,
+                    scale,
+                    (cwd / f"{benchmark.module}.log")
+                    .read_text(encoding="utf-8", errors="replace")
+                    .strip()
+                    .rpartition("\n")[2],
+                )
+        seconds.append(time_taken)
+        peak_rss.append(memory)
+    return Result(
+        benchmark.name, scale, rows[benchmark.rows], seconds, peak_rss, status
+    )
+
+
+def run_benchmarks(
+    benchmarks: t.Sequence[Benchmark],
+    scales: t.Sequence[str],
+    directory: Path,
+    seed: int = 0,
+    repeat: int = 1,
+    timeout: t.Optional[float] = None,
+    logger: logging.Logger = cli.logger,
+) -> t.Iterator[Result]:
+    """Run the benchmarks on synthetic wordlists of the scales.
+
+    The wordlists are generated in subdirectories of `directory`, named after
+    the scales.
+
+    """
+    for scale in scales:
+        logger.info("Generating the synthetic wordlist of scale %s.", scale)
+        wordlist, rows = prepare(SCALES[scale], directory / scale, seed=seed)
+        for benchmark in cli.tq(
+            benchmarks, task=f"Running benchmarks at scale {scale}", logger=logger
+        ):
+            yield run_benchmark(
+                benchmark,
+                scale,
+                wordlist,
+                rows,
+                repeat=repeat,
+                timeout=timeout,
+                logger=logger,
+            )
+
+
+def select_benchmarks(
+    names: t.Optional[t.Collection[str]] = None, catalogs: bool = False
+) -> t.List[Benchmark]:
+    """Select benchmarks by name, or all that can run without catalogs.
+
+    A name selects all variants of its tool, so "report.coverage" and
+    "exporter.cognates" both work.
+
+    >>> [b.name for b in select_benchmarks(["exporter.cognates"])]
+    ['exporter.cognates', 'exporter.cognates[singletons]']
+    >>> any(b.needs for b in select_benchmarks())
+    False
+
+    """
+    return [
+        benchmark
+        for benchmark in BENCHMARKS
+        if (
+            names is None
+            or benchmark.name in names
+            or benchmark.module.replace("lexedata.", "", 1) in names
+        )
+        and (catalogs or benchmark.needs is None)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from tabulate import tabulate
+
+    from lexedata.benchmark.history import append_run, new_run
+
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}.{Path(__file__).stem}",
+        description=__doc__.split("\n\n")[0],
+        epilog=__doc__.split("\n\n", 1)[1],
+    )
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        choices=list(SCALES),
+        default=["small"],
+        help="Scales of the synthetic wordlists (default: small)",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        default=None,
+        metavar="BENCHMARK",
+        help="Benchmarks to run, eg. report.coverage (default: all)",
+    )
+    parser.add_argument(
+        "--with-catalogs",
+        action="store_true",
+        default=False,
+        help="Also run the tools that need the CLTS or Concepticon catalogs",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Run each benchmark this many times (default: 1)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Kill a tool after this many seconds",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the synthetic wordlists (default: 0)",
+    )
+    parser.add_argument(
+        "--directory",
+        type=Path,
+        default=None,
+        help="Directory for the synthetic wordlists (default: a temporary directory)",
+    )
+    parser.add_argument(
+        "--output-file",
+        type=Path,
+        default=None,
+        help="Write the results to this JSON file",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=None,
+        help="Append the run, with the git revision, the Python version and a fingerprint of this machine, to this history file, for lexedata.benchmark.compare",
+    )
+    cli.add_log_controls(parser)
+    args = parser.parse_args()
+    logger = cli.setup_logging(args)
+
+    benchmarks = select_benchmarks(args.benchmarks, args.with_catalogs)
+    if not benchmarks:
+        cli.Exit.CLI_ARGUMENT_ERROR("No benchmarks selected.")
+
+    with tempfile.TemporaryDirectory(prefix="lexedata-synthetic-") as temporary:
+        results = list(
+            run_benchmarks(
+                benchmarks,
+                args.scales,
+                args.directory or Path(temporary),
+                seed=args.seed,
+                repeat=args.repeat,
+                timeout=args.timeout,
+                logger=logger,
+            )
+        )
+
+    print(
+        tabulate(
+            [
+                (
+                    result.benchmark,
+                    result.scale,
+                    result.rows,
+                    min(result.seconds),
+                    max(result.peak_rss) / 1024,
+                    result.rows_per_second,
+                    result.status,
+                )
+                for result in results
+            ],
+            headers=[
+                "Benchmark",
+                "Scale",
+                "Rows",
+                "Seconds",
+                "Peak MiB",
+                "Rows/s",
+                "Exit",
+            ],
+            floatfmt=".2f",
+        )
+    )
+    if args.output_file:
+        with args.output_file.open("w", encoding="utf-8") as output:
+            json.dump(
+                [
+                    dict(result._asdict(), rows_per_second=result.rows_per_second)
+                    for result in results
+                ],
+                output,
+                indent=2,
+            )
+    if args.history:
+        append_run(args.history, new_run(results, seed=args.seed))
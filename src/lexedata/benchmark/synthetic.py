@@ -0,0 +1,365 @@
+"""Generate a synthetic CLDF wordlist of a given shape.
+
+The wordlist has a LanguageTable, ParameterTable, FormTable with segments,
+CognatesetTable and CognateTable. Every concept has a few roots, which the
+languages inherit with regular sound changes, and forms may consist of several
+morphemes: a root and some affixes that are shared across concepts. Every
+morpheme is judged into its cognateset with a segment slice and an alignment.
+The same seed always gives the same wordlist.
+
+Next to the dataset, Excel workbooks in the shapes the importers read are
+written: a matrix of forms by concept and language, the same in the
+"interleaved" format with cognate codes, and a workbook with one sheet per
+language in the "long" format.
+
+"""
+
+import random
+import typing as t
+from pathlib import Path
+
+import openpyxl
+import pycldf
+
+from lexedata import cli, types
+from lexedata.util.fs import new_wordlist
+
+CONSONANTS = ["p", "t", "k", "b", "d", "g", "m", "n", "ŋ", "s", "h", "w", "j", "l"]
+VOWELS = ["a", "e", "i", "o", "u", "ə"]
+
+
+class Shape(t.NamedTuple):
+    """The shape of a synthetic wordlist."""
+
+    #: Number of languages
+    languages: int = 10
+    #: Number of concepts
+    concepts: int = 100
+    #: Average number of forms of a language for a concept it has forms for
+    synonyms: float = 1.2
+    #: Proportion of concepts for which a language has no form
+    missing: float = 0.1
+    #: Maximal number of morphemes per form
+    morphemes: int = 1
+    #: Number of cognatesets (roots) per concept
+    roots: int = 3
+    #: Number of affix cognatesets, shared across concepts
+    affixes: int = 10
+    #: Proportion of forms whose root is also judged into a second cognateset
+    overlapping: float = 0.01
+    #: Number of sheets to split the matrix workbooks into, by concept
+    sheets: int = 1
+
+
+SCALES: t.Dict[str, Shape] = {
+    "small": Shape(languages=10, concepts=100),
+    "medium": Shape(languages=50, concepts=400, morphemes=2),
+    "large": Shape(languages=200, concepts=1000, morphemes=2),
+}
+
+
+def proto_morpheme(rng: random.Random, syllables: int) -> t.List[str]:
+    """Make up a morpheme of consonant-vowel syllables.
+
+    >>> proto_morpheme(random.Random(0), 2)
+    ['l', 'o', 'j', 'o']
+
+    """
+    segments = []
+    for _ in range(syllables):
+        segments.append(rng.choice(CONSONANTS))
+        segments.append(rng.choice(VOWELS))
+    return segments
+
+
+def sound_changes(rng: random.Random, n: int = 3) -> t.Dict[str, str]:
+    """Make up some unconditioned sound changes."""
+    changes = {}
+    for _ in range(n):
+        inventory = rng.choice([CONSONANTS, VOWELS])
+        changes[rng.choice(inventory)] = rng.choice(inventory)
+    return changes
+
+
+def synthetic_rows(
+    shape: Shape, seed: int = 0
+) -> t.Dict[str, t.List[t.Dict[str, t.Any]]]:
+    """Generate the rows of all tables of a synthetic wordlist.
+
+    >>> rows = synthetic_rows(Shape(languages=2, concepts=3), seed=1)
+    >>> sorted(rows)
+    ['CognateTable', 'CognatesetTable', 'FormTable', 'LanguageTable', 'ParameterTable']
+    >>> rows == synthetic_rows(Shape(languages=2, concepts=3), seed=1)
+    True
+
+    """
+    rng = random.Random(seed)
+    languages = [
+        {"ID": f"l{i:d}", "Name": f"Language {i:d}"} for i in range(shape.languages)
+    ]
+    concepts = [
+        {
+            "ID": f"c{i:d}",
+            "Name": f"concept {i:d}",
+            "Comment": None,
+            "Concepticon_ID": f"{i + 1:d}",
+        }
+        for i in range(shape.concepts)
+    ]
+    roots = {
+        concept["ID"]: [
+            (f"{concept['ID']}_{r:d}", proto_morpheme(rng, rng.randint(1, 3)))
+            for r in range(shape.roots)
+        ]
+        for concept in concepts
+    }
+    affixes = [
+        (f"affix{a:d}", proto_morpheme(rng, 1), rng.random() < 0.5)
+        for a in range(shape.affixes)
+    ]
+
+    forms: t.List[t.Dict[str, t.Any]] = []
+    judgements: t.List[t.Dict[str, t.Any]] = []
+    used: t.Dict[types.Cognateset_ID, None] = {}
+    for language in languages:
+        changes = sound_changes(rng)
+        for concept in concepts:
+            if rng.random() < shape.missing:
+                continue
+            n = 1
+            while rng.random() < 1 - 1 / shape.synonyms:
+                n += 1
+            for i in range(n):
+                root = rng.choice(roots[concept["ID"]])
+                morphemes = [root]
+                for _ in range(rng.randint(1, shape.morphemes) - 1 if affixes else 0):
+                    affix, segments, prefix = rng.choice(affixes)
+                    if prefix:
+                        morphemes.insert(0, (affix, segments))
+                    else:
+                        morphemes.append((affix, segments))
+                form_id = f"{language['ID']}_{concept['ID']}_{i + 1:d}"
+                form_segments: t.List[str] = []
+                for m, (cognateset, proto) in enumerate(morphemes):
+                    reflex = [changes.get(s, s) for s in proto]
+                    judgement = {
+                        "ID": f"{form_id}-{m + 1:d}",
+                        "Form_ID": form_id,
+                        "Cognateset_ID": cognateset,
+                        "Segment_Slice": [
+                            f"{len(form_segments) + 1:d}:{len(form_segments) + len(reflex):d}"
+                        ],
+                        "Alignment": reflex,
+                    }
+                    judgements.append(judgement)
+                    used[cognateset] = None
+                    form_segments.extend(reflex)
+                    if (cognateset, proto) == root and rng.random() < shape.overlapping:
+                        # A doubtful judgement: The root is in another cognateset, too.
+                        other, _ = rng.choice(roots[concept["ID"]])
+                        if other != cognateset:
+                            judgements.append(
+                                dict(
+                                    judgement,
+                                    ID=f"{form_id}-{m + 1:d}-alt",
+                                    Cognateset_ID=other,
+                                )
+                            )
+                            used[other] = None
+                form = "".join(form_segments)
+                forms.append(
+                    {
+                        "ID": form_id,
+                        "Language_ID": language["ID"],
+                        "Parameter_ID": concept["ID"],
+                        "Form": form,
+                        "Value": form,
+                        "Segments": form_segments,
+                        "Comment": None,
+                    }
+                )
+    return {
+        "LanguageTable": languages,
+        "ParameterTable": concepts,
+        "FormTable": forms,
+        "CognatesetTable": [{"ID": c, "Name": c, "Comment": None} for c in used],
+        "CognateTable": judgements,
+    }
+
+
+def synthetic_wordlist(path: Path, shape: Shape, seed: int = 0) -> pycldf.Wordlist:
+    """Write a synthetic wordlist to the directory `path`.
+
+    Besides the default columns, the FormTable has a #value column, the
+    ParameterTable #comment and #concepticonReference columns and the
+    CognatesetTable a #comment column, so that the importers and exporters
+    find the columns they expect.
+
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    rows = synthetic_rows(shape, seed)
+    dataset = new_wordlist(path, **{table: [] for table in rows})
+    dataset.add_columns("FormTable", "http://cldf.clld.org/v1.0/terms.rdf#value")
+    dataset.add_columns("ParameterTable", "http://cldf.clld.org/v1.0/terms.rdf#comment")
+    dataset.add_columns(
+        "ParameterTable", "http://cldf.clld.org/v1.0/terms.rdf#concepticonReference"
+    )
+    dataset.add_columns("CognatesetTable", "http://cldf.clld.org/v1.0/terms.rdf#name")
+    dataset.add_columns(
+        "CognatesetTable", "http://cldf.clld.org/v1.0/terms.rdf#comment"
+    )
+    dataset.write(**rows)
+    for table in dataset.tables:
+        table.common_props["dc:extent"] = len(rows[dataset.get_tabletype(table)])
+    dataset.write_metadata()
+    return dataset
+
+
+def _concept_sheets(
+    workbook: openpyxl.Workbook, concepts: t.Sequence[str], sheets: int
+) -> t.Iterator[t.Tuple[openpyxl.worksheet.worksheet.Worksheet, t.Sequence[str]]]:
+    size = -(-len(concepts) // max(sheets, 1)) or 1
+    for s, start in enumerate(range(0, len(concepts), size)):
+        sheet = workbook.active if s == 0 else workbook.create_sheet()
+        sheet.title = f"Concepts {start + 1:d}-{min(start + size, len(concepts)):d}"
+        yield sheet, concepts[start : start + size]
+
+
+def synthetic_workbooks(
+    dataset: pycldf.Wordlist, directory: Path, shape: Shape
+) -> t.Dict[str, Path]:
+    """Write the forms of a synthetic wordlist as Excel workbooks for the importers.
+
+    Return the paths of the "matrix", "interleaved" and "long" workbooks.
+
+    """
+    languages = {row["ID"]: row["Name"] for row in dataset["LanguageTable"]}
+    concepts = {row["ID"]: row["Name"] for row in dataset["ParameterTable"]}
+    cognatesets: t.Dict[types.Form_ID, t.List[str]] = {}
+    for judgement in dataset["CognateTable"]:
+        cognatesets.setdefault(judgement["Form_ID"], []).append(
+            judgement["Cognateset_ID"]
+        )
+    cells: t.Dict[t.Tuple[str, str], t.List[t.Tuple[str, str]]] = {}
+    by_language: t.Dict[str, t.List[t.Dict[str, t.Any]]] = {}
+    for form in dataset["FormTable"]:
+        cells.setdefault((form["Parameter_ID"], form["Language_ID"]), []).append(
+            (form["Form"], "+".join(cognatesets.get(form["ID"], [])))
+        )
+        by_language.setdefault(form["Language_ID"], []).append(form)
+
+    paths = {}
+
+    # The matrix format, as read by importer.excel_matrix with its default parser
+    workbook = openpyxl.Workbook()
+    for sheet, sheet_concepts in _concept_sheets(
+        workbook, list(concepts), shape.sheets
+    ):
+        sheet.append(["set", "Name", None, *languages.values()])
+        for concept in sheet_concepts:
+            sheet.append(
+                [
+                    None,
+                    concepts[concept],
+                    None,
+                    *(
+                        "; ".join(
+                            f"<{form}>"
+                            for form, _ in cells.get((concept, language), [])
+                        )
+                        or None
+                        for language in languages
+                    ),
+                ]
+            )
+    paths["matrix"] = directory / "matrix.xlsx"
+    workbook.save(paths["matrix"])
+
+    # The interleaved format, with a row of cognate codes below each row of forms
+    workbook = openpyxl.Workbook()
+    for sheet, sheet_concepts in _concept_sheets(
+        workbook, list(concepts), shape.sheets
+    ):
+        sheet.append([None, *languages.values()])
+        for concept in sheet_concepts:
+            entries = [cells.get((concept, language), []) for language in languages]
+            sheet.append(
+                [
+                    concepts[concept],
+                    *(
+                        ", ".join(form for form, _ in entry) or None
+                        for entry in entries
+                    ),
+                ]
+            )
+            sheet.append(
+                [
+                    None,
+                    *(
+                        ", ".join(code for _, code in entry) or None
+                        for entry in entries
+                    ),
+                ]
+            )
+    paths["interleaved"] = directory / "interleaved.xlsx"
+    workbook.save(paths["interleaved"])
+
+    # The long format, with one sheet per language
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for language, name in languages.items():
+        sheet = workbook.create_sheet(name)
+        sheet.append(["Form", "Parameter_ID", "Comment"])
+        for form in by_language.get(language, []):
+            sheet.append([form["Form"], form["Parameter_ID"], form["Comment"]])
+    paths["long"] = directory / "long.xlsx"
+    workbook.save(paths["long"])
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}.{Path(__file__).stem}",
+        description=__doc__.split("\n\n")[0],
+        epilog=__doc__.split("\n\n", 1)[1],
+    )
+    parser.add_argument(
+        "directory",
+        type=Path,
+        help="Directory to write the wordlist and the workbooks to",
+    )
+    parser.add_argument(
+        "--scale",
+        choices=list(SCALES),
+        default="small",
+        help="Shape of the wordlist, which the other options modify (default: small)",
+    )
+    for field, default in Shape._field_defaults.items():
+        parser.add_argument(
+            "--" + field,
+            type=type(default),
+            default=None,
+            help=f"Override the {field} of the shape",
+        )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the random number generator (default: 0)",
+    )
+    cli.add_log_controls(parser)
+    args = parser.parse_args()
+    logger = cli.setup_logging(args)
+
+    shape = SCALES[args.scale]._replace(
+        **{
+            field: getattr(args, field)
+            for field in Shape._fields
+            if getattr(args, field) is not None
+        }
+    )
+    dataset = synthetic_wordlist(args.directory, shape, seed=args.seed)
+    synthetic_workbooks(dataset, args.directory, shape)
+    logger.info("Wrote a synthetic wordlist of shape %s to %s.", shape, args.directory)
@@ -1,8 +1,14 @@
 import argparse
+import atexit
+import collections
+import cProfile
 import csv
 import enum
+import json
 import logging
+import pstats
 import sys
+import time
 import typing as t
 from enum import IntEnum
 from pathlib import Path
@@ -38,7 +44,29 @@ class Exit(IntEnum):
         sys.exit(self)
 
 
+#: Wall time spent in each task passed to `tq`, recorded only with --profile
+phase_times: t.Optional[t.Dict[str, float]] = None
+
+
+def timed(iter, task: str):
+    """Add the time from the first to the last item of `iter` to the task's phase time.
+
+    Phases can nest, and the time of a phase includes that of the phases in it.
+
+    """
+    start = time.perf_counter()
+    try:
+        yield from iter
+    finally:
+        if phase_times is not None:
+            phase_times[task] += time.perf_counter() - start
+
+
 def tq(iter, task, logger=logger, total: t.Optional[t.Union[int, float]] = None):
+    if phase_times is not None:
+        if total is None and hasattr(iter, "__len__"):
+            total = len(iter)
+        iter = timed(iter, task)
     if logger.getEffectiveLevel() <= logging.INFO:
         logger.info(task)
         return tqdm.tqdm(iter, total=total)
@@ -148,8 +176,87 @@ def add_log_controls(parser: argparse.ArgumentParser):
     logcontrol.add_argument("-v", action=ChangeLoglevel, const=-10, dest="loglevel")
 
 
+def add_profile_controls(parser: argparse.ArgumentParser):
+    profiling = parser.add_argument_group("Profiling")
+    profiling.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Run the command under cProfile, write the profile to the --profile-output "
+        "file and the wall time of each phase of the command to the same file name "
+        "with the extra suffix .phases.json, and print a summary of both to stderr. "
+        "Work done in other processes (eg. with --jobs) is not profiled.",
+    )
+    profiling.add_argument(
+        "--profile-output",
+        type=Path,
+        default=Path(parser.prog.split()[-1] + ".pstats"),
+        metavar="PSTATS",
+        help="File to write the profile to (default: %(default)s)",
+    )
+    profiling.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        metavar="N",
+        help="Number of functions in the profile summary (default: 25)",
+    )
+
+
+def is_pstats_file(path: Path) -> bool:
+    """Check whether a file holds a profile that `pstats` can read."""
+    try:
+        pstats.Stats(str(path))
+    except Exception:
+        return False
+    return True
+
+
+def start_profiling(path: Path, top: int = 25) -> cProfile.Profile:
+    """Profile the rest of the command, and report on the profile when it exits.
+
+    When the command exits, the profile is written to `path`, the wall time
+    of each phase (each task passed to `tq`) to `path` with the extra suffix
+    ``.phases.json``, and the `top` functions by cumulative time and the
+    phase times are printed to stderr.
+
+    """
+    global phase_times
+    phase_times = collections.defaultdict(float)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+
+    def report():
+        profiler.disable()
+        total = time.perf_counter() - start
+        profiler.dump_stats(path)
+        phases = {"Total": total, **(phase_times or {})}
+        with path.with_name(path.name + ".phases.json").open(
+            "w", encoding="utf-8"
+        ) as file:
+            json.dump(phases, file, indent=2, ensure_ascii=False)
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        print("Wall time by phase:", file=sys.stderr)
+        for phase, seconds in phases.items():
+            print(f"{seconds:12.3f}s  {phase}", file=sys.stderr)
+        print(f"Profile written to {path}", file=sys.stderr)
+
+    atexit.register(report)
+    profiler.enable()
+    return profiler
+
+
 def setup_logging(args: argparse.Namespace):
     logger.setLevel(args.loglevel)
+    if getattr(args, "profile", False):
+        path = args.profile_output
+        if path.exists() and not is_pstats_file(path):
+            Exit.CLI_ARGUMENT_ERROR(
+                f"{path} exists and is not a profile, refusing to overwrite it. "
+                "Give a different --profile-output."
+            )
+        start_profiling(path, args.profile_top)
     return logger
 
 
@@ -164,6 +271,7 @@ def parser(name: str, description: str, **kwargs) -> argparse.ArgumentParser:
         help="Path to the JSON metadata file describing the dataset (default: ./Wordlist-metadata.json)",
     )
     add_log_controls(parser)
+    add_profile_controls(parser)
     return parser
 
 
@@ -2,13 +2,12 @@ import collections
 import typing as t
 from pathlib import Path
 
-import networkx
 import pycldf
 from csvw.metadata import URITemplate
 
 from lexedata import cli
 from lexedata.edit.add_status_column import add_status_column_to_table
-from lexedata.util import load_clics
+from lexedata.util.clics import ClicsIndex, load_clics_index
 
 FormID = str
 ConceptID = str
@@ -48,10 +47,18 @@ def concepts_to_concepticon(dataset: pycldf.Wordlist) -> t.Mapping[ConceptID, in
     return concept_to_concepticon
 
 
+def clics_nodes(
+    concepts: t.Iterable[ConceptID],
+    concepts_to_concepticon: t.Mapping[ConceptID, int],
+) -> t.FrozenSet[str]:
+    """Find the CLICS nodes (Concepticon IDs) of the concepts that have one."""
+    return frozenset({str(concepts_to_concepticon.get(c)) for c in concepts} - {"None"})
+
+
 def central_concept(
     concepts: t.Counter[ConceptID],
     concepts_to_concepticon: t.Mapping[ConceptID, int],
-    clics: t.Optional[networkx.Graph],
+    clics: t.Optional[ClicsIndex],
 ):
     """Find the most central concept among a weighted set.
 
@@ -69,7 +76,7 @@ def central_concept(
     >>> central_concept(
     ...   collections.Counter(["arm", "hand", "five", "leaf"]),
     ...   concepticon_mapping,
-    ...   load_clics()
+    ...   load_clics_index()
     ... )
     'hand'
 
@@ -92,11 +99,7 @@ def central_concept(
         # without CLICS connection. Then there is no path, and the centralities
         # are 0 – including `endpoints=True` in `betweenness_centrality` does
         # not help with that, either.
-        centralities = networkx.algorithms.centrality.betweenness_centrality(
-            clics.subgraph(
-                {str(concepts_to_concepticon.get(c)) for c in concepts} - {"None"}
-            )
-        )
+        centralities = clics.betweenness(clics_nodes(concepts, concepts_to_concepticon))
 
     def effective_centrality(cc):
         concept, count = cc
@@ -186,19 +189,39 @@ def add_central_concepts_to_cognateset_table(
     overwrite_existing: bool = True,
     logger: cli.logging.Logger = cli.logger,
     status_update: t.Optional = None,
+    jobs: int = 1,
 ) -> pycldf.Dataset:
+    """Add central concepts to the cognate sets of a dataset.
+
+    The CLICS centralities of the concepts of all cognate sets are computed
+    before the central concepts are picked, once for each distinct set of
+    concepts, and in `jobs` processes.
+
+    """
     # create mapping cognateset to central concept
-    try:
-        clics: t.Optional[networkx.Graph] = load_clics()
-    except FileNotFoundError:
-        logger.warning("Clics could not be loaded.")
-        clics = None
+    clics: t.Optional[ClicsIndex] = None
+    if (
+        dataset.column_names.parameters
+        and dataset.column_names.parameters.concepticonReference
+    ):
+        # CLICS is only useful with links to Concepticon, so only load it then.
+        try:
+            clics = load_clics_index()
+        except FileNotFoundError:
+            logger.warning("Clics could not be loaded.")
     concepts_of_cognateset: t.Mapping[
         CognatesetID, t.Counter[ConceptID]
     ] = connected_concepts(dataset)
     central: t.MutableMapping[str, str] = {}
     if clics and dataset.column_names.parameters.concepticonReference:
         concept_to_concepticon = concepts_to_concepticon(dataset)
+        clics.precompute_betweenness(
+            (
+                clics_nodes(concepts, concept_to_concepticon)
+                for concepts in concepts_of_cognateset.values()
+            ),
+            jobs=jobs,
+        )
         for cognateset, concepts in concepts_of_cognateset.items():
             central[cognateset] = central_concept(
                 concepts, concept_to_concepticon, clics
@@ -259,6 +282,13 @@ if __name__ == "__main__":
         help="Text written to Status_Column. Set to 'None' for no status update. "
         "(default: automatic central concepts)",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes to use for computing CLICS centralities (default: 1)",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
     dataset = pycldf.Wordlist.from_metadata(args.metadata)
@@ -271,4 +301,5 @@ if __name__ == "__main__":
         overwrite_existing=args.overwrite,
         logger=logger,
         status_update=args.status_update,
+        jobs=args.jobs,
     )
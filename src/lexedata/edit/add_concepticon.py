@@ -13,27 +13,191 @@ columns in potentially different languages.
 
 """
 import collections
+import functools
 import typing as t
 from pathlib import Path
 
-import cldfbench
-import cldfcatalog
 import pycldf
 from csvw.metadata import URITemplate
-from pyconcepticon.glosses import concept_map2
 
 import lexedata.cli as cli
 from lexedata.edit.add_status_column import add_status_column_to_table
+from lexedata.util import cache
 
-try:
-    concepticon_path = cldfcatalog.Config.from_file().get_clone("concepticon")
-    concepticon = cldfbench.catalogs.Concepticon(concepticon_path)
-except (ValueError, KeyError):  # pragma: no cover
-    # While building the documentation on ReadTheDocs, don't expect a clone of
-    # the concepticon catalog. Everyone else will appreciate the message before
-    # the CLI dies on them.
-    cli.logging.error(
-        "Failed to read the Concepticon catalog. This tool will not run without it. Please check your CLDF catalogs using `cldbench catinfo`, and consider installing Concepticon using `cldfbench catconfig`."
+# Increase this when the cached representation of Concepticon data changes.
+CONCEPTICON_CACHE_VERSION = 2
+
+
+@functools.lru_cache(maxsize=None)
+def get_concepticon():
+    """Load the Concepticon catalog.
+
+    Loading the catalog data takes seconds, so it happens on first use and not
+    when this module is imported. Without a Concepticon catalog, exit with an
+    explanation of how to install one.
+
+    """
+    import cldfbench
+    import cldfcatalog
+
+    try:
+        concepticon_path = cldfcatalog.Config.from_file().get_clone("concepticon")
+        return cldfbench.catalogs.Concepticon(concepticon_path)
+    except (ValueError, KeyError):  # pragma: no cover
+        # Everyone will appreciate the message before the CLI dies on them.
+        cli.Exit.FILE_NOT_FOUND(
+            "Failed to read the Concepticon catalog. This tool will not run without it. Please check your CLDF catalogs using `cldbench catinfo`, and consider installing Concepticon using `cldfbench catconfig`."
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def concepticon_stamp() -> t.Hashable:
+    """Identify the version of the Concepticon catalog, for caching its data.
+
+    This is the git revision of the catalog clone. If the clone has local
+    changes, or is not a git repository, the modification times of the data
+    files are part of the stamp. The catalog is located through
+    `get_concepticon`, but its data is not loaded.
+
+    """
+    catalog = get_concepticon()
+    path = Path(catalog.dir)
+    if catalog.repo is None:
+        revision = None
+    else:
+        revision = catalog.repo.head.commit.hexsha
+        if not catalog.repo.is_dirty():
+            return CONCEPTICON_CACHE_VERSION, revision
+    return (
+        CONCEPTICON_CACHE_VERSION,
+        revision,
+        tuple(
+            (f.name, f.stat().st_mtime_ns)
+            for f in sorted(
+                [path / "concepticondata" / "concepticon.tsv"]
+                + list((path / "mappings").glob("map-*.tsv"))
+            )
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def concepticon_conceptsets() -> t.Mapping[str, t.Tuple[str, str]]:
+    """Map Concepticon IDs to the gloss and definition of their concept set.
+
+    The mapping is cached in the user cache directory, keyed on the revision of
+    the Concepticon catalog, so this only needs to load the catalog when it
+    changed.
+
+    """
+    return cache.cached(
+        "concepticon-conceptsets",
+        concepticon_stamp(),
+        lambda: {
+            id: (conceptset.gloss, conceptset.definition)
+            for id, conceptset in get_concepticon().api.conceptsets.items()
+        },
+    )
+
+
+class GlossIndex:
+    """The parsed glosses of a Concepticon mapping, with an inverted index.
+
+    `targets` is the list of (Concepticon ID, gloss) pairs from a Concepticon
+    mapping file, `glosses` holds the parsed glosses of each target, and
+    `by_main` maps the main part of every parsed gloss to the indices of the
+    targets that have it, once for each such parsed gloss.
+
+    >>> index = GlossIndex([("1", "hand"), ("2", "foot"), ("3", "the hand")], "en")
+    >>> index.by_main["hand"]
+    [0, 2]
+
+    """
+
+    def __init__(self, targets: t.Sequence[t.Tuple[str, str]], language: str):
+        from pyconcepticon.glosses import parse_gloss
+
+        self.targets = [(target[0], target[1]) for target in targets]
+        self.glosses = []
+        by_main: t.Dict[str, t.List[int]] = collections.defaultdict(list)
+        for j, (_, gloss) in enumerate(self.targets):
+            parsed = parse_gloss(gloss, language=language) if gloss else []
+            self.glosses.append(parsed)
+            for g in parsed:
+                by_main[g.main].append(j)
+        self.by_main = dict(by_main)
+
+    def match(
+        self, glosses: t.Sequence[str], language: str
+    ) -> t.Dict[int, t.Tuple[t.List[int], int]]:
+        """Find the most similar targets for each of the glosses.
+
+        Return exactly what `pyconcepticon.glosses.concept_map2` returns for
+        these glosses and the targets, as (target indices, similarity) pairs:
+        The targets are compared by way of each main part of a parsed gloss
+        that they share, in the order in which these main parts first occur
+        in `glosses`, so a target can be listed more than once, and each
+        repetition counts when the matches are tallied. The targets come from
+        the inverted index, and repeated glosses are parsed and matched only
+        once.
+
+        >>> index = GlossIndex(
+        ...     [("1", "hand"), ("2", "to walk"), ("3", "walk (v.)"), ("4", "tree")], "en")
+        >>> index.match(["hand", "walk", "big tree", "hand"], "en")
+        {0: ([0], 2), 1: ([1, 2], 4), 3: ([0], 2)}
+
+        """
+        from pyconcepticon.glosses import Similarity, parse_gloss
+
+        parsed: t.Dict[str, t.List[t.Any]] = {}
+        first_occurrence: t.Dict[str, int] = {}
+        for gloss in glosses:
+            if gloss not in parsed:
+                parsed[gloss] = parse_gloss(gloss, language=language)
+                for g in parsed[gloss]:
+                    first_occurrence.setdefault(g.main, len(first_occurrence))
+
+        matches: t.Dict[str, t.Optional[t.Tuple[t.List[int], int]]] = {}
+        for gloss, own in parsed.items():
+            mains = [g.main for g in own if g.main in self.by_main]
+            if not mains:
+                matches[gloss] = None
+                continue
+            keys: t.List[int] = []
+            best = int(Similarity.DIFFERENT)
+            # Each main part is visited once for every parsed gloss that has it
+            for main in sorted(mains, key=first_occurrence.__getitem__):
+                for j in self.by_main[main]:
+                    for a in own:
+                        for b in self.glosses[j]:
+                            similarity = int(a.similarity(b))
+                            if similarity < best:
+                                keys, best = [j], similarity
+                            elif similarity == best:
+                                keys.append(j)
+            matches[gloss] = (keys, best)
+
+        mapping = {}
+        for i, gloss in enumerate(glosses):
+            match = matches[gloss]
+            if match is not None:
+                mapping[i] = (list(match[0]), match[1])
+        return mapping
+
+
+def gloss_index(language: str) -> GlossIndex:
+    """Load the parsed Concepticon mapping for a gloss language.
+
+    Parsing the mapping files takes a while, so the index is cached in the user
+    cache directory, keyed on the revision of the Concepticon catalog.
+
+    """
+    return cache.cached(
+        f"concepticon-glosses-{language}",
+        concepticon_stamp(),
+        lambda: GlossIndex(
+            get_concepticon().api._get_map_for_language(language, None), language
+        ),
     )
 
 
@@ -53,17 +217,18 @@ def add_concepticon_names(
     except ValueError:
         pass
 
+    c_concepticon = dataset.column_names.parameters.concepticonReference
     write_back = []
     for row in cli.tq(
         dataset["ParameterTable"],
         task="Write concepts with concepticon names to dataset",
     ):
-        try:
-            row[column_name] = concepticon.api.conceptsets[
-                row[dataset.column_names.parameters.concepticonReference]
-            ].gloss
-        except KeyError:
-            pass
+        # Only look up the catalog for concepts that reference it
+        if row.get(c_concepticon):
+            try:
+                row[column_name] = concepticon_conceptsets()[row[c_concepticon]][0]
+            except KeyError:
+                pass
 
         write_back.append(row)
 
@@ -102,23 +267,14 @@ def add_concepticon_references(
         for column, glosses in gloss_lists.items():
             glosses.append(row[column] or "?")  # Concepticon abhors empty glosses.
 
-    targets = {
-        language: concepticon.api._get_map_for_language(language, None)
-        for language in gloss_languages.values()
-    }
+    indices = {language: gloss_index(language) for language in gloss_languages.values()}
 
-    cmaps: t.List[t.Dict[int, t.Tuple[t.List[int], int]]] = [
+    cmaps: t.List[
+        t.Tuple[t.Dict[int, t.Tuple[t.List[int], int]], t.List[t.Tuple[str, str]]]
+    ] = [
         (
-            concept_map2(
-                glosses,
-                [i[1] for i in targets[gloss_languages[column]]],
-                similarity_level=2,
-                language=gloss_languages[column],
-            ),
-            # What a horrendous API! Why can't it return glosses or IDs instead
-            # of, as it does now, target-indices so I have to schlepp target along
-            # with the results?
-            targets[gloss_languages[column]],
+            indices[gloss_languages[column]].match(glosses, gloss_languages[column]),
+            indices[gloss_languages[column]].targets,
         )
         for column, glosses in gloss_lists.items()
     ]
@@ -183,12 +339,11 @@ def add_concepticon_definitions(
         dataset["ParameterTable"],
         task="Write concepts with concepticon definitions to dataset",
     ):
-        try:
-            row[column_name] = concepticon.api.conceptsets[
-                row[concepticon_ids]
-            ].definition
-        except KeyError:
-            pass
+        if row[concepticon_ids]:
+            try:
+                row[column_name] = concepticon_conceptsets()[row[concepticon_ids]][1]
+            except KeyError:
+                pass
         write_back.append(row)
 
     dataset.write(ParameterTable=write_back)
@@ -11,13 +11,16 @@ For details on the segmentation procedure, see the manual.
 .. _CLTS: https://clts.clld.org/parameters
 """
 
+import functools
+import hashlib
+import itertools
+import json
 import typing as t
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 
 import attr
-import cldfbench
-import cldfcatalog
 import pycldf
 import pyclts
 import segments
@@ -25,26 +28,49 @@ from csvw.metadata import URITemplate
 from tabulate import tabulate
 
 import lexedata.cli as cli
+from lexedata.util.fs import rewrite_table
 
-try:
-    with cldfcatalog.Catalog.from_config("clts", tag="v2.0.0"):
-        clts_path = cldfcatalog.Config.from_file().get_clone("clts")
+
+@functools.lru_cache(maxsize=None)
+def get_bipa() -> pyclts.TranscriptionSystem:
+    """Load the BIPA transcription system from the CLTS catalog.
+
+    Loading CLTS takes seconds, so it happens on first use and not when this
+    module is imported. The module attribute `bipa` also calls this function.
+
+    """
+    import cldfbench
+    import cldfcatalog
+
+    try:
+        with cldfcatalog.Catalog.from_config("clts", tag="v2.0.0"):
+            clts_path = cldfcatalog.Config.from_file().get_clone("clts")
+            clts = cldfbench.catalogs.CLTS(clts_path)
+            return clts.api.bipa
+    except (ValueError, KeyError):  # pragma: no cover
+        # Make a temporary clone of CLTS. Mostly useful for ReadTheDocs.
+        cli.logging.warning(
+            "Failed to read the CLTS catalog. This script cannot be processed without that catalog, so I'm falling back to a manual clone of the repository. Please check your CLDF catalogs using `cldbench catinfo`, and consider installing CLTS using `cldfbench catconfig`."
+        )
+        import os
+        from tempfile import mkdtemp
+
+        clts_path = mkdtemp("clts")
+        os.system(
+            f"git clone -b v2.0.0 --depth 1 https://github.com/cldf-clts/clts.git '{clts_path}'"
+        )
         clts = cldfbench.catalogs.CLTS(clts_path)
-        bipa = clts.api.bipa
-except (ValueError, KeyError):  # pragma: no cover
-    # Make a temporary clone of CLTS. Mostly useful for ReadTheDocs.
-    cli.logging.warning(
-        "Failed to read the CLTS catalog. This script cannot be processed without that catalog, so I'm falling back to a manual clone of the repository. Please check your CLDF catalogs using `cldbench catinfo`, and consider installing CLTS using `cldfbench catconfig`."
-    )
-    import os
-    from tempfile import mkdtemp
+        return clts.api.bipa
+
+
+def __getattr__(name: str):
+    # Load `bipa` and `pre_replace`, which need CLTS, only when they are used.
+    if name == "bipa":
+        return get_bipa()
+    if name == "pre_replace":
+        return get_pre_replace()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    clts_path = mkdtemp("clts")
-    os.system(
-        f"git clone -b v2.0.0 --depth 1 https://github.com/cldf-clts/clts.git '{clts_path}'"
-    )
-    clts = cldfbench.catalogs.CLTS(clts_path)
-    bipa = clts.api.bipa
 
 tokenizer = segments.Tokenizer()
 
@@ -86,58 +112,99 @@ def cleanup(form: str) -> str:
     return form
 
 
-pre_replace = {
-    "l̴": str(bipa["voiceless alveolar lateral fricative consonant"]),
-    "˺": "̚",
-    "ˑ": ".",
-    "oː́": str(bipa["long rounded close-mid back with-high_tone vowel"]),
-    "\u2184": str(bipa["rounded open-mid back vowel"]),
-    # LATIN SMALL LETTER REVERSED C, instead of LATIN SMALL LETTER OPEN O
-    "Ɂ": str(bipa["voiceless glottal stop consonant"]),
-    # "?": str(bipa["voiceless glottal stop consonant"]),
-    # But this could also be marking an unknown sound – maybe the recording is messy
-    # "'": "ˈ",
-    # But this could also be marking ejective consonants, so don't guess
-    "͡ts": str(bipa["voiceless alveolar sibilant affricate consonant"]),
-    "ts͡": str(bipa["voiceless alveolar sibilant affricate consonant"]),
-    "ts͜": str(bipa["voiceless alveolar sibilant affricate consonant"]),
-    "͜ts": str(bipa["voiceless alveolar sibilant affricate consonant"]),
-    "tʃ͡": str(bipa["voiceless post-alveolar sibilant affricate consonant"]),
-    "͡tʃ": str(bipa["voiceless post-alveolar sibilant affricate consonant"]),
-    "t͡ç": str(bipa["voiceless palatal affricate consonan"]),
-}
+@functools.lru_cache(maxsize=None)
+def get_pre_replace() -> t.Dict[str, str]:
+    """Return the replacements applied to transcriptions before segmenting."""
+    bipa = get_bipa()
+    return {
+        "l̴": str(bipa["voiceless alveolar lateral fricative consonant"]),
+        "˺": "̚",
+        "ˑ": ".",
+        "oː́": str(bipa["long rounded close-mid back with-high_tone vowel"]),
+        "\u2184": str(bipa["rounded open-mid back vowel"]),
+        # LATIN SMALL LETTER REVERSED C, instead of LATIN SMALL LETTER OPEN O
+        "Ɂ": str(bipa["voiceless glottal stop consonant"]),
+        # "?": str(bipa["voiceless glottal stop consonant"]),
+        # But this could also be marking an unknown sound – maybe the recording is messy
+        # "'": "ˈ",
+        # But this could also be marking ejective consonants, so don't guess
+        "͡ts": str(bipa["voiceless alveolar sibilant affricate consonant"]),
+        "ts͡": str(bipa["voiceless alveolar sibilant affricate consonant"]),
+        "ts͜": str(bipa["voiceless alveolar sibilant affricate consonant"]),
+        "͜ts": str(bipa["voiceless alveolar sibilant affricate consonant"]),
+        "tʃ͡": str(bipa["voiceless post-alveolar sibilant affricate consonant"]),
+        "͡tʃ": str(bipa["voiceless post-alveolar sibilant affricate consonant"]),
+        "t͡ç": str(bipa["voiceless palatal affricate consonan"]),
+    }
+
+
+class SegmentationCache:
+    """A bounded cache of segmentations, least recently used first out.
+
+    Datasets repeat the same transcriptions a lot, so `segment_form` looks up
+    the segments of each (form, transcription system, split_diphthongs)
+    combination here. An entry holds the segments and the report entries and
+    warnings the segmentation produced, which `segment_form` applies again on
+    every hit.
+
+    >>> cache = SegmentationCache(maxsize=2)
+    >>> for form in ["ta", "ta", "ka", "ma", "ta"]:
+    ...     _ = cache(form, None, True, segment=lambda *key: (list(key[0]), []))
+    >>> cache.hits, cache.misses, len(cache.entries)
+    (1, 4, 2)
 
+    """
 
-def segment_form(
+    def __init__(self, maxsize: int = 2**16):
+        self.maxsize = maxsize
+        self.entries: t.OrderedDict[
+            t.Tuple[str, t.Any, bool],
+            t.Tuple[t.List[pyclts.models.Symbol], t.List[t.Tuple[str, str, str]]],
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(
+        self,
+        formstring: str,
+        system,
+        split_diphthongs: bool,
+        segment: t.Optional[t.Callable] = None,
+    ) -> t.Tuple[t.List[pyclts.models.Symbol], t.List[t.Tuple[str, str, str]]]:
+        key = (formstring, system, split_diphthongs)
+        try:
+            value = self.entries[key]
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+        self.misses += 1
+        value = (segment or segment_form_uncached)(*key)
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return value
+
+
+segmentation_cache = SegmentationCache()
+
+
+def segment_form_uncached(
     formstring: str,
-    report: SegmentReport,
-    system=bipa,
+    system=None,
     split_diphthongs: bool = True,
-    context_for_warnings: str = "",
-    logger: cli.logging.Logger = cli.logger,
-) -> t.Iterable[pyclts.models.Symbol]:
-    """Segment the form.
-
-    First, apply some pre-processing replacements. Forms supplied contain all
-    sorts of noise and lookalike symbols. This function comes with reasonable
-    defaults, but if you encounter other problems, or you actually want to be
-    strict about IPA transcriptions, pass a dictionary of your choice as
-    `pre_replace`.
-
-    Then, naïvely segment the form using the IPA tokenizer from the `segments`
-    package. Check each returned segment to see whether it is valid according
-    to CLTS's BIPA, and if not, try to fix some issues (in particular
-    pre-aspirated or pre-nasalized consonants showing up as post-aspirated
-    resp. post-nasalized vowels, which BIPA does not accept).
+) -> t.Tuple[t.List[pyclts.models.Symbol], t.List[t.Tuple[str, str, str]]]:
+    """Segment the form, returning the segments and the problems encountered.
 
-    >>> [str(x) for x in segment_form("iɾũndɨ", report=SegmentReport())]
-    ['i', 'ɾ', 'ũ', 'n', 'd', 'ɨ']
-    >>> [str(x) for x in segment_form("mokõi", report=SegmentReport())]
-    ['m', 'o', 'k', 'õ', 'i']
-    >>> segment_form("pan̥onoót͡síkoːʔú", report=SegmentReport())  # doctest: +ELLIPSIS
-    [<pyclts.models.Consonant: voiceless bilabial stop consonant>, <pyclts.models.Vowel: unrounded open front vowel>, <pyclts.models.Consonant: devoiced voiced alveolar nasal consonant>, <pyclts.models.Vowel: rounded close-mid back vowel>, <pyclts.models.Consonant: voiced alveolar nasal consonant>, <pyclts.models.Vowel: rounded close-mid back vowel>, <pyclts.models.Vowel: rounded close-mid back ... vowel>, <pyclts.models.Consonant: voiceless alveolar sibilant affricate consonant>, <pyclts.models.Vowel: unrounded close front ... vowel>, <pyclts.models.Consonant: voiceless velar stop consonant>, <pyclts.models.Vowel: long rounded close-mid back vowel>, <pyclts.models.Consonant: voiceless glottal stop consonant>, <pyclts.models.Vowel: rounded close back ... vowel>]
+    This does the work for `segment_form`, without writing to a report or the
+    log. Instead, each problem is returned as (sound, report comment, warning
+    message) triple. The transcription system defaults to BIPA.
 
     """
+    bipa = get_bipa()
+    if system is None:
+        system = bipa
     # and with the syllable boundary marker '.', so we wrap it with special cases for those.
     raw_tokens = [
         system[s]
@@ -146,14 +213,17 @@ def segment_form(
             ipa=True,
         ).split()
     ]
+    notes: t.List[t.Tuple[str, str, str]] = []
     if system != bipa:
         for r in raw_tokens:
             if r.type == "unknownsound":
-                logger.warning(
-                    f"{context_for_warnings}Unknown sound encountered in {formstring:}"
+                notes.append(
+                    (
+                        str(r),
+                        "unknown sound",
+                        f"Unknown sound encountered in {formstring:}",
+                    )
                 )
-                report.sounds[str(r)].count += 1
-                report.sounds[str(r)].comment = "unknown sound"
     i = len(raw_tokens) - 1
     while i >= 0:
         if split_diphthongs and raw_tokens[i].type == "diphthong":
@@ -164,14 +234,16 @@ def segment_form(
             i -= 1
             continue
         if raw_tokens[i].source == "/":
-            report.sounds[str(raw_tokens[i])].count += 1
-            report.sounds[str(raw_tokens[i])].comment = "illegal symbol"
-            del raw_tokens[i]
-            logger.warning(
-                f"{context_for_warnings}Impossible sound '/' encountered in {formstring} – "
-                f"You cannot use CLTS extended normalization "
-                f"with this script. The slash was skipped and not included in the segments."
+            notes.append(
+                (
+                    str(raw_tokens[i]),
+                    "illegal symbol",
+                    f"Impossible sound '/' encountered in {formstring} – "
+                    f"You cannot use CLTS extended normalization "
+                    f"with this script. The slash was skipped and not included in the segments.",
+                )
             )
+            del raw_tokens[i]
             i -= 1
             continue
         grapheme = raw_tokens[i].grapheme
@@ -193,11 +265,13 @@ def segment_form(
                 or not hasattr(raw_tokens[i + 1], "preceding")
                 or raw_tokens[i + 1].preceding is not None
             ):
-                logger.warning(
-                    f"{context_for_warnings}Unknown sound {raw_tokens[i]} encountered in {formstring}"
+                notes.append(
+                    (
+                        str(raw_tokens[i]),
+                        "unknown pre-nasalization",
+                        f"Unknown sound {raw_tokens[i]} encountered in {formstring}",
+                    )
                 )
-                report.sounds[str(raw_tokens[i])].count += 1
-                report.sounds[str(raw_tokens[i])].comment = "unknown pre-nasalization"
                 i -= 1
                 continue
             raw_tokens[i + 1] = bipa["pre-nasalized " + raw_tokens[i + 1].name]
@@ -209,24 +283,211 @@ def segment_form(
                 or not hasattr(raw_tokens[i + 1], "preceding")
                 or raw_tokens[i + 1].preceding is not None
             ):
-                logger.warning(
-                    f"{context_for_warnings}Unknown sound {raw_tokens[i]} encountered in {formstring}"
+                notes.append(
+                    (
+                        str(raw_tokens[i]),
+                        "unknown pre-aspiration",
+                        f"Unknown sound {raw_tokens[i]} encountered in {formstring}",
+                    )
                 )
-                report.sounds[str(raw_tokens[i])].count += 1
-                report.sounds[str(raw_tokens[i])].comment = "unknown pre-aspiration"
                 i -= 1
                 continue
             raw_tokens[i + 1] = bipa["pre-aspirated " + raw_tokens[i + 1].name]
             raw_tokens[i] = bipa[grapheme[:-1]]
             continue
-        logger.warning(
-            f"{context_for_warnings}Unknown sound {raw_tokens[i]} encountered in {formstring}"
+        notes.append(
+            (
+                str(raw_tokens[i]),
+                "unknown sound",
+                f"Unknown sound {raw_tokens[i]} encountered in {formstring}",
+            )
         )
-        report.sounds[str(raw_tokens[i])].count += 1
-        report.sounds[str(raw_tokens[i])].comment = "unknown sound"
         i -= 1
 
-    return raw_tokens
+    return raw_tokens, notes
+
+
+def segment_form(
+    formstring: str,
+    report: SegmentReport,
+    system=None,
+    split_diphthongs: bool = True,
+    context_for_warnings: str = "",
+    logger: cli.logging.Logger = cli.logger,
+) -> t.Iterable[pyclts.models.Symbol]:
+    """Segment the form.
+
+    First, apply some pre-processing replacements. Forms supplied contain all
+    sorts of noise and lookalike symbols. This function comes with reasonable
+    defaults, but if you encounter other problems, or you actually want to be
+    strict about IPA transcriptions, pass a dictionary of your choice as
+    `pre_replace`.
+
+    Then, naïvely segment the form using the IPA tokenizer from the `segments`
+    package. Check each returned segment to see whether it is valid according
+    to CLTS's BIPA, and if not, try to fix some issues (in particular
+    pre-aspirated or pre-nasalized consonants showing up as post-aspirated
+    resp. post-nasalized vowels, which BIPA does not accept). Pass a different
+    transcription `system` to check the segments against that instead of BIPA.
+
+    >>> [str(x) for x in segment_form("iɾũndɨ", report=SegmentReport())]
+    ['i', 'ɾ', 'ũ', 'n', 'd', 'ɨ']
+    >>> [str(x) for x in segment_form("mokõi", report=SegmentReport())]
+    ['m', 'o', 'k', 'õ', 'i']
+    >>> segment_form("pan̥onoót͡síkoːʔú", report=SegmentReport())  # doctest: +ELLIPSIS
+    [<pyclts.models.Consonant: voiceless bilabial stop consonant>, <pyclts.models.Vowel: unrounded open front vowel>, <pyclts.models.Consonant: devoiced voiced alveolar nasal consonant>, <pyclts.models.Vowel: rounded close-mid back vowel>, <pyclts.models.Consonant: voiced alveolar nasal consonant>, <pyclts.models.Vowel: rounded close-mid back vowel>, <pyclts.models.Vowel: rounded close-mid back ... vowel>, <pyclts.models.Consonant: voiceless alveolar sibilant affricate consonant>, <pyclts.models.Vowel: unrounded close front ... vowel>, <pyclts.models.Consonant: voiceless velar stop consonant>, <pyclts.models.Vowel: long rounded close-mid back vowel>, <pyclts.models.Consonant: voiceless glottal stop consonant>, <pyclts.models.Vowel: rounded close back ... vowel>]
+
+    """
+    tokens, notes = segmentation_cache(formstring, system, split_diphthongs)
+    report_segmentation_problems(notes, report, context_for_warnings, logger)
+    return list(tokens)
+
+
+def report_segmentation_problems(
+    notes: t.Iterable[t.Tuple[str, str, str]],
+    report: SegmentReport,
+    context_for_warnings: str = "",
+    logger: cli.logging.Logger = cli.logger,
+) -> None:
+    """Log the problems of one segmentation and count them in the report."""
+    for sound, comment, message in notes:
+        logger.warning(f"{context_for_warnings}{message}")
+        report.sounds[sound].count += 1
+        report.sounds[sound].comment = comment
+
+
+def apply_pre_replace(form: str) -> str:
+    """Apply the `pre_replace` replacements to a transcription.
+
+    >>> apply_pre_replace("Ɂa") == str(get_bipa()["voiceless glottal stop consonant"]) + "a"
+    True
+
+    """
+    for wrong, right in get_pre_replace().items():
+        form = form.replace(wrong, right)
+    return form
+
+
+def segment_forms(
+    formstrings: t.Sequence[str],
+) -> t.List[t.Tuple[t.List[str], t.List[t.Tuple[str, str, str]]]]:
+    """Segment a batch of forms with BIPA, for use in a worker process.
+
+    Segments are returned as strings, which are what ends up in the
+    FormTable and which are cheap to send back to the parent process.
+
+    """
+    results = []
+    for formstring in formstrings:
+        tokens, notes = segment_form_uncached(formstring)
+        results.append(([str(token) for token in tokens], notes))
+    return results
+
+
+Item = t.TypeVar("Item")
+
+
+def segment_in_parallel(
+    items: t.Iterable[Item],
+    form_of: t.Callable[[Item], t.Optional[str]],
+    jobs: int,
+    chunksize: int = 512,
+) -> t.Iterator[
+    t.Tuple[Item, t.Dict[str, t.Tuple[t.List[str], t.List[t.Tuple[str, str, str]]]]]
+]:
+    """Segment the forms of items in a pool of `jobs` worker processes.
+
+    The items are read in chunks, and the distinct forms of each chunk (as
+    given by `form_of`, None for items that need no segmentation) are sent to
+    a worker. At most two chunks per worker are in flight at any time, and
+    the items of a chunk are yielded, in their original order and together
+    with the segmentations of the chunk's forms, as soon as its worker is
+    done, so neither the items nor the segmentations pile up in memory.
+
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        window: t.Deque[t.Tuple[t.List[Item], t.List[str], Future]] = deque()
+
+        def oldest_chunk():
+            chunk, forms, future = window.popleft()
+            segmented = dict(zip(forms, future.result()))
+            for item in chunk:
+                yield item, segmented
+
+        items = iter(items)
+        while True:
+            chunk = list(itertools.islice(items, chunksize))
+            if not chunk:
+                break
+            forms = list(dict.fromkeys(f for f in map(form_of, chunk) if f))
+            window.append((chunk, forms, pool.submit(segment_forms, forms)))
+            if len(window) >= 2 * jobs:
+                yield from oldest_chunk()
+        while window:
+            yield from oldest_chunk()
+
+
+def transcription_fingerprint(transcription: str) -> str:
+    """Fingerprint a transcription, to recognize it again in a later run.
+
+    >>> transcription_fingerprint("iɾũndɨ") == transcription_fingerprint("iɾũndɨ")
+    True
+    >>> transcription_fingerprint("iɾũndɨ") == transcription_fingerprint("iɾũnde")
+    False
+
+    """
+    return hashlib.sha1(transcription.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprints_file(dataset: pycldf.Dataset) -> Path:
+    """Locate the fingerprints of the segmented transcriptions of a dataset.
+
+    The fingerprints live next to the FormTable, in a file with the same name
+    and the extra suffix ``.segments.json``, so they travel with the dataset.
+
+    """
+    table = Path(dataset["FormTable"].url.resolve(dataset.directory))
+    return table.with_name(table.name + ".segments.json")
+
+
+def load_fingerprints(
+    dataset: pycldf.Dataset,
+    transcription: str,
+    logger: cli.logging.Logger = cli.logger,
+) -> t.Dict[str, str]:
+    """Load the transcription fingerprints of the forms segmented last time.
+
+    If there are none, or they belong to a different transcription column,
+    return an empty mapping.
+
+    """
+    path = fingerprints_file(dataset)
+    try:
+        with path.open(encoding="utf-8") as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Segmentation fingerprints in %s could not be read.", path)
+        return {}
+    if stored.get("transcription") != transcription:
+        return {}
+    return stored.get("fingerprints", {})
+
+
+def store_fingerprints(
+    dataset: pycldf.Dataset,
+    transcription: str,
+    fingerprints: t.Mapping[str, str],
+    logger: cli.logging.Logger = cli.logger,
+) -> None:
+    """Store the transcription fingerprints of the segmented forms."""
+    path = fingerprints_file(dataset)
+    try:
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"transcription": transcription, "fingerprints": fingerprints}, f)
+    except OSError:
+        logger.warning("Could not write segmentation fingerprints to %s.", path)
 
 
 def add_segments_to_dataset(
@@ -235,7 +496,24 @@ def add_segments_to_dataset(
     overwrite_existing: bool,
     replace_form: bool,
     logger: cli.logging.Logger = cli.logger,
+    jobs: int = 1,
+    incremental: bool = False,
 ):
+    """Add segments to the FormTable, and report the problems encountered.
+
+    In incremental mode, the run records a fingerprint of the transcription
+    of each form in a file next to the FormTable (see `fingerprints_file`),
+    and forms that have segments are re-segmented exactly if their
+    transcription changed since the last incremental run, or if they have no
+    fingerprint yet, because then it is unknown what their segments came
+    from. Without incremental mode, no fingerprints are read or written.
+
+    With more than one job, the forms are segmented in a pool of worker
+    processes (see `segment_in_parallel`), and written back as their chunks
+    come back. Warnings are still logged in the order of the forms, and the
+    resulting FormTable is the same as in a single process.
+
+    """
     if dataset.column_names.forms.segments is None:
         # Create a Segments column in FormTable
         dataset.add_columns("FormTable", "Segments")
@@ -244,27 +522,70 @@ def add_segments_to_dataset(
         c.propertyUrl = URITemplate("http://cldf.clld.org/v1.0/terms.rdf#segments")
         dataset.write_metadata()
 
-    write_back = []
     c_f_segments = dataset["FormTable", "segments"].name
     c_f_id = dataset["FormTable", "id"].name
     c_f_lan = dataset["FormTable", "languageReference"].name
     c_f_form = dataset["FormTable", "form"].name
     # report = t.Dict[str, t.Dict[str, t.Dict[str, str]]] = {}
     report = {f[c_f_lan]: SegmentReport() for f in dataset["FormTable"]}
-    for r, row in cli.tq(
-        enumerate(dataset["FormTable"], 1),
-        task="Writing forms with segments to dataset",
-        total=dataset["FormTable"].common_props.get("dc:extent"),
-    ):
-        if row[c_f_segments] and not overwrite_existing:
-            write_back.append(row)
-            continue
-        else:
+    old_fingerprints = (
+        load_fingerprints(dataset, transcription, logger) if incremental else {}
+    )
+    fingerprints: t.Dict[str, str] = {}
+    kept = 0
+
+    def unchanged(row) -> bool:
+        """Check whether the segments of the row can be kept as they are."""
+        if not row[c_f_segments]:
+            return False
+        if incremental:
+            old = old_fingerprints.get(row[c_f_id])
+            return old is not None and old == transcription_fingerprint(
+                row[transcription] or ""
+            )
+        return not overwrite_existing
+
+    def form_to_segment(item) -> t.Optional[str]:
+        """Find the transcription a worker needs to segment, if any."""
+        r, row = item
+        if unchanged(row) or not row[transcription] or row[transcription] == "-":
+            return None
+        return apply_pre_replace(row[transcription].strip())
+
+    hits, misses = segmentation_cache.hits, segmentation_cache.misses
+    segmented_in_workers = 0
+    rows: t.Iterable[
+        t.Tuple[
+            t.Tuple[int, t.Dict[str, t.Any]],
+            t.Dict[str, t.Tuple[t.List[str], t.List[t.Tuple[str, str, str]]]],
+        ]
+    ]
+    if jobs > 1:
+        rows = segment_in_parallel(
+            enumerate(dataset["FormTable"], 1), form_to_segment, jobs=jobs
+        )
+    else:
+        rows = (((r, row), {}) for r, row in enumerate(dataset["FormTable"], 1))
+
+    def rows_with_segments() -> t.Iterator[t.Dict[str, t.Any]]:
+        nonlocal kept, segmented_in_workers
+        for (r, row), segmented in cli.tq(
+            rows,
+            task="Writing forms with segments to dataset",
+            total=dataset["FormTable"].common_props.get("dc:extent"),
+        ):
+            fingerprints[row[c_f_id]] = transcription_fingerprint(
+                row[transcription] or ""
+            )
+            if unchanged(row):
+                kept += 1
+                yield row
+                continue
             if row[transcription] is None or row[transcription] == "-":
                 row[dataset.column_names.forms.segments] = ""
             elif row[transcription]:
                 form = row[transcription].strip()
-                for wrong, right in pre_replace.items():
+                for wrong, right in get_pre_replace().items():
                     if wrong in form:
                         report[row[c_f_lan]].sounds[wrong].count += form.count(wrong)
                         report[row[c_f_lan]].sounds[
@@ -279,14 +600,46 @@ def add_segments_to_dataset(
                             report[row[c_f_lan]].sounds[
                                 wrong
                             ].comment += ". Run with `--replace-form` to apply this also to the forms."
-                row[dataset.column_names.forms.segments] = segment_form(
-                    form,
-                    report=report[row[c_f_lan]],
-                    context_for_warnings=f"In form {row[c_f_id]} (line {r}): ",
-                    logger=logger,
-                )
-            write_back.append(row)
-    dataset.write(FormTable=write_back)
+                context = f"In form {row[c_f_id]} (line {r}): "
+                if form in segmented:
+                    segments, notes = segmented[form]
+                    segmented_in_workers += 1
+                    report_segmentation_problems(
+                        notes, report[row[c_f_lan]], context, logger
+                    )
+                    row[dataset.column_names.forms.segments] = list(segments)
+                else:
+                    row[dataset.column_names.forms.segments] = segment_form(
+                        form,
+                        report=report[row[c_f_lan]],
+                        context_for_warnings=context,
+                        logger=logger,
+                    )
+            yield row
+
+    # The old FormTable is still being read while the new one is written
+    rewrite_table(dataset, dataset["FormTable"], rows_with_segments())
+    dataset.write_metadata()
+    if incremental:
+        store_fingerprints(dataset, transcription, fingerprints, logger)
+        logger.info(
+            "Kept the segments of %d forms with unchanged transcriptions.", kept
+        )
+    hits = segmentation_cache.hits - hits
+    misses = segmentation_cache.misses - misses
+    if segmented_in_workers:
+        logger.info(
+            "Segmented %d forms in %d processes.",
+            segmented_in_workers,
+            jobs,
+        )
+    elif hits + misses:
+        logger.info(
+            "Segmented %d distinct transcriptions, and re-used the segments for %d more forms (cache hit ratio %.1f%%).",
+            misses,
+            hits,
+            100 * hits / (hits + misses),
+        )
     return report
 
 
@@ -316,6 +669,20 @@ if __name__ == "__main__":
         default=False,
         help="Apply the replacements performed on segments also to #form column of #FormTable",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="Re-segment only those forms whose transcription changed since the last run with --incremental. "
+        "The transcriptions are recorded in a file next to the FormTable; forms not recorded there are re-segmented.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes to use for segmenting the forms (default: 1)",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
 
@@ -330,6 +697,8 @@ if __name__ == "__main__":
         args.overwrite,
         args.replace_form,
         logger=logger,
+        jobs=args.jobs,
+        incremental=args.incremental,
     )
     data = []
     for lan, segment_report in report.items():
@@ -5,62 +5,146 @@ Make sure that every segment of every form is in at least one cognateset
 cognatesets for streaks of segments not in cognatesets.
 
 """
+import itertools
 import typing as t
 from pathlib import Path
 
 import pycldf
 
 from lexedata import cli, types, util
-from lexedata.report.nonconcatenative_morphemes import segment_to_cognateset
 from lexedata.util import indices_to_segment_slice
+from lexedata.util.fs import rewrite_table
+from lexedata.util.intervals import parse_segment_ranges
 
 
-def uncoded_segments(
-    segment_to_cognateset: t.Mapping[types.Form_ID, t.List[t.Set[types.Cognateset_ID]]],
+def segment_mask(ranges: t.Iterable[t.Tuple[int, int]]) -> int:
+    """Set the bits of the segments in the ranges.
+
+    >>> bin(segment_mask([(0, 2), (3, 4)]))
+    '0b1011'
+
+    """
+    mask = 0
+    for start, end in ranges:
+        mask |= ((1 << (end - start)) - 1) << start
+    return mask
+
+
+def uncoded_ranges(covered: int, length: int) -> t.Iterator[range]:
+    """Find the maximal ranges of segments whose bits are not set in `covered`.
+
+    A negative mask covers the whole form.
+
+    >>> list(uncoded_ranges(0b0100, 4))
+    [range(0, 2), range(3, 4)]
+    >>> list(uncoded_ranges(-1, 4))
+    []
+
+    """
+    uncovered = ~covered & ((1 << length) - 1)
+    while uncovered:
+        # The lowest set bit starts a streak …
+        start = (uncovered & -uncovered).bit_length() - 1
+        streak = uncovered >> start
+        # … which ends at the lowest unset bit after it.
+        end = start + (streak & ~(streak + 1)).bit_length()
+        yield range(start, end)
+        uncovered &= -1 << end
+
+
+def covered_segments(
+    dataset: types.Wordlist[
+        types.Language_ID,
+        types.Form_ID,
+        types.Parameter_ID,
+        types.Cognate_ID,
+        types.Cognateset_ID,
+    ],
+    judgements: t.Iterable[types.Judgement],
+    cognatesets: t.Container[types.Cognateset_ID] = types.WorldSet(),
     logger: cli.logging.Logger = cli.logger,
-) -> t.Iterator[t.Tuple[types.Form_ID, range]]:
-    """Find the slices of uncoded segments.
+) -> t.Dict[types.Form_ID, int]:
+    """Collect a bitmask of the segments in cognatesets, for each judged form.
+
+    Judgements without a segment slice cover the whole form, and get a
+    negative mask, because the number of segments of the form is not known
+    here. Judgements of cognatesets not in `cognatesets` are ignored.
 
-    >>> list(uncoded_segments({"f1": [{}, {}, {"s1"}, {}]}))
-    [('f1', range(0, 2)), ('f1', range(3, 4))]
     """
-    for form, segments in segment_to_cognateset.items():
-        if not all(segments):
-            first_of_streak = None
-            previous = None
-            for i, cs in enumerate(segments):
-                if cs:
-                    continue
-                if i - 1 == previous:
-                    previous = i
-                else:
-                    if first_of_streak is not None:
-                        yield form, range(first_of_streak, previous + 1)
-                    first_of_streak = i
-                    previous = i
-            yield form, range(first_of_streak, previous + 1)
-
-
-def uncoded_forms(
-    forms: t.Iterable[types.Form], judged: t.Container[types.Form_ID]
-) -> t.Iterator[t.Tuple[types.Form_ID, range]]:
-    """Find the uncoded forms, and represent them as segment slices.
-
-    >>> list(uncoded_forms([
-    ...   {"id": "f1", "form": "ex", "segments": list("ex")},
-    ...   {"id": "f2", "form": "test", "segments": list("test")},
-    ... ], {"f1"}))
-    [('f2', range(0, 4))]
+    c_j_id = dataset["CognateTable", "id"].name
+    c_j_cogset = dataset["CognateTable", "cognatesetReference"].name
+    c_j_form = dataset["CognateTable", "formReference"].name
+    try:
+        c_j_segmentslice = dataset["CognateTable", "segmentSlice"].name
+    except KeyError:
+        c_j_segmentslice = None
+
+    covered: t.Dict[types.Form_ID, int] = {}
+    for j in judgements:
+        if j[c_j_cogset] not in cognatesets:
+            continue
+        if c_j_segmentslice and j.get(c_j_segmentslice):
+            try:
+                ranges = parse_segment_ranges(j[c_j_segmentslice])
+            except ValueError:
+                logger.warning(
+                    f"In judgement {j[c_j_id]}, segment slice {','.join(j[c_j_segmentslice])} has start after end."
+                )
+                continue
+            if any(start < 0 for start, _ in ranges):
+                logger.warning(
+                    f"In judgement {j[c_j_id]}, segment slice {','.join(j[c_j_segmentslice])} points outside the segments."
+                )
+                ranges = [(max(start, 0), end) for start, end in ranges]
+            mask = segment_mask(ranges)
+        else:
+            mask = -1
+        covered[j[c_j_form]] = covered.get(j[c_j_form], 0) | mask
+    return covered
+
+
+def uncoded_streaks(
+    dataset: types.Wordlist[
+        types.Language_ID,
+        types.Form_ID,
+        types.Parameter_ID,
+        types.Cognate_ID,
+        types.Cognateset_ID,
+    ],
+    covered: t.Mapping[types.Form_ID, int],
+    by_segment: bool = False,
+    logger: cli.logging.Logger = cli.logger,
+) -> t.Iterator[t.Tuple[types.Form_ID, types.Parameter_ID, t.List[str], range]]:
+    """Stream the FormTable and find the segments that need singletons.
+
+    Yield the ID, the first concept, the segments and the range of uncoded
+    segments for each streak of uncoded segments (`by_segment`), or for each
+    form not in `covered` at all, skipping missing and NA forms. Nothing but
+    the covered segments of the judged forms is kept in memory.
 
     """
-    for form in forms:
-        if (
-            form["id"] not in judged
-            and form["form"]
-            and form["form"].strip()
-            and form["form"].strip() != "-"
-        ):
-            yield (form["id"], range(len(form["segments"])))
+    c_f_id = dataset["FormTable", "id"].name
+    c_f_form = dataset["FormTable", "form"].name
+    c_f_concept = dataset["FormTable", "parameterReference"].name
+    c_f_segments = dataset["FormTable", "segments"].name
+    for form in dataset["FormTable"]:
+        value = form[c_f_form]
+        if not (value and value.strip() and value.strip() != "-"):
+            continue
+        id = form[c_f_id]
+        segments = form[c_f_segments] or []
+        concept = util.ensure_list(form[c_f_concept])[0]
+        if not by_segment:
+            if id not in covered:
+                yield id, concept, segments, range(len(segments))
+            continue
+        mask = covered.get(id, 0)
+        if mask >> len(segments) > 0:
+            logger.warning(
+                f"In form {id}, cognate judgements point outside valid range 1:{len(segments)}."
+            )
+        for streak in uncoded_ranges(mask, len(segments)):
+            yield id, concept, segments, streak
 
 
 def create_singletons(
@@ -74,15 +158,21 @@ def create_singletons(
     status: t.Optional[str] = None,
     by_segment: bool = False,
     logger: cli.logging.Logger = cli.logger,
-) -> t.Tuple[t.Sequence[types.CogSet], t.Sequence[types.Judgement]]:
+) -> t.Tuple[t.Iterable[types.CogSet], t.Iterable[types.Judgement]]:
     """Create singleton cognate judgements for forms that don't have cognate judgements.
 
     Depending on by_segment, singletons are created for every range of segments
     that is not in any cognate set yet (True) or just for every form where no
     segment is in any cognate sets (False).
 
+    Return the cognatesets and the judgements, each the existing ones followed
+    by the new singletons. The judgements are read once up front, keeping only
+    the coded segments of each form as a bitmask, and the cognateset IDs. The
+    two returned iterators are lazy: Each reads its table and streams the
+    FormTable to generate the singletons only as it is consumed, so a table
+    must not be overwritten while it is still being read (see `rewrite_table`).
+
     """
-    forms = util.cache_table(dataset)
     c_j_id = dataset["CognateTable", "id"].name
     c_j_cogset = dataset["CognateTable", "cognatesetReference"].name
     c_j_form = dataset["CognateTable", "formReference"].name
@@ -102,57 +192,76 @@ def create_singletons(
 
     try:
         c_s_id = dataset["CognatesetTable", "id"].name
-        all_cognatesets = {s[c_s_id]: s for s in dataset["CognatesetTable"]}
+        cognateset_ids = {s[c_s_id]: None for s in dataset["CognatesetTable"]}
+        existing_cognatesets: t.Iterable[types.CogSet] = dataset["CognatesetTable"]
     except KeyError:
         c_s_id = "id"
-        c_s_name = "name"
-        all_cognatesets = {
-            id: types.Judgement({"id": id, "name": id})
-            for id in {j[c_j_cogset] for j in dataset["CognateTable"]}
-        }
+        cognateset_ids = {j[c_j_cogset]: None for j in dataset["CognateTable"]}
+        existing_cognatesets = (
+            types.CogSet({"id": id, "name": id}) for id in cognateset_ids
+        )
+
     try:
         c_s_name = dataset["CognatesetTable", "name"].name
     except KeyError:
         c_s_name = c_s_id
+    try:
+        cognateset_columns = [
+            column.name for column in dataset["CognatesetTable"].tableSchema.columns
+        ]
+    except KeyError:
+        cognateset_columns = []
+    judgement_columns = [
+        column.name for column in dataset["CognateTable"].tableSchema.columns
+    ]
 
-    all_judgements = list(dataset["CognateTable"])
     if by_segment:
-        judgements = segment_to_cognateset(dataset, types.WorldSet(), logger)
-        forms_and_segments = uncoded_segments(judgements, logger)
-    else:
-        forms_and_segments = uncoded_forms(
-            forms.values(), {j[c_j_form] for j in all_judgements}
+        covered = covered_segments(
+            dataset, dataset["CognateTable"], cognateset_ids, logger=logger
         )
-    for form, slice in forms_and_segments:
-        i = 1
-        singleton_id = f"x_{form}_{i:d}"
-        while singleton_id in all_cognatesets:
+    else:
+        covered = {j[c_j_form]: -1 for j in dataset["CognateTable"]}
+
+    def singletons() -> t.Iterator[t.Tuple[types.CogSet, types.Judgement]]:
+        # The streaks of a form come one after the other, and singleton IDs of
+        # different forms cannot clash, so only the existing IDs need checking.
+        previous_form = None
+        i = 0
+        for form, concept, segments, slice in uncoded_streaks(
+            dataset, covered, by_segment=by_segment, logger=logger
+        ):
+            if form != previous_form:
+                previous_form, i = form, 0
             i += 1
             singleton_id = f"x_{form}_{i:d}"
-        all_cognatesets[singleton_id] = types.CogSet({})
-        properties = {
-            c_s_name: util.ensure_list(forms[form]["parameterReference"])[0],
-            c_s_id: singleton_id,
-            "Status_Column": status,
-        }
-        try:
-            for column in dataset["CognatesetTable"].tableSchema.columns:
-                all_cognatesets[singleton_id][column.name] = properties.get(column.name)
-        except KeyError:
-            pass
-        judgement = types.Judgement({})
-        properties = {
-            c_j_id: singleton_id,
-            c_j_cogset: singleton_id,
-            c_j_form: form,
-            c_j_segmentslice: indices_to_segment_slice(slice),
-            c_j_alignment: [forms[form]["segments"][i] for i in slice],
-            "Status_Column": status,
-        }
-        for column in dataset["CognateTable"].tableSchema.columns:
-            judgement[column.name] = properties.get(column.name)
-        all_judgements.append(judgement)
-    return all_cognatesets.values(), all_judgements
+            while singleton_id in cognateset_ids:
+                i += 1
+                singleton_id = f"x_{form}_{i:d}"
+            properties = {
+                c_s_name: concept,
+                c_s_id: singleton_id,
+                "Status_Column": status,
+            }
+            cognateset = types.CogSet(
+                {column: properties.get(column) for column in cognateset_columns}
+            )
+            properties = {
+                c_j_id: singleton_id,
+                c_j_cogset: singleton_id,
+                c_j_form: form,
+                c_j_segmentslice: indices_to_segment_slice(slice),
+                c_j_alignment: segments[slice.start : slice.stop],
+                "Status_Column": status,
+            }
+            judgement = types.Judgement(
+                {column: properties.get(column) for column in judgement_columns}
+            )
+            yield cognateset, judgement
+
+    return (
+        itertools.chain(existing_cognatesets, (c for c, _ in singletons())),
+        itertools.chain(dataset["CognateTable"], (j for _, j in singletons())),
+    )
 
 
 if __name__ == "__main__":
@@ -177,7 +286,7 @@ if __name__ == "__main__":
 
     dataset = pycldf.Wordlist.from_metadata(args.metadata)
     try:
-        cogsets = list(dataset["CognatesetTable"])
+        dataset["CognatesetTable"]
     except (KeyError):
         cli.Exit.INVALID_DATASET(
             "Dataset has no explicit CognatesetTable. Add one using `lexedata.edit.add_table CognatesetTable`."
@@ -187,7 +296,7 @@ if __name__ == "__main__":
         dataset, status=args.status, by_segment=args.by_segment, logger=logger
     )
 
-    dataset.write(
-        CognatesetTable=all_cognatesets,
-        CognateTable=all_judgements,
-    )
+    # Both iterables still read the tables they are written to.
+    rewrite_table(dataset, dataset["CognatesetTable"], all_cognatesets)
+    rewrite_table(dataset, dataset["CognateTable"], all_judgements)
+    dataset.write_metadata()
@@ -1,10 +1,14 @@
 """Automatically align morphemes within each cognateset.
 
-If possible, align using existing lexstat scorer.
+Align the segments of all morphemes in each cognateset by progressive multiple
+alignment, using the sound-class based scoring of LingPy's SCA.
 
 """
 
+import functools
+import logging
 import typing as t
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import pycldf
@@ -12,25 +16,124 @@ import pycldf
 from lexedata import cli, util
 from lexedata.edit.add_status_column import add_status_column_to_table
 
+M = t.TypeVar("M")
 
-def align(forms):
-    """‘Align’ forms by adding gap characters to the end.
 
-    TODO: This is DUMB. Write a function that does this more sensibly, using
-    LexStat scorers where available.
+def align_segments(
+    sequences: t.Sequence[t.Sequence[str]], model: str = "sca", gop: float = -2.0
+) -> t.List[t.List[str]]:
+    """Align segment sequences by progressive multiple alignment.
+
+    Identical sequences are aligned only once, and empty sequences end up as
+    all gaps.
+
+    >>> align_segments([["t", "a"], ["t", "a", "k"], ["k", "a", "t", "a"], []])
+    [['-', '-', 't', 'a', '-'], ['-', '-', 't', 'a', 'k'], ['k', 'a', 't', 'a', '-'], ['-', '-', '-', '-', '-']]
+
+    Sets with only one distinct sequence need no alignment at all.
+
+    >>> align_segments([["t", "a"], ["t", "a"]])
+    [['t', 'a'], ['t', 'a']]
 
     """
-    length = 0
-    for (language, segments), metadata in forms:
-        length = max(len(segments), length)
+    distinct = list(dict.fromkeys(tuple(s) for s in sequences if s))
+    if len(distinct) > 1:
+        from lingpy.align.multiple import Multiple
+
+        msa = Multiple([list(s) for s in distinct])
+        msa.prog_align(model=model, gop=gop)
+        alignments = {s: list(a) for s, a in zip(distinct, msa.alm_matrix)}
+    else:
+        alignments = {s: list(s) for s in distinct}
+    length = max((len(a) for a in alignments.values()), default=0)
+    return [alignments[tuple(s)] if s else ["-"] * length for s in sequences]
+
+
+def align(
+    forms: t.Iterable[t.Tuple[t.Tuple[str, t.Sequence[str]], M]],
+    model: str = "sca",
+    gop: float = -2.0,
+) -> t.Iterator[t.Tuple[t.List[str], M]]:
+    """Align the morphemes of one cognateset.
+
+    The forms are ((language, segments), metadata) pairs. Yield the alignment
+    of each form, with its metadata.
+
+    >>> for alignment, id in align([(("l1", ["t", "a"]), 1), (("l2", ["t", "a", "k"]), 2)]):
+    ...   print(id, alignment)
+    1 ['t', 'a', '-']
+    2 ['t', 'a', 'k']
+
+    """
+    forms = list(forms)
+    alignments = align_segments(
+        [segments for (language, segments), metadata in forms], model=model, gop=gop
+    )
+    for alignment, (_, metadata) in zip(alignments, forms):
+        yield alignment, metadata
+
+
+def _quiet_lingpy() -> None:
+    # LingPy reports details of every single alignment, which is just noise
+    # when aligning thousands of cognatesets.
+    logging.getLogger("lingpy").setLevel(logging.ERROR)
+
+
+def _align_cognateset(
+    item: t.Tuple[str, t.Sequence[t.Sequence[str]]], model: str, gop: float
+) -> t.Tuple[str, t.List[t.List[str]]]:
+    cognateset, sequences = item
+    return cognateset, align_segments(sequences, model=model, gop=gop)
+
+
+def align_cognatesets(
+    cognatesets: t.Mapping[str, t.Sequence[t.Sequence[str]]],
+    model: str = "sca",
+    gop: float = -2.0,
+    jobs: int = 1,
+) -> t.Iterator[t.Tuple[str, t.List[t.List[str]]]]:
+    """Align the morpheme segments of many cognatesets.
+
+    Yield each cognateset ID with the alignments of its sequences, in order.
+    With more than one job, the cognatesets are distributed over a pool of
+    processes, largest first, so that no big cognateset is left over at the
+    end. The order in which the cognatesets are yielded is then unspecified.
+
+    LingPy's messages below ERROR are silenced while aligning, and in a
+    single process the previous level of its logger is restored afterwards.
 
-    for (language, segments), metadata in forms:
-        yield segments + ["-"] * (length - len(segments)), metadata
+    """
+    align = functools.partial(_align_cognateset, model=model, gop=gop)
+    if jobs <= 1:
+        lingpy_logger = logging.getLogger("lingpy")
+        level = lingpy_logger.level
+        _quiet_lingpy()
+        try:
+            yield from map(align, cognatesets.items())
+        finally:
+            lingpy_logger.setLevel(level)
+        return
+    items = sorted(cognatesets.items(), key=lambda item: len(item[1]), reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_quiet_lingpy) as pool:
+        yield from pool.map(
+            align, items, chunksize=max(1, min(64, len(items) // (8 * jobs)))
+        )
 
 
 def aligne_cognate_table(
-    dataset: pycldf.Dataset, status_update: t.Optional[str] = None
+    dataset: pycldf.Dataset,
+    status_update: t.Optional[str] = None,
+    model: str = "sca",
+    gop: float = -2.0,
+    jobs: int = 1,
 ):
+    """Align the segments of all cognate judgements, by cognateset.
+
+    All judgements are read first, so that each cognateset is aligned as a
+    whole. The alignments are then written back to the CognateTable in one
+    pass, in the original order of the judgements.
+
+    """
     # add Status_Column if not existing – TODO: make configurable
     if status_update:
         add_status_column_to_table(dataset=dataset, table_name="CognateTable")
@@ -43,11 +146,12 @@ def aligne_cognate_table(
     c_slice = dataset["CognateTable", "segmentSlice"].name
     c_alignment = dataset["CognateTable", "alignment"].name
 
-    cognatesets: t.Dict[str, t.List[t.Tuple[str, str, str, t.List[str]]]] = {}
+    cognatesets: t.Dict[str, t.List[t.List[str]]] = {}
+    members: t.Dict[str, t.List[str]] = {}
     judgements: t.Dict[str, t.Dict[str, t.Any]] = {}
     for judgement in cli.tq(
         dataset["CognateTable"],
-        task="Aligning the cognate segments",
+        task="Reading the cognate judgements",
         total=dataset["CognateTable"].common_props.get("dc:extent"),
     ):
         judgements[judgement[c_id]] = judgement
@@ -60,12 +164,15 @@ def aligne_cognate_table(
                 form["segments"][i]
                 for i in util.parse_segment_slices(judgement[c_slice])
             ]
-        cognatesets.setdefault(judgement[c_cognateset_id], []).append(
-            ((form["languageReference"], morpheme), judgement[c_id])
-        )
+        cognatesets.setdefault(judgement[c_cognateset_id], []).append(morpheme)
+        members.setdefault(judgement[c_cognateset_id], []).append(judgement[c_id])
 
-    for cognateset, morphemes in cognatesets.items():
-        for alignment, id in align(morphemes):
+    for cognateset, alignments in cli.tq(
+        align_cognatesets(cognatesets, model=model, gop=gop, jobs=jobs),
+        task="Aligning the cognate segments",
+        total=len(cognatesets),
+    ):
+        for id, alignment in zip(members[cognateset], alignments):
             judgements[id][c_alignment] = alignment
             if status_update:
                 judgements[id]["Status_Column"] = status_update
@@ -82,9 +189,32 @@ if __name__ == "__main__":
         help="Text written to Status_Column. Set to 'None' for no status update. "
         "(default: automatically aligned)",
     )
+    parser.add_argument(
+        "--sound-class",
+        default="sca",
+        choices=["sca", "dolgo", "asjp", "art"],
+        help="Sound class model to use for scoring the alignments (default: sca)",
+    )
+    parser.add_argument(
+        "--gop",
+        default=-2,
+        type=float,
+        help="Gap opening penalty for the alignment (default: -2)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes to use for aligning the cognatesets (default: 1)",
+    )
     args = parser.parse_args()
     if args.status_update == "None":
         args.status_update = None
     aligne_cognate_table(
-        pycldf.Wordlist.from_metadata(args.metadata), args.status_update
+        pycldf.Wordlist.from_metadata(args.metadata),
+        args.status_update,
+        model=args.sound_class,
+        gop=args.gop,
+        jobs=args.jobs,
     )
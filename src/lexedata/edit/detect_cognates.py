@@ -13,7 +13,7 @@ import lingpy.compare.partial
 import pycldf
 import pyclts
 import segments
-from lexedata.edit.add_segments import bipa
+from lexedata.edit.add_segments import get_bipa
 
 # TODO maybe the CLTS logic from here and there belongs in util?
 
@@ -56,6 +56,7 @@ def clean_segments(segment_string: t.List[str]) -> t.Iterable[pyclts.models.Symb
     ['t', 'a', '+', 'a', 't']
 
     """
+    bipa = get_bipa()
     segments = [bipa[x] for x in segment_string]
     segments.insert(0, bipa["#"])
     segments.append(bipa["#"])
@@ -24,6 +24,7 @@ from lexedata.edit.merge_homophones import (
     default,
     first,
     format_mergers,
+    merge_rows_in_order,
     must_be_equal,
     parse_merge_override,
 )
@@ -155,57 +156,24 @@ def merge_cogsets(
         Groups that are skipped are removed
 
     """
-    merge_targets = {
-        variant: target
-        for target, variants in cogset_groups.items()
-        for variant in variants
-    }
-    for target in cogset_groups:
-        assert merge_targets[target] == target
-
-    c_s_id = dataset["CognatesetTable", "id"].name
-    buffer: t.Dict[types.Cognateset_ID, types.CogSet] = {}
-
-    unknown = set()
-    cogset: types.CogSet
-    for cogset in cli.tq(
-        data["CognatesetTable"],
-        task="Going through cognate sets and merging",
+    return merge_rows_in_order(
+        cli.tq(
+            data["CognatesetTable"],
+            task="Going through cognate sets and merging",
+            logger=logger,
+            total=data["CognatesetTable"].common_props.get("dc:extent"),
+        ),
+        data["CognatesetTable", "id"].name,
+        cogset_groups,
+        lambda cogsets, target: merge_group(
+            cogsets,
+            target.copy(),  # type: ignore
+            mergers,
+            data,
+            logger,
+        ),
         logger=logger,
-        total=data["CognatesetTable"].common_props.get("dc:extent"),
-    ):
-        id: types.Cognateset_ID = cogset[c_s_id]
-        buffer[id] = cogset
-        if id in merge_targets:
-            unknown.add(id)
-            target_id = merge_targets[id]
-            group = cogset_groups[target_id]
-            if all(i in buffer for i in group):
-                try:
-                    buffer[target_id] = merge_group(
-                        [buffer[i] for i in group],
-                        buffer[target_id].copy(),  # type: ignore
-                        mergers,
-                        data,
-                        logger,
-                    )
-
-                    for i in group:
-                        if i != target_id:
-                            del buffer[i]
-                except Skip:
-                    logger.info(
-                        f"Merging cognates set {id} with cognate sets {group} was skipped."
-                    )
-                    del cogset_groups[id]
-                    pass
-                for i in group:
-                    unknown.remove(i)
-
-        for f in list(buffer):
-            if f in unknown:
-                break
-            yield buffer.pop(f)
+    )
 
 
 if __name__ == "__main__":
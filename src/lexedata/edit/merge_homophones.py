@@ -11,7 +11,7 @@ What other columns give warnings, what other columns give errors?
 import argparse
 import re
 import typing as t
-from collections import defaultdict
+from collections import defaultdict, deque
 from pathlib import Path
 
 import pycldf
@@ -446,6 +446,88 @@ def merge_group(
     return target
 
 
+R = t.TypeVar("R", bound=t.Dict[str, t.Any])
+K = t.TypeVar("K", bound=t.Hashable)
+
+
+def merge_rows_in_order(
+    rows: t.Iterable[R],
+    id_column: str,
+    groups: t.MutableMapping[K, t.Sequence[K]],
+    merge: t.Callable[[t.Sequence[R], R], R],
+    logger: cli.logging.Logger = cli.logger,
+) -> t.Iterator[R]:
+    """Merge groups of rows from a stream of rows, keeping the row order.
+
+    The merged row of each group takes the place of the group's target, the
+    other members of the group disappear. A row is held back only while it
+    or an earlier row belongs to a group that is not complete yet, so the
+    rows are released at a watermark: Everything before the earliest row of
+    an incomplete group can be given out immediately, and every row is
+    buffered and released exactly once.
+
+    >>> rows = [{"ID": i} for i in "abcde"]
+    >>> def join(group, target):
+    ...     return {"ID": "+".join(r["ID"] for r in group)}
+    >>> [r["ID"] for r in merge_rows_in_order(rows, "ID", {"b": ["b", "d"]}, join)]
+    ['a', 'b+d', 'c', 'e']
+
+    The group is merged in the order given, not in the order of the rows.
+
+    >>> [r["ID"] for r in merge_rows_in_order(rows, "ID", {"d": ["d", "a"]}, join)]
+    ['b', 'c', 'd+a', 'e']
+
+    Side Effects
+    ============
+    Changes groups:
+        Groups that are skipped are removed
+
+    """
+    merge_targets = {
+        variant: target for target, variants in groups.items() for variant in variants
+    }
+    for target in groups:
+        assert merge_targets[target] == target
+    # For every group, the number of members not seen yet
+    missing = {target: len(set(variants)) for target, variants in groups.items()}
+
+    buffer: t.Dict[K, R] = {}
+    order: t.Deque[K] = deque()
+    unknown: t.Set[K] = set()
+    for row in rows:
+        id: K = row[id_column]
+        buffer[id] = row
+        order.append(id)
+        if id in merge_targets:
+            unknown.add(id)
+            target_id = merge_targets[id]
+            missing[target_id] -= 1
+            group = groups[target_id]
+            if not missing[target_id]:
+                try:
+                    merged = merge([buffer[i] for i in group], buffer[target_id])
+                    for i in group:
+                        buffer.pop(i, None)
+                    buffer[target_id] = merged
+                except Skip:
+                    logger.info(f"Merging {target_id} with {group} was skipped.")
+                    del groups[target_id]
+                unknown.difference_update(group)
+
+        while order and order[0] not in unknown:
+            i = order.popleft()
+            if i in buffer:
+                yield buffer.pop(i)
+
+    if unknown:
+        logger.warning(
+            f"Some entries to be merged were not found, so their groups were left unmerged: {sorted(target for target, n in missing.items() if n)}"
+        )
+    for i in order:
+        if i in buffer:
+            yield buffer.pop(i)
+
+
 def merge_forms(
     data: types.Wordlist[
         types.Language_ID,
@@ -469,58 +551,24 @@ def merge_forms(
         Groups that are skipped are removed
 
     """
-    merge_targets = {
-        variant: target
-        for target, variants in homophone_groups.items()
-        for variant in variants
-    }
-    for target in homophone_groups:
-        assert merge_targets[target] == target
-
-    c_f_id = data["FormTable", "id"].name
-
-    buffer: t.Dict[types.Form_ID, types.Form] = {}
-
-    unknown = set()
-    form: types.Form
-    for form in cli.tq(
-        data["FormTable"],
-        task="Going through forms and merging",
+    return merge_rows_in_order(
+        cli.tq(
+            data["FormTable"],
+            task="Going through forms and merging",
+            logger=logger,
+            total=data["FormTable"].common_props.get("dc:extent"),
+        ),
+        data["FormTable", "id"].name,
+        homophone_groups,
+        lambda forms, target: merge_group(
+            forms,
+            target.copy(),  # type: ignore
+            mergers,
+            data,
+            logger,
+        ),
         logger=logger,
-        total=data["FormTable"].common_props.get("dc:extent"),
-    ):
-        id: types.Form_ID = form[c_f_id]
-        buffer[id] = form
-        if id in merge_targets:
-            unknown.add(id)
-            target_id = merge_targets[id]
-            group = homophone_groups[target_id]
-            if all(i in buffer for i in group):
-                try:
-                    buffer[target_id] = merge_group(
-                        [buffer[i] for i in group],
-                        buffer[target_id].copy(),  # type: ignore
-                        mergers,
-                        data,
-                        logger,
-                    )
-
-                    for i in group:
-                        if i != target_id:
-                            del buffer[i]
-                except Skip:
-                    logger.info(
-                        f"Merging form {id} with forms {[f[c_f_id] for f in group]} was skipped."
-                    )
-                    del homophone_groups[id]
-                    pass
-                for i in group:
-                    unknown.remove(i)
-
-        for f in list(buffer):
-            if f in unknown:
-                break
-            yield buffer.pop(f)
+    )
 
 
 def parse_merge_override(string: str) -> t.Tuple[str, Merger]:
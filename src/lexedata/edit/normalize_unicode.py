@@ -5,6 +5,8 @@ Make sure every string entry in every table of the dataset uses NFC unicode
 normalization, or take a list of files that each gets normalized.
 """
 
+import codecs
+import os
 import unicodedata
 from pathlib import Path
 from urllib.parse import urljoin
@@ -12,16 +14,29 @@ from urllib.parse import urljoin
 import pycldf
 
 from lexedata import cli
+from lexedata.util import normalization
 
 
 def n(s: str) -> str:
     return unicodedata.normalize("NFC", s)
 
 
-def normalize(file, original_encoding="utf-8"):
-    # TODO: If this ever takes more than a second, add a cli.tq progress bar
-    content = file.open(encoding=original_encoding).read()
-    file.open("w", encoding=original_encoding).write(n(content))
+def normalize(file: Path, original_encoding="utf-8") -> bool:
+    """Normalize a file to NFC, rewriting it only if anything changes.
+
+    Return whether the file was changed.
+
+    """
+    if codecs.lookup(original_encoding).name in {"utf-8", "utf-8-sig"}:
+        return normalization.normalize_file(file, "NFC")
+    content = file.read_text(encoding=original_encoding)
+    if unicodedata.is_normalized("NFC", content):
+        return False
+    # Replace the file in one go, so that it is never seen half written.
+    temporary = file.with_name(file.name + ".tmp")
+    temporary.write_text(n(content), encoding=original_encoding)
+    os.replace(temporary, file)
+    return True
 
 
 if __name__ == "__main__":
@@ -35,6 +50,13 @@ if __name__ == "__main__":
         help="The file(s) to re-encode. Default: All table files included by the metadata file, though not the sources.",
     )
     parser.add_argument("--from-encoding", default="utf-8", help="original encoding")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes to use for normalizing the files (default: 1)",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
     if not args.file:
@@ -46,6 +68,14 @@ if __name__ == "__main__":
             Path(urljoin(str(args.metadata.absolute()), table.url.string))
             for table in pycldf.Wordlist.from_metadata(args.metadata).tables
         ]
-    for file in args.file:
-        logger.info(f"Normalizing {file}…")
-        normalize(file)
+    if codecs.lookup(args.from_encoding).name in {"utf-8", "utf-8-sig"}:
+        changed = normalization.normalize_files(args.file, "NFC", jobs=args.jobs)
+    else:
+        changed = [file for file in args.file if normalize(file, args.from_encoding)]
+    for file in changed:
+        logger.info(f"Normalized {file}.")
+    logger.info(
+        "%d of %d files needed normalizing.",
+        len(changed),
+        len(args.file),
+    )
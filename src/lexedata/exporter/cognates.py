@@ -506,13 +506,14 @@ def cogsets_and_judgements(
             by_segment=by_segment,
             logger=logger,
         )
+        cogsets, judgements = list(cogsets), list(judgements)
         properties_as_key(cogsets, dataset["CognatesetTable"].tableSchema.columns)
         properties_as_key(judgements, dataset["CognateTable"].tableSchema.columns)
     else:
-        cogsets = util.cache_table(dataset, "CognatesetTable").values()
-        judgements = util.cache_table(dataset, "CognateTable").values()
+        cogsets = list(util.cache_table(dataset, "CognatesetTable").values())
+        judgements = list(util.cache_table(dataset, "CognateTable").values())
 
-    return list(cogsets), list(judgements)
+    return cogsets, judgements
 
 
 if __name__ == "__main__":  # pragma: no cover
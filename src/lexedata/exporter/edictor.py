@@ -225,7 +225,7 @@ def forms_to_tsv(
             cognateset_cache = {c: i for i, c in enumerate(cognatesets, 1)}
 
     # Warn about unexpected non-concatenative ‘morphemes’
-    lexedata.report.nonconcatenative_morphemes.segment_to_cognateset(
+    lexedata.report.nonconcatenative_morphemes.morpheme_intervals(
         dataset, cognatesets, logger
     )
 
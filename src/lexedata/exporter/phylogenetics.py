@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Literal
 
 import lxml.etree as ET
+import numpy as np
 import pycldf
 
 from lexedata import cli, types, util
@@ -33,6 +34,9 @@ def read_cldf_dataset(
     ],
     code_column: t.Optional[str] = None,
     logger: cli.logging.Logger = cli.logger,
+    languages: t.Container[types.Language_ID] = types.WorldSet(),
+    concepts: t.Container[types.Parameter_ID] = types.WorldSet(),
+    cognatesets: t.Container[types.Cognateset_ID] = types.WorldSet(),
 ) -> t.Mapping[
     types.Language_ID, t.Mapping[types.Parameter_ID, t.Set[types.Cognateset_ID]]
 ]:
@@ -49,6 +53,9 @@ def read_cldf_dataset(
     If use_ids == False, the reader is free to choose language names or
     language glottocodes for the output if they are unique.
 
+    Only the given languages, concepts (or features) and cognate sets are
+    read; everything else is skipped while reading the tables.
+
     Examples
     --------
     >>> import tempfile
@@ -83,9 +90,18 @@ def read_cldf_dataset(
 
     # Build actual data dictionary, based on dataset type
     if dataset.module == "Wordlist":
-        return read_wordlist(dataset, code_column, logger=logger)
+        return read_wordlist(
+            dataset,
+            code_column,
+            logger=logger,
+            languages=languages,
+            concepts=concepts,
+            cognatesets=cognatesets,
+        )
     elif dataset.module == "StructureDataset":
-        return read_structure_dataset(dataset, logger=logger)
+        return read_structure_dataset(
+            dataset, logger=logger, languages=languages, features=concepts
+        )
     else:
         raise ValueError("Module {:} not supported".format(dataset.module))
 
@@ -100,82 +116,35 @@ def read_wordlist(
     ],
     code_column: t.Optional[str],
     logger: cli.logging.Logger = cli.logger,
+    languages: t.Container[types.Language_ID] = types.WorldSet(),
+    concepts: t.Container[types.Parameter_ID] = types.WorldSet(),
+    cognatesets: t.Container[types.Cognateset_ID] = types.WorldSet(),
 ) -> t.MutableMapping[types.Language_ID, t.MutableMapping[types.Parameter_ID, t.Set]]:
-    col_map = dataset.column_names
+    """Read the cognate codes of a wordlist, restricted to a subset.
 
-    if code_column:
-        # Just in case that column was specified by property URL. We
-        # definitely want the name. In any case, this will also throw a
-        # helpful KeyError when the column does not exist.
-        form_table_form = col_map.forms.form
-        form_table_column = col_map.forms.id
-        cognatesets = util.cache_table(
-            dataset,
-            columns={
-                "form": form_table_column,
-                "transcription": form_table_form,
-                "code": dataset["FormTable", code_column].name,
-            },
-            filter=lambda row: bool(row[col_map.forms.form]),
-        )
-    else:
-        # We search for cognatesetReferences in the FormTable or a separate
-        # CognateTable.
-
-        # Try the FormTable first.
-        code_column = col_map.forms.cognatesetReference
-
-        if code_column:
-            # This is not the CLDF way, warn the user.
-            form_table_column = col_map.forms.id
-            form_table_form = col_map.forms.form
-            logger.warning(
-                "Your dataset has a cognatesetReference in the FormTable. Consider running lexedata.edit.add_cognate_table to create an explicit cognate table."
-            )
-            cognatesets = util.cache_table(
-                dataset,
-                columns={
-                    "form": form_table_column,
-                    "transcription": form_table_form,
-                    "code": code_column,
-                },
-            )
-        else:
-            # There was no cognatesetReference in the form table. If we
-            # find them in CognateTable (I mean, they should be there!), we
-            # store them keyed with formReference.
-            if (
-                col_map.cognates
-                and col_map.cognates.cognatesetReference
-                and col_map.cognates.formReference
-            ):
-                code_column = col_map.cognates.cognatesetReference
-                form_reference = col_map.cognates.formReference
-                (foreign_key,) = [
-                    key
-                    for key in dataset["CognateTable"].tableSchema.foreignKeys
-                    if key.columnReference == [form_reference]
-                ]
-                (form_table_column,) = foreign_key.reference.columnReference
-                cognatesets = util.cache_table(
-                    dataset,
-                    "CognateTable",
-                    {"form": form_reference, "code": code_column},
-                )
-            else:
-                raise ValueError(
-                    "Dataset has no cognatesetReference column in its "
-                    "primary table or in a separate cognate table. "
-                    "Is this a metadata-free wordlist and you forgot to "
-                    "specify code_column explicitly?"
-                )
+    Forms of languages not in `languages`, forms none of whose concepts are in
+    `concepts`, and judgements for cognate sets not in `cognatesets` are
+    skipped while the tables are read, so they never enter the sets that are
+    constructed here.
 
-    # Cognate sets have been loaded. Consolidate.
-    cognates_by_form: t.MutableMapping[
-        types.Form_ID, t.Set[types.Cognateset_ID]
-    ] = t.DefaultDict(set)
-    for judgement in cognatesets.values():
-        cognates_by_form[judgement["form"]].add(judgement["code"])
+    >>> ds = util.fs.new_wordlist(
+    ...     FormTable=[
+    ...         {"ID": "f1", "Parameter_ID": "c1", "Language_ID": "l1", "Form": "x"},
+    ...         {"ID": "f2", "Parameter_ID": "c2", "Language_ID": "l1", "Form": "y"},
+    ...         {"ID": "f3", "Parameter_ID": "c1", "Language_ID": "l2", "Form": "z"}],
+    ...     CognateTable=[
+    ...         {"ID": "1", "Form_ID": "f1", "Cognateset_ID": "s1"},
+    ...         {"ID": "2", "Form_ID": "f2", "Cognateset_ID": "s2"},
+    ...         {"ID": "3", "Form_ID": "f3", "Cognateset_ID": "s3"}])
+    >>> data = read_wordlist(ds, None, languages={"l1"}, cognatesets={"s1"})
+    >>> {l: dict(c) for l, c in data.items()} == {"l1": {"c1": {"s1"}, "c2": set()}}
+    True
+
+    """
+    col_map = dataset.column_names
+    c_form_id = col_map.forms.id
+    c_form = col_map.forms.form
+    c_language = col_map.forms.languageReference
     parameter_column = col_map.forms.parameterReference
 
     # If one form can have multiple concepts,
@@ -189,6 +158,88 @@ def read_wordlist(
         def all_parameters(parameter):
             return [parameter]
 
+    # Cognate codes may live in the FormTable, either in a column given
+    # explicitly or in a cognatesetReference column. In that case, they are
+    # read in the same pass as the forms.
+    form_table_code: t.Optional[str] = None
+    skip_empty_codes = False
+    if code_column:
+        # Just in case that column was specified by property URL. We
+        # definitely want the name. In any case, this will also throw a
+        # helpful KeyError when the column does not exist.
+        form_table_code = dataset["FormTable", code_column].name
+        form_table_column = c_form_id
+        skip_empty_codes = True
+    elif col_map.forms.cognatesetReference:
+        # This is not the CLDF way, warn the user.
+        form_table_code = col_map.forms.cognatesetReference
+        form_table_column = c_form_id
+        logger.warning(
+            "Your dataset has a cognatesetReference in the FormTable. Consider running lexedata.edit.add_cognate_table to create an explicit cognate table."
+        )
+    elif (
+        col_map.cognates
+        and col_map.cognates.cognatesetReference
+        and col_map.cognates.formReference
+    ):
+        # There was no cognatesetReference in the form table. If we
+        # find them in CognateTable (I mean, they should be there!), we
+        # store them keyed with formReference.
+        form_reference = col_map.cognates.formReference
+        (foreign_key,) = [
+            key
+            for key in dataset["CognateTable"].tableSchema.foreignKeys
+            if key.columnReference == [form_reference]
+        ]
+        (form_table_column,) = foreign_key.reference.columnReference
+    else:
+        raise ValueError(
+            "Dataset has no cognatesetReference column in its "
+            "primary table or in a separate cognate table. "
+            "Is this a metadata-free wordlist and you forgot to "
+            "specify code_column explicitly?"
+        )
+
+    cognates_by_form: t.MutableMapping[
+        types.Form_ID, t.Set[types.Cognateset_ID]
+    ] = t.DefaultDict(set)
+
+    # Read the forms in the subset, keeping only the columns we need.
+    forms: t.List[
+        t.Tuple[
+            types.Form_ID, t.Any, str, types.Language_ID, t.List[types.Parameter_ID]
+        ]
+    ] = []
+    for row in dataset["FormTable"]:
+        language = row[c_language]
+        if language not in languages:
+            continue
+        row_parameters = all_parameters(row[parameter_column])
+        parameters = [p for p in row_parameters if p in concepts]
+        if row_parameters and not parameters:
+            continue
+        if form_table_code is not None:
+            code = row[form_table_code]
+            if (row[c_form] or not skip_empty_codes) and code in cognatesets:
+                cognates_by_form[row[form_table_column]].add(code)
+        forms.append(
+            (row[c_form_id], row[form_table_column], row[c_form], language, parameters)
+        )
+
+    if form_table_code is None:
+        # Read only the judgements of forms and cognate sets in the subset.
+        code_column = col_map.cognates.cognatesetReference
+        subset_forms = {form[1] for form in forms}
+        cognatesets_cache = util.cache_table(
+            dataset,
+            "CognateTable",
+            {"form": form_reference, "code": code_column},
+            filter=lambda row: row[form_reference] in subset_forms
+            and row[code_column] in cognatesets,
+        )
+        for judgement in cognatesets_cache.values():
+            cognates_by_form[judgement["form"]].add(judgement["code"])
+
     data: t.MutableMapping[
         types.Language_ID, t.MutableMapping[types.Parameter_ID, t.Set]
     ]
@@ -199,47 +250,53 @@ def read_wordlist(
             if key.columnReference == [dataset["FormTable", "languageReference"].name]
         ]
         ref_col = langref_target.reference.columnReference[0]
-        data = {lang[ref_col]: t.DefaultDict(set) for lang in dataset["LanguageTable"]}
+        data = {
+            lang[ref_col]: t.DefaultDict(set)
+            for lang in dataset["LanguageTable"]
+            if lang[ref_col] in languages
+        }
     else:
         data = t.DefaultDict(lambda: t.DefaultDict(set))
-    for row in dataset["FormTable"].iterdicts():
-        if not row[col_map.forms.form]:
+    for form_id, form_key, transcription, language, parameters in forms:
+        if not transcription:
             # Transcription is empty, should not be a form. Skip, but maybe
             # warn if it was in a cognateset.
-            if cognates_by_form[row[form_table_column]]:
+            if cognates_by_form[form_key]:
                 logger.warning(
                     "Form %s was given as empty (i.e. the source noted that the form is unknown), but it was judged to be in cognateset %s. I will ignore that cognate judgement.",
-                    row[col_map.forms.id],
-                    cognates_by_form[row[form_table_column]],
+                    form_id,
+                    cognates_by_form[form_key],
                 )
             continue
 
-        language = row[col_map.forms.languageReference]
-        if row[col_map.forms.form] == "-":
-            if cognates_by_form[row[form_table_column]]:
+        if transcription == "-":
+            if cognates_by_form[form_key]:
                 logger.warning(
                     "Form %s was given as '-' (i.e. “concept is not available in language %s”), but it was judged to be in cognateset %s. I will ignore that cognate judgement.",
-                    row[col_map.forms.id],
+                    form_id,
                     language,
-                    cognates_by_form[row[form_table_column]],
+                    cognates_by_form[form_key],
                 )
-                cognates_by_form[row[form_table_column]] = set()
-            for parameter in all_parameters(row[parameter_column]):
+                cognates_by_form[form_key] = set()
+            for parameter in parameters:
                 if data[language][parameter]:
                     logger.warning(
                         "Form %s claims concept %s is not available in language %s, but cognatesets %s are allocated to that concept in that language already.",
-                        row[col_map.forms.id],
+                        form_id,
                         parameter,
-                        row[col_map.forms.languageReference],
+                        language,
                         data[language][parameter],
                     )
-        for parameter in all_parameters(row[parameter_column]):
-            data[language][parameter] |= cognates_by_form[row[form_table_column]]
+        for parameter in parameters:
+            data[language][parameter] |= cognates_by_form[form_key]
     return data
 
 
 def read_structure_dataset(
-    dataset: pycldf.StructureDataset, logger: cli.logging.Logger = cli.logger
+    dataset: pycldf.StructureDataset,
+    logger: cli.logging.Logger = cli.logger,
+    languages: t.Container[types.Language_ID] = types.WorldSet(),
+    features: t.Container[types.Parameter_ID] = types.WorldSet(),
 ) -> t.MutableMapping[types.Language_ID, t.MutableMapping[types.Parameter_ID, t.Set]]:
     col_map = dataset.column_names
     data: t.MutableMapping[
@@ -249,6 +306,8 @@ def read_structure_dataset(
     for row in dataset["ValueTable"]:
         lang_id = row[col_map.values.languageReference]
         feature_id = row[col_map.values.parameterReference]
+        if lang_id not in languages or feature_id not in features:
+            continue
         if row[code_column]:
             data[lang_id][feature_id].add(row[code_column])
     return data
@@ -514,39 +573,60 @@ def root_presence_code(
 
     """
     all_roots: t.Set[types.Cognateset_ID] = set(relevant_concepts)
-    language_roots: t.MutableMapping[
-        types.Language_ID, t.Set[types.Cognateset_ID]
-    ] = t.DefaultDict(set)
-    for language, lexicon in dataset.items():
+    all_roots_sorted: t.Sequence[types.Cognateset_ID] = sorted(all_roots)
+    root_index = {root: r for r, root in enumerate(all_roots_sorted)}
+
+    # Sparse root × relevant-concept incidence, in compressed row form:
+    # The relevant concepts of root r are concept_index[indptr[r]:indptr[r+1]].
+    concepts: t.Dict[types.Parameter_ID, int] = {}
+    concept_index: t.List[int] = []
+    indptr = [0]
+    for root in all_roots_sorted:
+        for concept in relevant_concepts[root]:
+            concept_index.append(concepts.setdefault(concept, len(concepts)))
+        indptr.append(len(concept_index))
+
+    # Language × concept ‘attested’ and language × root ‘present’ matrices
+    languages = list(dataset)
+    attested = np.zeros((len(languages), len(concepts) + 1), dtype=bool)
+    present = np.zeros((len(languages), len(all_roots_sorted) + 1), dtype=bool)
+    for i, (language, lexicon) in enumerate(dataset.items()):
         for concept, cognatesets in lexicon.items():
             if not cognatesets:
                 logger.warning(
                     f"The root presence coder script got a language ({language}) with an improper lexicon: There is a form associated with Concept {concept}, but no cognate sets are associated with it."
                 )
+            else:
+                attested[i, concepts.get(concept, -1)] = True
             for cognateset in cognatesets:
-                language_roots[language].add(cognateset)
-
-    all_roots_sorted: t.Sequence[types.Cognateset_ID] = sorted(all_roots)
+                present[i, root_index.get(cognateset, -1)] = True
+
+    # The number of attested relevant concepts of each root in each language
+    # is the product of the two matrices. For one language at a time, summing
+    # the incidence entries of each root is a difference of cumulative sums at
+    # the row boundaries, so only one language's share of the incidence
+    # entries is ever expanded.
+    starts = np.array(indptr[:-1], dtype=np.intp)
+    ends = np.array(indptr[1:], dtype=np.intp)
+    incidence = np.array(concept_index, dtype=np.intp)
+    n_filled_concepts = np.zeros((len(languages), len(all_roots_sorted)), dtype=int)
+    cumulative = np.zeros(len(concept_index) + 1, dtype=int)
+    for i in range(len(languages)):
+        np.cumsum(attested[i, incidence], out=cumulative[1:])
+        np.subtract(cumulative[ends], cumulative[starts], out=n_filled_concepts[i])
+    n_concepts = ends - starts
+    states = np.where(
+        present[:, :-1],
+        "1",
+        np.where(2 * n_filled_concepts >= n_concepts, "0", "?"),
+    )
 
     alignment = {}
     roots = {}
-    for language, lexicon in dataset.items():
-        alignment[language] = list(ascertainment)
-        for root in all_roots_sorted:
-            roots[root] = len(alignment[language])
-            if root in language_roots[language]:
-                alignment[language].append("1")
-            else:
-                n_concepts = 0
-                n_filled_concepts = 0
-                for concept in relevant_concepts[root]:
-                    n_concepts += 1
-                    if lexicon.get(concept):
-                        n_filled_concepts += 1
-                if 2 * n_filled_concepts >= n_concepts:
-                    alignment[language].append("0")
-                else:
-                    alignment[language].append("?")
+    for i, language in enumerate(languages):
+        alignment[language] = list(ascertainment) + states[i].tolist()
+    if languages:
+        roots = {root: r for r, root in enumerate(all_roots_sorted, len(ascertainment))}
 
     return alignment, roots
 
@@ -914,11 +994,22 @@ if __name__ == "__main__":
     # Step 1: Load the raw data.
     dataset = pycldf.Dataset.from_metadata(args.metadata)
 
-    # Step 1: Load the raw data.
+    # Step 1: Load the raw data. Restricting the cognate sets while reading
+    # gives the same root-meaning coding as excluding their characters
+    # afterwards, but for the other codings, judgements for excluded cognate
+    # sets still inform which concepts are attested, so we keep them.
     ds: t.Mapping[Language_ID, t.Mapping[Parameter_ID, t.Set[Cognateset_ID]]] = {
-        language: {k: v for k, v in sequence.items() if k in args.concepts}
-        for language, sequence in read_cldf_dataset(dataset).items()
-        if language in args.languages
+        language: dict(sequence)
+        for language, sequence in read_cldf_dataset(
+            dataset,
+            languages=args.languages,
+            concepts=args.concepts,
+            cognatesets=(
+                args.cognatesets
+                if args.coding == CodingProcedure.ROOTMEANING
+                else types.WorldSet()
+            ),
+        ).items()
     }
 
     logger.info(f"Exported languages {set(ds)}.")
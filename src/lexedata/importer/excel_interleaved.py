@@ -174,6 +174,7 @@ if __name__ == "__main__":
         help="Path to directory where forms.csv is to be created (default: current working directory)",
     )
     cli.add_log_controls(parser)
+    cli.add_profile_controls(parser)
     args = parser.parse_args()
     logger = cli.setup_logging(args)
 
@@ -1,7 +1,9 @@
+import csv
 import enum
 import typing as t
 from pathlib import Path
 
+import numpy as np
 import pycldf
 from tabulate import tabulate
 
@@ -14,7 +16,52 @@ class Missing(enum.Enum):
     KNOWN = 2
 
 
-def coverage_report(
+class CoverageMatrix:
+    """The number of forms of each language for each concept.
+
+    `counts[l, c]` is the number of counted forms of `languages[l]` for
+    `concepts[c]`. Languages come in the order of the LanguageTable, followed
+    by languages only found in the FormTable. Concepts come in the order of
+    their first form, followed by concepts from the ParameterTable without
+    forms. `names` maps language IDs to language names.
+
+    """
+
+    def __init__(
+        self,
+        languages: t.Mapping[types.Language_ID, str],
+        concepts: t.Sequence[types.Parameter_ID],
+        counts: np.ndarray,
+    ):
+        self.names = dict(languages)
+        self.languages = list(languages)
+        self.concepts = list(concepts)
+        self.counts = counts
+        self.language_index = {l: i for i, l in enumerate(self.languages)}
+        self.concept_index = {c: j for j, c in enumerate(self.concepts)}
+
+    def attested(self) -> np.ndarray:
+        return self.counts > 0
+
+    def write_csv(self, file: t.TextIO) -> None:
+        """Write the matrix as CSV, with one row per language.
+
+        >>> import io
+        >>> output = io.StringIO()
+        >>> CoverageMatrix({"l1": "L1"}, ["c1", "c2"], np.array([[2, 0]])).write_csv(output)
+        >>> print(output.getvalue().replace("\\r", ""))
+        Language_ID,c1,c2
+        l1,2,0
+        <BLANKLINE>
+
+        """
+        writer = csv.writer(file)
+        writer.writerow(["Language_ID"] + self.concepts)
+        for language, row in zip(self.languages, self.counts.tolist()):
+            writer.writerow([language] + row)
+
+
+def coverage_matrix(
     dataset: types.Wordlist[
         types.Language_ID,
         types.Form_ID,
@@ -22,11 +69,16 @@ def coverage_report(
         types.Cognate_ID,
         types.Cognateset_ID,
     ],
-    min_percentage: float = 0.0,
-    with_concept: t.Iterable[types.Parameter_ID] = set(),
     missing: Missing = Missing.KNOWN,
     only_coded: bool = True,
-) -> t.List[t.List[str]]:
+) -> CoverageMatrix:
+    """Count the forms of each language for each concept, in one pass.
+
+    Which forms count depends on `missing` (for forms with #form '' or '-')
+    and `only_coded` (for forms without cognate judgements). All languages are
+    included either way.
+
+    """
     coded: t.Container[types.Form_ID]
     if only_coded:
         try:
@@ -47,16 +99,19 @@ def coverage_report(
             languages[language[c_l_id]] = language[c_l_name]
     except KeyError:
         pass
+    language_index = {language: i for i, language in enumerate(languages)}
 
-    concepts: t.DefaultDict[
-        types.Language_ID, t.Counter[types.Parameter_ID]
-    ] = t.DefaultDict(t.Counter)
+    concept_index: t.Dict[types.Parameter_ID, int] = {}
+    rows: t.List[int] = []
+    columns: t.List[int] = []
     c_f_id = dataset["FormTable", "id"].name
     c_concept = dataset["FormTable", "parameterReference"].name
     c_language = dataset["FormTable", "languageReference"].name
     c_form = dataset["FormTable", "form"].name
     for form in dataset["FormTable"]:
-        languages.setdefault(form[c_language], form[c_language])
+        if form[c_language] not in language_index:
+            languages[form[c_language]] = form[c_language]
+            language_index[form[c_language]] = len(language_index)
         if form[c_f_id] not in coded:
             continue
         if missing == Missing.IGNORE and (not form[c_form] or form[c_form] == "-"):
@@ -65,68 +120,114 @@ def coverage_report(
             continue
         c: types.Parameter_ID
         for c in util.ensure_list(form[c_concept]):
-            concepts[form[c_language]][c] += 1
+            rows.append(language_index[form[c_language]])
+            columns.append(concept_index.setdefault(c, len(concept_index)))
+
+    try:
+        c_c_id = dataset["ParameterTable", "id"].name
+        for concept in dataset["ParameterTable"]:
+            concept_index.setdefault(concept[c_c_id], len(concept_index))
+    except KeyError:
+        pass
+
+    shape = (len(languages), len(concept_index))
+    counts = np.bincount(
+        np.array(rows, dtype=np.int64) * shape[1] + np.array(columns, dtype=np.int64),
+        minlength=shape[0] * shape[1],
+    ).reshape(shape)
+    return CoverageMatrix(languages, list(concept_index), counts)
+
+
+def coverage_report(
+    dataset: types.Wordlist[
+        types.Language_ID,
+        types.Form_ID,
+        types.Parameter_ID,
+        types.Cognate_ID,
+        types.Cognateset_ID,
+    ],
+    min_percentage: float = 0.0,
+    with_concept: t.Iterable[types.Parameter_ID] = set(),
+    missing: Missing = Missing.KNOWN,
+    only_coded: bool = True,
+    matrix: t.Optional[CoverageMatrix] = None,
+) -> t.List[t.List[str]]:
+    """Summarize the coverage of each language.
+
+    For each language that has at least `min_percentage` of all concepts
+    and forms for all concepts in `with_concept`, list its ID, its name, the
+    number of primary concepts it has forms for, the proportion of all
+    concepts it has forms for, and its average number of forms per concept.
+
+    If `matrix` is given, it must have been built by `coverage_matrix` with
+    the same `missing` and `only_coded` arguments.
+
+    """
+    if matrix is None:
+        matrix = coverage_matrix(dataset, missing=missing, only_coded=only_coded)
+    attested = matrix.attested()
 
     # load primary concepts and number of concepts
-    primary_concepts: t.Container[types.Parameter_ID]
     try:
         c_c_id = dataset["ParameterTable", "id"].name
-        primary_concepts = [
+        primary_concepts = {
             c[c_c_id] for c in dataset["ParameterTable"] if c["Primary"]
-        ]
+        }
+        primary = np.array([c in primary_concepts for c in matrix.concepts], dtype=bool)
         total_number_concepts = len(primary_concepts)
     except KeyError:
         cli.logger.warning(
             "ParameterTable doesn't contain a column 'Primary'. Primary concepts couldn't be loaded. "
             "Loading all concepts."
         )
-        primary_concepts = types.WorldSet()
+        primary = np.ones(len(matrix.concepts), dtype=bool)
 
         try:
             total_number_concepts = len(list(dataset["ParameterTable"]))
         except KeyError:
-            total_number_concepts = len(
-                set.union(*(set(cs) for cs in concepts.values()))
-            )
+            total_number_concepts = int(attested.any(axis=0).sum())
 
-    data_languages = []
-    for language, name in languages.items():
-        conceptlist = concepts[language]
-        try:
-            synonyms = sum(conceptlist.values()) / len(conceptlist)
-        except ZeroDivisionError:
-            synonyms = float("nan")
+    number_concepts = attested.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        synonyms = matrix.counts.sum(axis=1) / number_concepts
+        # percentage of all concepts covered by each language
+        conceptlist_percentage = number_concepts / total_number_concepts
 
-        # percentage of all concepts covered by this language
-        conceptlist_percentage = len(conceptlist) / total_number_concepts
-        if conceptlist_percentage * 100 < min_percentage:
-            continue
+    selected = conceptlist_percentage * 100 >= min_percentage
+    for c in with_concept:
+        try:
+            selected &= attested[:, matrix.concept_index[c]]
+        except KeyError:
+            selected[:] = False
 
-        if not all(c in conceptlist for c in with_concept):
-            continue
+    # count primary concepts
+    primary_count = (attested & primary).sum(axis=1)
 
-        # count primary concepts
-        primary_count = 0
-        for c in conceptlist:
-            if c in primary_concepts:
-                primary_count += 1
-        # if args.languages_only:
-        #     print(language)
-        data_languages.append(
-            [
-                language,
-                name,
-                primary_count,
-                conceptlist_percentage,
-                synonyms,
-            ]
-        )
-    return data_languages
+    return [
+        [
+            language,
+            matrix.names[language],
+            int(primary_count[i]),
+            float(conceptlist_percentage[i]),
+            float(synonyms[i]),
+        ]
+        for i, language in enumerate(matrix.languages)
+        if selected[i]
+    ]
 
 
 def coverage_report_concepts(
     dataset: pycldf.Dataset,
+    matrix: t.Optional[CoverageMatrix] = None,
 ):
+    """List the concepts with forms, and how many languages attest them.
+
+    All forms count here. Concepts that are not primary are listed with no
+    languages. If `matrix` is given, it must have been built by
+    `coverage_matrix` with `missing=Missing.COUNT_NORMALLY` and
+    `only_coded=False`.
+
+    """
     # TODO: This assumes the existence of a ParameterTable. The script should
     # still work if none exists. TODO: In addition, we decided to not formalize
     # primary concepts, so this should instead depend on a command line
@@ -134,54 +235,131 @@ def coverage_report_concepts(
     c_c_id = dataset["ParameterTable", "id"].name
     try:
         # Load primary concepts if possible.
-        primary_concepts = [
+        primary_concepts = {
             c[c_c_id] for c in dataset["ParameterTable"] if c["Primary"]
-        ]
+        }
     except KeyError:
         cli.logger.warning(
             "ParamterTable doesn't contain a column 'Primary'. Primary concepts couldn't be loaded. "
             "Loading all concepts."
         )
-        primary_concepts = [c[c_c_id] for c in dataset["ParameterTable"]]
-    # get the foreign keys pointing to the required tables
-    foreign_key_parameter = ""
-    for foreign_key in dataset["FormTable"].tableSchema.foreignKeys:
-        if foreign_key.reference.resource == dataset["ParameterTable"].url:
-            foreign_key_parameter = foreign_key.columnReference[0]
-
-    foreign_key_language = ""
-    for foreign_key in dataset["FormTable"].tableSchema.foreignKeys:
-        if foreign_key.reference.resource == dataset["LanguageTable"].url:
-            foreign_key_language = foreign_key.columnReference[0]
-
-    multiple_concepts = bool(dataset["FormTable", "parameterReference"].separator)
-    c_concept = foreign_key_parameter
-    c_language = foreign_key_language
+        primary_concepts = {c[c_c_id] for c in dataset["ParameterTable"]}
+
+    if matrix is None:
+        matrix = coverage_matrix(
+            dataset, missing=Missing.COUNT_NORMALLY, only_coded=False
+        )
     # for each concept count the languages
-    concepts_to_languages: t.DefaultDict[str, t.List[str]] = t.DefaultDict(list)
-    for form in dataset["FormTable"]:
-        if multiple_concepts:
-            language = form[c_language]
-            for concept in form[c_concept]:
-                if (
-                    language not in concepts_to_languages[concept]
-                    and concept in primary_concepts
-                ):
-                    concepts_to_languages[concept].append(language)
-        else:
-            concept = form[c_concept]
-            language = form[c_language]
-            if (
-                language not in concepts_to_languages[concept]
-                and concept in primary_concepts
-            ):
-                concepts_to_languages[concept].append(language)
-
-    data_concepts = []
-    for k, v in concepts_to_languages.items():
-        data_concepts.append([k, len(set(v))])
-
-    return data_concepts
+    languages = matrix.attested().sum(axis=0)
+    with_forms = matrix.counts.any(axis=0)
+
+    return [
+        [concept, int(languages[j]) if concept in primary_concepts else 0]
+        for j, concept in enumerate(matrix.concepts)
+        if with_forms[j]
+    ]
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def concept_bitsets(attested: np.ndarray) -> np.ndarray:
+    """Pack each row of a boolean matrix into a bitset of 64-bit words.
+
+    >>> concept_bitsets(np.array([[True] * 3 + [False] * 62 + [True]])).shape
+    (1, 2)
+
+    """
+    packed = np.packbits(attested, axis=1)
+    packed = np.pad(packed, ((0, 0), (0, -packed.shape[1] % 8)))
+    return packed.view(np.uint64)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Count the set bits along the last axis of an array of 64-bit words.
+
+    >>> popcount(concept_bitsets(np.array([[True] * 3 + [False] * 62 + [True]])))
+    array([4])
+
+    """
+    try:
+        bits = np.bitwise_count(words)
+    except AttributeError:
+        # NumPy before 2.0 has no popcount, so look the bytes up in a table.
+        bits = _BYTE_POPCOUNT[words.view(np.uint8)]
+    return bits.sum(axis=-1, dtype=np.int64)
+
+
+def coverage_overlap(
+    matrix: CoverageMatrix, languages: t.Optional[t.Sequence[types.Language_ID]] = None
+) -> np.ndarray:
+    """Count the concepts attested in both languages, for every pair of languages.
+
+    Entry `[i, j]` is the number of concepts that both `languages[i]` and
+    `languages[j]` (by default: all languages of the matrix) have forms for.
+    The diagonal holds the number of concepts of each language.
+
+    >>> matrix = CoverageMatrix(
+    ...     {"l1": "", "l2": "", "l3": ""}, ["c1", "c2", "c3"],
+    ...     np.array([[1, 1, 0], [1, 2, 1], [0, 0, 1]]))
+    >>> coverage_overlap(matrix)
+    array([[2, 2, 0],
+           [2, 3, 1],
+           [0, 1, 1]])
+
+    """
+    if languages is None:
+        languages = matrix.languages
+    bits = concept_bitsets(
+        matrix.attested()[[matrix.language_index[language] for language in languages]]
+    )
+    overlap = np.zeros((len(languages), len(languages)), dtype=np.int64)
+    for i in range(len(languages)):
+        overlap[i, i:] = popcount(bits[i] & bits[i:])
+        overlap[i:, i] = overlap[i, i:]
+    return overlap
+
+
+def greedy_covered_subset(
+    matrix: CoverageMatrix,
+    languages: t.Optional[t.Sequence[types.Language_ID]] = None,
+    min_overlap: int = 0,
+) -> t.List[t.Tuple[types.Language_ID, int]]:
+    """Suggest languages that together cover many concepts.
+
+    Start with the language with the most concepts, and then repeatedly add
+    the language that leaves the most concepts attested in all languages
+    chosen so far, as long as at least `min_overlap` such concepts remain.
+    Return the chosen languages, each with the number of concepts attested in
+    it and all languages before it. Cutting this list at any point gives a
+    set of languages with that many concepts in common.
+
+    >>> matrix = CoverageMatrix(
+    ...     {"l1": "", "l2": "", "l3": ""}, ["c1", "c2", "c3"],
+    ...     np.array([[1, 1, 0], [1, 2, 1], [0, 0, 1]]))
+    >>> greedy_covered_subset(matrix)
+    [('l2', 3), ('l1', 2), ('l3', 0)]
+    >>> greedy_covered_subset(matrix, min_overlap=1)
+    [('l2', 3), ('l1', 2)]
+
+    """
+    if languages is None:
+        languages = matrix.languages
+    bits = concept_bitsets(
+        matrix.attested()[[matrix.language_index[language] for language in languages]]
+    )
+    available = np.ones(len(languages), dtype=bool)
+    common = np.full(bits.shape[1], np.iinfo(np.uint64).max, dtype=np.uint64)
+    subset: t.List[t.Tuple[types.Language_ID, int]] = []
+    while available.any():
+        counts = np.where(available, popcount(bits & common), -1)
+        best = int(np.argmax(counts))
+        if counts[best] < min_overlap:
+            break
+        subset.append((languages[best], int(counts[best])))
+        common &= bits[best]
+        available[best] = False
+    return subset
 
 
 if __name__ == "__main__":
@@ -242,6 +420,26 @@ if __name__ == "__main__":
         "KNOWN: count NA forms ('-') as if they were normal forms; "
         "(default: KNOWN)",
     )
+    parser.add_argument(
+        "--matrix",
+        type=Path,
+        metavar="FILE",
+        help="Also write the full matrix of form counts, with one row per language and one column per concept, to FILE as CSV",
+    )
+    parser.add_argument(
+        "--overlap",
+        action="store_true",
+        default=False,
+        help="Output separate reports with the number of concepts each pair of matching languages has in common, "
+        "and with a selection of languages that together cover many concepts",
+    )
+    parser.add_argument(
+        "--min-overlap",
+        default=0,
+        type=int,
+        metavar="N",
+        help="Stop the selection of languages for --overlap when fewer than N concepts would be attested in all of them (default: 0)",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
 
@@ -251,13 +449,19 @@ if __name__ == "__main__":
         cli.Exit.INVALID_DATASET(
             "You must specify the path to a valid metadata file (--metadata path/to/Filename-metadata.json)."
         )
+    missing = Missing.__members__[args.missing]
+    matrix = coverage_matrix(dataset, missing=missing, only_coded=args.coded)
     data = coverage_report(
         dataset,
         args.min_percentage,
         args.with_concepts,
-        missing=Missing.__members__[args.missing],
+        missing=missing,
         only_coded=args.coded,
+        matrix=matrix,
     )
+    if args.matrix:
+        with args.matrix.open("w", encoding="utf-8", newline="") as file:
+            matrix.write_csv(file)
 
     # TODO: consider generic way of writing the header
     if args.languages_only:
@@ -279,10 +483,16 @@ if __name__ == "__main__":
         )
 
         if args.concept_report:
-            data = coverage_report_concepts(dataset=dataset)
+            concept_data = coverage_report_concepts(
+                dataset=dataset,
+                # The concept report counts all forms.
+                matrix=matrix
+                if missing == Missing.COUNT_NORMALLY and not args.coded
+                else None,
+            )
             print(
                 tabulate(
-                    data,
+                    concept_data,
                     headers=[
                         "Concept_ID",
                         "Language_Count",
@@ -291,3 +501,28 @@ if __name__ == "__main__":
                     numalign="right",
                 )
             )
+
+        if args.overlap:
+            languages = [language[0] for language in data]
+            overlap = coverage_overlap(matrix, languages)
+            print(
+                tabulate(
+                    [
+                        [language, *counts]
+                        for language, counts in zip(languages, overlap.tolist())
+                    ],
+                    headers=["Language_ID", *languages],
+                    stralign="left",
+                    numalign="right",
+                )
+            )
+            print(
+                tabulate(
+                    greedy_covered_subset(
+                        matrix, languages, min_overlap=args.min_overlap
+                    ),
+                    headers=["Language_ID", "Concepts in all languages so far"],
+                    stralign="left",
+                    numalign="right",
+                )
+            )
@@ -12,6 +12,7 @@ reports. Those automatic fixes should be made more obvious.
 
 """
 
+import codecs
 import typing as t
 import unicodedata
 from pathlib import Path
@@ -19,7 +20,13 @@ from pathlib import Path
 import pycldf
 
 from lexedata import cli, types, util
-from lexedata.report.judgements import check_cognate_table
+from lexedata.util import normalization
+from lexedata.util.fs import table_dialect
+from lexedata.report.judgements import (  # noqa: F401
+    CognateTableCheck,
+    check_cognate_table,
+)
+from lexedata.util.validation import Check, run_checks
 
 # from clldutils.misc import log_or_raise
 
@@ -92,62 +99,124 @@ def check_id_format(dataset: pycldf.Dataset, logger: cli.logging.Logger = cli.lo
     return correct
 
 
+class NoSeparatorInIdsCheck(Check):
+    """Check that IDs do not contain the separator of a column referencing them."""
+
+    independent_tables = True
+
+    def __init__(
+        self, dataset: pycldf.Dataset, logger: cli.logging.Logger = cli.logger
+    ):
+        super().__init__(dataset, logger)
+        # Check that reference columns that have a separator don't contain the separator inside a string value
+        self.forbidden_separators: t.Dict[
+            str, t.Dict[str, t.Dict[str, t.List[t.Tuple[str, str]]]]
+        ] = {}
+        for table in dataset.tables:
+            for foreign_key in table.tableSchema.foreignKeys:
+                try:
+                    (referencing_column,) = foreign_key.columnReference
+                    (referenced_column,) = foreign_key.reference.columnReference
+                except ValueError:
+                    # Multi-column foreign key. We *could* check that there's not a
+                    # reference column hidden in there, but we don't.
+                    continue
+
+                if table.get_column(referencing_column).separator is None:
+                    continue
+
+                self.forbidden_separators.setdefault(
+                    foreign_key.reference.resource.__str__(), {}
+                ).setdefault(referenced_column, {}).setdefault(
+                    table.get_column(referencing_column).separator, []
+                ).append(
+                    (table.url.string, referencing_column)
+                )
+        self.tables = set(self.forbidden_separators)
+
+    def visit_row(self, table, r, row, fname, line):
+        targets = self.forbidden_separators[table.url.string]
+        for target_column, separators_forbidden_here in targets.items():
+            for separator, forbidden_by in separators_forbidden_here.items():
+                if separator in row[target_column]:
+                    log_or_raise(
+                        f"In table {table.url.string}, row {r} column {target_column} contains {separator}, which is also the separator of {forbidden_by}.",
+                        log=self.logger,
+                    )
+                    self.valid = False
+
+
 def check_no_separator_in_ids(
     dataset: pycldf.Dataset, logger: cli.logger = cli.logger
 ) -> bool:
-    valid = True
-    # Check that reference columns that have a separator don't contain the separator inside a string value
-    forbidden_separators: t.MutableMapping[
-        str, t.MutableMapping[str, t.MutableMapping[str, t.List[t.Tuple[str, str]]]]
-    ] = t.DefaultDict(lambda: t.DefaultDict(lambda: t.DefaultDict(list)))
-    for table in dataset.tables:
-        for foreign_key in table.tableSchema.foreignKeys:
-            try:
-                (referencing_column,) = foreign_key.columnReference
-                (referenced_column,) = foreign_key.reference.columnReference
-            except ValueError:
-                # Multi-column foreign key. We *could* check that there's not a
-                # reference column hidden in there, but we don't.
-                continue
-
-            if table.get_column(referencing_column).separator is None:
-                continue
-
-            forbidden_separators[foreign_key.reference.resource.__str__()][
-                referenced_column
-            ][table.get_column(referencing_column).separator].append(
-                (table.url.string, referencing_column)
+    return run_checks(dataset, [NoSeparatorInIdsCheck(dataset, logger)])
+
+
+class UnicodeCheck(Check):
+    """Check that all string values are normalized unicode.
+
+    Only the first value that is not normalized in each table is reported.
+
+    The table files are first scanned as bytes (see
+    `lexedata.util.normalization`), using `jobs` processes. Only the tables
+    whose files are not normalized, or cannot be scanned that way, are then
+    checked value by value.
+
+    """
+
+    independent_tables = True
+
+    def __init__(
+        self,
+        dataset: pycldf.Dataset,
+        unicode_form: str = "NFC",
+        logger: cli.logging.Logger = cli.logger,
+        jobs: int = 1,
+    ):
+        super().__init__(dataset, logger)
+        self.unicode_form = unicode_form
+        self.reported: t.Set[str] = set()
+        files: t.Dict[str, Path] = {}
+        for table in dataset.tables:
+            fname = table.url.resolve(dataset.directory)
+            if (
+                isinstance(fname, Path)
+                and fname.exists()
+                and codecs.lookup(table_dialect(dataset, table).python_encoding).name
+                in {"utf-8", "utf-8-sig"}
+            ):
+                files[table.url.string] = fname
+            else:
+                self.tables.add(table.url.string)
+        unnormalized = set(
+            normalization.unnormalized_files(
+                list(files.values()), unicode_form, jobs=jobs
             )
-
-    for table, targets in forbidden_separators.items():
-        for r, row in enumerate(dataset[table], 1):
-            for target_column, separators_forbidden_here in targets.items():
-                for separator, forbidden_by in separators_forbidden_here.items():
-                    if separator in row[target_column]:
-                        log_or_raise(
-                            f"In table {table}, row {r} column {target_column} contains {separator}, which is also the separator of {forbidden_by}.",
-                            log=logger,
-                        )
-                        valid = False
-    return valid
+        )
+        self.tables |= {url for url, path in files.items() if path in unnormalized}
+
+    def visit_row(self, table, r, row, fname, line):
+        if table.url.string in self.reported:
+            return
+        for value in row.values():
+            if isinstance(value, str):
+                if not unicodedata.is_normalized(self.unicode_form, value):
+                    log_or_raise(
+                        message=f"Value {value} of row {r} in table {table.url} is not in {self.unicode_form} normalized unicode",
+                        log=self.logger,
+                    )
+                    self.valid = False
+                    self.reported.add(table.url.string)
+                    return
 
 
 def check_unicode_data(
     dataset: pycldf.Dataset,
     unicode_form: str = "NFC",
     logger: cli.logging.Logger = cli.logger,
+    jobs: int = 1,
 ) -> bool:
-    for table in dataset.tables:
-        for r, row in enumerate(table, 1):
-            for value in row.values():
-                if isinstance(value, str):
-                    if not unicodedata.is_normalized(unicode_form, value):
-                        log_or_raise(
-                            message=f"Value {value} of row {r} in table {table.url} is not in {unicode_form} normalized unicode",
-                            log=logger,
-                        )
-                        return False
-    return True
+    return run_checks(dataset, [UnicodeCheck(dataset, unicode_form, logger, jobs)])
 
 
 def check_foreign_keys(
@@ -198,6 +267,53 @@ def check_foreign_keys(
     return valid
 
 
+class NaFormCheck(Check):
+    """Check that NA forms have no alternative for their language and concept."""
+
+    def __init__(
+        self,
+        dataset: types.Wordlist[
+            types.Language_ID,
+            types.Form_ID,
+            types.Parameter_ID,
+            types.Cognate_ID,
+            types.Cognateset_ID,
+        ],
+        logger: cli.logging.Logger = cli.logger,
+    ):
+        super().__init__(dataset, logger)
+        self.c_f_id = dataset["FormTable", "id"].name
+        self.c_f_form = dataset["FormTable", "form"].name
+        self.c_f_concept = dataset["FormTable", "parameterReference"].name
+        self.c_f_language = dataset["FormTable", "languageReference"].name
+        self.forms_by_language_and_concept: t.Dict[
+            t.Tuple[types.Language_ID, types.Parameter_ID], t.Set[types.Form_ID]
+        ] = t.DefaultDict(set)
+        self.na_forms: t.List[t.Dict[str, t.Any]] = []
+        self.tables = {dataset["FormTable"].url.string}
+
+    def visit_row(self, table, r, row, fname, line):
+        for c in util.ensure_list(row[self.c_f_concept]):
+            self.forms_by_language_and_concept[row[self.c_f_language], c].add(
+                row[self.c_f_id]
+            )
+        if row[self.c_f_form] == "-":
+            self.na_forms.append(row)
+
+    def finish(self) -> bool:
+        for form in self.na_forms:
+            for c in util.ensure_list(form[self.c_f_concept]):
+                if self.forms_by_language_and_concept[form[self.c_f_language], c] != {
+                    form[self.c_f_id]
+                }:
+                    log_or_raise(
+                        message=f"Non empty forms exist for the NA form {form[self.c_f_id]} with identical parameter and language reference",
+                        log=self.logger,
+                    )
+                    self.valid = False
+        return self.valid
+
+
 def check_na_form_has_no_alternative(
     dataset: types.Wordlist[
         types.Language_ID,
@@ -208,33 +324,7 @@ def check_na_form_has_no_alternative(
     ],
     logger: cli.logging.Logger = cli.logger,
 ):
-    valid = True
-    c_f_id = dataset["FormTable", "id"].name
-    c_f_form = dataset["FormTable", "form"].name
-    c_f_concept = dataset["FormTable", "parameterReference"].name
-    c_f_language = dataset["FormTable", "languageReference"].name
-    forms_by_concepts: t.Dict[types.Parameter_ID, t.Set[types.Form_ID]] = t.DefaultDict(
-        set
-    )
-
-    for f in dataset["FormTable"]:
-        for c in util.ensure_list(f[c_f_concept]):
-            forms_by_concepts[c].add(f[c_f_id])
-    forms_to_languages = t.DefaultDict(set)
-    for f in dataset["FormTable"]:
-        forms_to_languages[f[c_f_language]].add(f[c_f_id])
-    na_forms = [f for f in dataset["FormTable"] if f[c_f_form] == "-"]
-    for form in na_forms:
-        for c in util.ensure_list(form[c_f_concept]):
-            if forms_by_concepts[c].intersection(
-                forms_to_languages[form[c_f_language]]
-            ) != {form[c_f_id]}:
-                log_or_raise(
-                    message=f"Non empty forms exist for the NA form {form[c_f_id]} with identical parameter and language reference",
-                    log=logger,
-                )
-                valid = False
-    return valid
+    return run_checks(dataset, [NaFormCheck(dataset, logger)])
 
 
 if __name__ == "__main__":
@@ -243,6 +333,13 @@ if __name__ == "__main__":
         description=__doc__.split("\n\n\n")[0],
         epilog=__doc__.split("\n\n\n")[1],
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes to use for checking the tables (default: 1)",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
 
@@ -262,19 +359,23 @@ if __name__ == "__main__":
     # Check reference properties/foreign keys
     correct &= check_foreign_keys(dataset, logger=logger)
 
-    # no ID of a reference that contains separators may contain that separator
-    correct &= check_no_separator_in_ids(dataset=dataset, logger=logger)
-
-    #  All files should be in NFC normalized unicode
-    correct &= check_unicode_data(dataset, unicode_form="NFC", logger=logger)
+    # The remaining checks look at the data, and share one pass through each table.
+    checks: t.List[Check] = [
+        # no ID of a reference that contains separators may contain that separator
+        NoSeparatorInIdsCheck(dataset, logger=logger),
+        #  All files should be in NFC normalized unicode
+        UnicodeCheck(dataset, unicode_form="NFC", logger=logger, jobs=args.jobs),
+    ]
 
     if dataset.module == "Wordlist":
         # Check segment slice separator is space
         correct &= check_segmentslice_separator(dataset=dataset, logger=logger)
 
         # Check that the CognateTable makes sense
-        correct &= check_cognate_table(dataset=dataset, logger=logger)
+        checks.append(CognateTableCheck(dataset=dataset, logger=logger))
 
         # NA forms may exist, but only if there is no actual form for the
         # concept and the language, and probably given some other constraints.
-        correct &= check_na_form_has_no_alternative(dataset=dataset, logger=logger)
+        checks.append(NaFormCheck(dataset=dataset, logger=logger))
+
+    correct &= run_checks(dataset, checks, jobs=args.jobs)
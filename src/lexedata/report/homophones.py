@@ -4,27 +4,156 @@ List all groups of homophones in the dataset, together with (if available) the
 minimal spanning tree according to clics, in order to identify polysemies vs.
 accidental homophones
 
+With --max-distance, forms that differ only slightly, such as in diacritics or
+brackets, are also reported as homophones.
+
 """
 import io
 import sys
 import typing as t
+from collections import Counter, defaultdict
 from pathlib import Path
 
 import networkx as nx
 import pycldf
 
 import lexedata.cli as cli
-from lexedata.util import load_clics
+from lexedata import util
+from lexedata.util.clics import ClicsIndex, load_clics_index
+
+
+def normalize_form(form: str) -> str:
+    """Reduce a form to the key used for finding near-homophones.
+
+    The form is transliterated like `util.edit_distance` does, and everything
+    that is not a letter or digit, such as brackets, stress and syllable
+    marks, is dropped.
+
+    >>> normalize_form("(e.)ta.'kɾã")
+    'etakra'
+
+    """
+    return "".join(c for c in util.transliterate(form) if c.isalnum())
+
+
+def qgrams(string: str, q: int = 2) -> t.Set[t.Tuple[str, int]]:
+    """List the q-grams of a padded string, numbering repeated q-grams.
+
+    Because repeated q-grams are numbered, the size of the intersection of two
+    such sets is the number of q-grams the strings share.
+
+    >>> sorted(qgrams("aa"))
+    [('#a', 0), ('a#', 0), ('aa', 0)]
+    >>> sorted(qgrams("aaa"))
+    [('#a', 0), ('a#', 0), ('aa', 0), ('aa', 1)]
+
+    """
+    padded = "#" * (q - 1) + string + "#" * (q - 1)
+    seen: t.Counter[str] = Counter()
+    grams = set()
+    for i in range(len(padded) - q + 1):
+        gram = padded[i : i + q]
+        grams.add((gram, seen[gram]))
+        seen[gram] += 1
+    return grams
+
+
+def near_homophone_groups(
+    forms: t.Iterable[str], max_distance: float, q: int = 2
+) -> t.List[t.List[str]]:
+    """Group the forms of one language that are (nearly) identical.
+
+    Forms are compared by their normalized form (see `normalize_form`), and
+    forms with the same normalized form always end up in the same group.
+    Different normalized forms are grouped if their `util.edit_distance` is
+    at most `max_distance`. Where `max_distance` is small compared to the
+    length of the forms, two forms can only be that close if they share
+    enough q-grams, so such pairs are found through an index from q-grams to
+    normalized forms instead of comparing all pairs. Pairs of forms that are
+    short enough to be close without sharing any q-gram are all compared.
+
+    >>> near_homophone_groups(["kata", "(ka)ta", "ka.ta", "kala", "mu"], 0.0)
+    [['kata', '(ka)ta', 'ka.ta'], ['kala'], ['mu']]
+    >>> near_homophone_groups(["kata", "(ka)ta", "ka.ta", "kala", "mu"], 0.25)
+    [['kata', '(ka)ta', 'ka.ta', 'kala'], ['mu']]
+    >>> near_homophone_groups(["ab", "ba"], 0.5)
+    [['ab', 'ba']]
+
+    """
+    by_key: t.Dict[str, t.List[str]] = {}
+    for form in forms:
+        by_key.setdefault(normalize_form(form), []).append(form)
+    keys = list(by_key)
+
+    parent = list(range(len(keys)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if max_distance > 0:
+
+        def threshold(length: int) -> t.Tuple[int, int]:
+            """Give the edits allowed between strings of at most this length,
+            and the q-grams such strings must share to be that close."""
+            # Allow for rounding errors in max_distance * length
+            edits = int(max_distance * length + 1e-9)
+            # Every edit (or swap) destroys at most q+1 of the length+q-1
+            # q-grams, so pairs sharing fewer cannot be close enough.
+            return edits, length + q - 1 - edits * (q + 1)
+
+        index: t.DefaultDict[t.Tuple[str, int], t.List[int]] = defaultdict(list)
+        by_length: t.DefaultDict[int, t.List[int]] = defaultdict(list)
+        for i, key in enumerate(keys):
+            shared: t.Counter[int] = Counter()
+            for gram in qgrams(key, q):
+                shared.update(index[gram])
+                index[gram].append(i)
+            candidates: t.Set[int] = set()
+            for other_length, others in by_length.items():
+                edits, min_shared = threshold(max(len(key), other_length))
+                if abs(len(key) - other_length) > edits:
+                    continue
+                if min_shared <= 0:
+                    # Such pairs may share no q-gram at all, so the index
+                    # cannot find them: Compare them all.
+                    candidates.update(others)
+                else:
+                    candidates.update(j for j in others if shared[j] >= min_shared)
+            by_length[len(key)].append(i)
+            for j in candidates:
+                if util.edit_distance(key, keys[j]) <= max_distance:
+                    parent[find(i)] = find(j)
+
+    groups: t.Dict[int, t.List[str]] = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(find(i), []).extend(by_key[key])
+    return list(groups.values())
 
 
 def list_homophones(
-    dataset: pycldf.Dataset, out: io.TextIOBase, logger: cli.logging.Logger = cli.logger
+    dataset: pycldf.Dataset,
+    out: io.TextIOBase,
+    logger: cli.logging.Logger = cli.logger,
+    max_distance: t.Optional[float] = None,
 ) -> None:
-    clics = load_clics()
-    # warn if clics cannot be loaded
-    if not clics:
-        logger.warning("Clics could not be loaded. Using an empty graph instead")
-        clics = nx.Graph()
+    clics: t.Optional[ClicsIndex] = None
+
+    def get_clics() -> ClicsIndex:
+        # Only load CLICS when the first group of homophones needs it.
+        nonlocal clics
+        if clics is None:
+            try:
+                clics = load_clics_index()
+            except FileNotFoundError:
+                # warn if clics cannot be loaded
+                logger.warning(
+                    "Clics could not be loaded. Using an empty graph instead"
+                )
+                clics = ClicsIndex(nx.Graph())
+        return clics
 
     c_id = dataset["ParameterTable", "id"].name
     try:
@@ -57,7 +186,12 @@ def list_homophones(
         else:
             homophones[form[f_lang]][form[f_form]].add((form[f_concept], form[f_id]))
     for lang, forms in homophones.items():
-        for form, meanings in forms.items():
+        if max_distance is None:
+            groups = [[form] for form in forms]
+        else:
+            groups = near_homophone_groups(forms, max_distance)
+        for group in groups:
+            meanings = set().union(*(forms[form] for form in group))
             if len(meanings) == 1:
                 continue
             clics_nodes = {concepticon.get(concept) for concept, _ in meanings}
@@ -66,13 +200,18 @@ def list_homophones(
             else:
                 x = ":"
             clics_nodes -= {None}
-            if len(clics_nodes) <= 1:
+            connected = (
+                get_clics().connected({str(n) for n in clics_nodes})
+                if len(clics_nodes) > 1
+                else None
+            )
+            if connected is None:
                 x = "Unknown" + x
-            elif nx.is_connected(clics.subgraph(clics_nodes)):
+            elif connected:
                 x = "Connected" + x
             else:
                 x = "Unconnected" + x
-            line = f"{lang}, '{form}': {x}\n"
+            line = "{:}, '{:}': {:}\n".format(lang, "', '".join(group), x)
             for ele in sorted(meanings):
                 line += f"\t {ele[-1]} ({', '.join(ele[0:-1])})\n"
             out.write(line)
@@ -86,6 +225,12 @@ if __name__ == "__main__":
         help="Path to output file (default: output to stdout)",
         type=Path,
     )
+    parser.add_argument(
+        "--max-distance",
+        type=float,
+        default=None,
+        help="Also group forms that are nearly identical: Forms are compared after removing diacritics, brackets and other non-letters, and grouped if their normalized edit distance is at most MAX_DISTANCE. With 0, only forms that differ in those marks are grouped. (default: Only group identical forms)",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
     list_homophones(
@@ -94,4 +239,5 @@ if __name__ == "__main__":
         if args.output_file
         else sys.stdout,
         logger=logger,
+        max_distance=args.max_distance,
     )
@@ -8,16 +8,15 @@ from pathlib import Path
 import pycldf
 
 from lexedata import cli
-from lexedata.util import cache_table, parse_segment_slices
+from lexedata.util import parse_segment_slices
+from lexedata.util.validation import Check, run_checks
 
 
 def log_or_raise(message, logger=cli.logger):
     logger.warning(message)
 
 
-def check_cognate_table(
-    dataset: pycldf.Wordlist, logger=cli.logger, strict_concatenative=False
-) -> bool:
+class CognateTableCheck(Check):
     """Check that the CognateTable makes sense.
 
     The cognate table MUST have an indication of forms, in a #formReference
@@ -33,123 +32,137 @@ def check_cognate_table(
     If checking for strictly concatenative morphology, also check that the
     segment slice is a contiguous, non-overlapping section of the form.
 
-    Having no cognates is a valid choice for a dataset, so this function returns True if no CognateTable was found.
+    Having no cognates is a valid choice for a dataset, so this check passes if no CognateTable was found.
+
+    The forms are collected while the referenced FormTable streams by, and the
+    judgements are checked while the CognateTable does.
 
     """
 
-    # First, load all forms that are referenced in the CognateTable
-
-    try:
-        cognatetable = dataset["CognateTable"]
-    except KeyError:
-        # Having no cognates is a valid choice for a dataset.
-        return True
-
-    try:
-        c_form = dataset["CognateTable", "formReference"].name
-    except KeyError:
-        log_or_raise("CognateTable does not have a #formReference column.")
-        # All further checks don't make sense, return early.
-        return False
-
-    try:
-        c_cognateset = dataset["CognateTable", "cognatesetReference"].name
-    except KeyError:
-        log_or_raise("CognateTable does not have a #cognatesetReference column.")
-        # All further checks don't make sense, return early.
-        return False
-
-    # The CLDF specifications state that foreign key references take precedence
-    # over the implicit semantics of a `#xxxReference` column pointing to an
-    # `#id` column, so we need to find forms by the stated foreign key
-    # relationship.
-    for foreign_key in cognatetable.tableSchema.foreignKeys:
-        if foreign_key.columnReference == [c_form]:
-            referenced_table = str(foreign_key.reference.resource)
-            # A multi-column column reference for a single-column foreign key
-            # makes no sense, so use tuple unpacking to extract the only
-            # element from that list.
-            (referenced_column,) = foreign_key.reference.columnReference
-            if (
-                not dataset[referenced_table].common_props["dc:conformsTo"]
-                == "http://cldf.clld.org/v1.0/terms.rdf#FormTable"
-            ):
-                log_or_raise(
-                    "CognateTable #formReference does not reference a FormTable.",
-                )
-            break
-    else:
-        log_or_raise("CognateTable #formReference must be a foreign key.")
-        # All further checks don't make sense, return early.
-        return False
-
-    try:
-        c_sslice = dataset["CognateTable", "segmentSlice"].name
-    except KeyError:
-        logger.info("CognateTable does not have a #segmentSlice column.")
-        c_sslice = None
-
-    try:
-        c_alignment = dataset["CognateTable", "alignment"].name
-    except KeyError:
-        logger.info("CognateTable does not have an #alignment column.")
-        c_alignment = None
-
-    if c_sslice is None and c_alignment is None:
-        # No additional data concerning the associations between forms and
-        # cognate sets. That's sad, but valid.
-        # All further checks don't make sense, return early.
-        return True
-
-    try:
-        c_f_form = dataset[referenced_table, "form"].name
-
-        def form_given(row):
-            return row[c_f_form] and row[c_f_form].strip() != "-"
-
-    except KeyError:
-        if dataset[referenced_table] == dataset["FormTable"]:
-            log_or_raise("FormTable does not have a #form column.")
-
-        def form_given(row):
-            return True
+    def __init__(
+        self, dataset: pycldf.Wordlist, logger=cli.logger, strict_concatenative=False
+    ):
+        super().__init__(dataset, logger)
+        self.strict_concatenative = strict_concatenative
 
-    # Check whether each row is valid.
-    all_judgements_okay = True
-    forms = cache_table(
-        dataset,
-        columns={"segments": dataset[referenced_table, "segments"].name},
-        table=referenced_table,
-        index_column=referenced_column,
-        filter=form_given,
-    )
-    missing_forms = cache_table(
-        dataset,
-        columns={},
-        table=referenced_table,
-        index_column=referenced_column,
-        filter=lambda row: not form_given(row),
-    )
-    cognateset_alignment_lengths: t.DefaultDict[t.Any, t.Set[int]] = t.DefaultDict(set)
+        try:
+            cognatetable = dataset["CognateTable"]
+        except KeyError:
+            # Having no cognates is a valid choice for a dataset.
+            return
+
+        try:
+            self.c_form = dataset["CognateTable", "formReference"].name
+        except KeyError:
+            log_or_raise("CognateTable does not have a #formReference column.")
+            # All further checks don't make sense, return early.
+            self.valid = False
+            return
 
-    for f, j, judgement in dataset["CognateTable"].iterdicts(with_metadata=True):
         try:
-            form_segments = forms[judgement[c_form]]["segments"]
+            self.c_cognateset = dataset["CognateTable", "cognatesetReference"].name
         except KeyError:
-            if judgement[c_form] in missing_forms:
+            log_or_raise("CognateTable does not have a #cognatesetReference column.")
+            # All further checks don't make sense, return early.
+            self.valid = False
+            return
+
+        # The CLDF specifications state that foreign key references take precedence
+        # over the implicit semantics of a `#xxxReference` column pointing to an
+        # `#id` column, so we need to find forms by the stated foreign key
+        # relationship.
+        for foreign_key in cognatetable.tableSchema.foreignKeys:
+            if foreign_key.columnReference == [self.c_form]:
+                referenced_table = str(foreign_key.reference.resource)
+                # A multi-column column reference for a single-column foreign key
+                # makes no sense, so use tuple unpacking to extract the only
+                # element from that list.
+                (self.referenced_column,) = foreign_key.reference.columnReference
+                if (
+                    not dataset[referenced_table].common_props["dc:conformsTo"]
+                    == "http://cldf.clld.org/v1.0/terms.rdf#FormTable"
+                ):
+                    log_or_raise(
+                        "CognateTable #formReference does not reference a FormTable.",
+                    )
+                break
+        else:
+            log_or_raise("CognateTable #formReference must be a foreign key.")
+            # All further checks don't make sense, return early.
+            self.valid = False
+            return
+
+        try:
+            self.c_sslice = dataset["CognateTable", "segmentSlice"].name
+        except KeyError:
+            logger.info("CognateTable does not have a #segmentSlice column.")
+            self.c_sslice = None
+
+        try:
+            self.c_alignment = dataset["CognateTable", "alignment"].name
+        except KeyError:
+            logger.info("CognateTable does not have an #alignment column.")
+            self.c_alignment = None
+
+        if self.c_sslice is None and self.c_alignment is None:
+            # No additional data concerning the associations between forms and
+            # cognate sets. That's sad, but valid.
+            # All further checks don't make sense, return early.
+            return
+
+        try:
+            self.c_f_form: t.Optional[str] = dataset[referenced_table, "form"].name
+        except KeyError:
+            if dataset[referenced_table] == dataset["FormTable"]:
+                log_or_raise("FormTable does not have a #form column.")
+            self.c_f_form = None
+
+        self.c_f_segments = dataset[referenced_table, "segments"].name
+        self.form_table = dataset[referenced_table].url.string
+        self.cognate_table = cognatetable.url.string
+        self.forms: t.Dict[t.Any, t.List[str]] = {}
+        self.missing_forms: t.Set[t.Any] = set()
+        self.cognateset_alignment_lengths: t.DefaultDict[
+            t.Any, t.Set[int]
+        ] = t.DefaultDict(set)
+        self.tables = {self.form_table, self.cognate_table}
+
+    def form_given(self, row) -> bool:
+        if self.c_f_form is None:
+            return True
+        return bool(row[self.c_f_form] and row[self.c_f_form].strip() != "-")
+
+    def visit_row(self, table, r, row, fname, line):
+        if table.url.string == self.form_table:
+            if self.form_given(row):
+                self.forms[row[self.referenced_column]] = row[self.c_f_segments]
+            else:
+                self.missing_forms.add(row[self.referenced_column])
+        if table.url.string == self.cognate_table:
+            self.check_judgement(fname, line, row)
+
+    def check_judgement(self, f, j, judgement):
+        """Check one row of the CognateTable."""
+        c_sslice = self.c_sslice
+        c_alignment = self.c_alignment
+        c_cognateset = self.c_cognateset
+        try:
+            form_segments = self.forms[judgement[self.c_form]]
+        except KeyError:
+            if judgement[self.c_form] in self.missing_forms:
                 log_or_raise(
                     "In {}, row {}: NA form {} was judged to be in cognate set.".format(
-                        f, j, judgement[c_form]
+                        f, j, judgement[self.c_form]
                     ),
                 )
             # The case of a missing foreign key in general is already handled
             # by the basic CLDF validator.
-            continue
+            return
 
         if c_sslice is not None:
             if not judgement[c_sslice]:
                 log_or_raise("In {}, row {}: Empty segment slice".format(f, j))
-                continue
+                return
             try:
                 included_segments = list(parse_segment_slices(judgement[c_sslice]))
                 if (
@@ -164,9 +177,9 @@ def check_cognate_table(
                             form_segments,
                         ),
                     )
-                    all_judgements_okay = False
-                    continue
-                if strict_concatenative:
+                    self.valid = False
+                    return
+                if self.strict_concatenative:
                     s1 = included_segments[0]
                     for s2 in included_segments[1:]:
                         if s2 != s1 + 1:
@@ -188,14 +201,14 @@ def check_cognate_table(
                         judgement[c_sslice],
                     )
                 )
-                all_judgements_okay = False
-                continue
+                self.valid = False
+                return
         else:
             included_segments = list(range(len(form_segments)))
 
         if c_alignment:
             # Length of alignment should match length of every other alignment in this cognate set.
-            lengths = cognateset_alignment_lengths[judgement[c_cognateset]]
+            lengths = self.cognateset_alignment_lengths[judgement[c_cognateset]]
             alignment_length = len(judgement[c_alignment])
             if lengths and alignment_length not in lengths:
                 log_or_raise(
@@ -204,7 +217,7 @@ def check_cognate_table(
                     ),
                 )
                 lengths.add(alignment_length)
-                all_judgements_okay = False
+                self.valid = False
             elif not lengths:
                 lengths.add(alignment_length)
 
@@ -229,9 +242,27 @@ def check_cognate_table(
                         f, j, actual_segments, without_gaps, comment
                     ),
                 )
-                all_judgements_okay = False
+                self.valid = False
 
-    return all_judgements_okay
+
+def check_cognate_table(
+    dataset: pycldf.Wordlist, logger=cli.logger, strict_concatenative=False
+) -> bool:
+    """Check that the CognateTable makes sense.
+
+    See `CognateTableCheck` for the details of what is checked. Having no
+    cognates is a valid choice for a dataset, so this function returns True if
+    no CognateTable was found.
+
+    """
+    return run_checks(
+        dataset,
+        [
+            CognateTableCheck(
+                dataset, logger=logger, strict_concatenative=strict_concatenative
+            )
+        ],
+    )
 
 
 if __name__ == "__main__":
@@ -1,4 +1,3 @@
-import itertools
 import sys
 import typing as t
 from pathlib import Path
@@ -7,10 +6,14 @@ import networkx.algorithms.community
 import pycldf
 
 from lexedata import cli, types, util
-from lexedata.util import indices_to_segment_slice, parse_segment_slices
+from lexedata.util.intervals import (
+    MorphemeIntervals,
+    parse_segment_ranges,
+    ranges_length,
+)
 
 
-def segment_to_cognateset(
+def morpheme_intervals(
     dataset: types.Wordlist[
         types.Language_ID,
         types.Form_ID,
@@ -20,21 +23,31 @@ def segment_to_cognateset(
     ],
     cognatesets: t.Container[types.Cognateset_ID],
     logger: cli.logging.Logger = cli.logger,
-) -> t.Mapping[types.Form_ID, t.List[t.Set[types.Cognateset_ID]]]:
+) -> t.Dict[types.Form_ID, MorphemeIntervals]:
+    """Collect the segment ranges of the cognate judgements of each form.
+
+    Forms without a form (missing and NA forms) are left out. Judgements with
+    invalid segment slices, or of cognatesets not in `cognatesets`, are
+    skipped, and judgements that point outside the segments of their form are
+    cut to fit.
+
+    """
     # required fields
     c_cognate_cognateset = dataset.column_names.cognates.cognatesetReference
     c_cognate_id = dataset.column_names.cognates.id
     c_cognate_form = dataset.column_names.cognates.formReference
     c_cognate_slice = dataset.column_names.cognates.segmentSlice
+    c_form_id = dataset.column_names.forms.id
+    c_form_form = dataset.column_names.forms.form
+    c_form_segments = dataset.column_names.forms.segments
 
-    forms = util.cache_table(dataset)
     cognateset_cache: t.Container[types.Cognateset_ID]
     if "CognatesetTable" in dataset:
         c_s_id = dataset["CognatesetTable", "id"].name
         cognateset_cache = {
             cognateset[c_s_id]
             for cognateset in dataset["CognatesetTable"]
-            if cognatesets is None or cognateset["ID"] in cognatesets
+            if cognatesets is None or cognateset[c_s_id] in cognatesets
         }
     else:
         if cognatesets is None:
@@ -42,80 +55,106 @@ def segment_to_cognateset(
         else:
             cognateset_cache = cognatesets
 
-    which_segment_belongs_to_which_cognateset: t.Mapping[
-        types.Form_ID, t.List[t.Set[types.Cognateset_ID]]
-    ] = {
-        f: [set() for _ in form["segments"]]
-        for f, form in forms.items()
-        if form["form"] and form["form"].strip() and form["form"].strip() != "-"
+    intervals: t.Dict[types.Form_ID, MorphemeIntervals] = {
+        form[c_form_id]: MorphemeIntervals(len(form[c_form_segments]))
+        for form in dataset["FormTable"]
+        if form[c_form_form]
+        and form[c_form_form].strip()
+        and form[c_form_form].strip() != "-"
     }
     for j in dataset["CognateTable"]:
-        if j[c_cognate_form] in forms and j[c_cognate_cognateset] in cognateset_cache:
-            form = forms[j[c_cognate_form]]
-            if j[c_cognate_form] not in which_segment_belongs_to_which_cognateset:
+        form = intervals.get(j[c_cognate_form])
+        if form is None or j[c_cognate_cognateset] not in cognateset_cache:
+            continue
+        if j.get(c_cognate_slice):
+            try:
+                ranges = parse_segment_ranges(j[c_cognate_slice])
+            except ValueError:
+                logger.warning(
+                    f"In judgement {j[c_cognate_id]}, segment slice {','.join(j[c_cognate_slice])} has start after end."
+                )
                 continue
-            if j.get(c_cognate_slice):
-                try:
-                    segments_judged = list(parse_segment_slices(j[c_cognate_slice]))
-                except ValueError:
-                    logger.warning(
-                        f"In judgement {j[c_cognate_id]}, segment slice {','.join(j[c_cognate_slice])} has start after end."
-                    )
-                    continue
-            else:
-                segments_judged = list(range(len(form["segments"])))
-            old_s = None
-
-            for s in segments_judged:
-                if old_s is not None and old_s + 1 != s:
-                    logger.warning(
-                        f"In judgement {j[c_cognate_id]}, segment {s+1} follows segment {old_s}, so the morpheme is non-contiguous"
-                    )
-                try:
-                    cognatesets = which_segment_belongs_to_which_cognateset[
-                        j[c_cognate_form]
-                    ][s]
-                except IndexError:
-                    logger.warning(
-                        f"In judgement {j[c_cognate_id]}, segment slice {','.join(j[c_cognate_slice])} points outside valid range 1:{len(form['segments'])}."
-                    )
-                    continue
-                cognatesets.add(j[c_cognate_cognateset])
-
-    return which_segment_belongs_to_which_cognateset
+        else:
+            ranges = [(0, form.length)]
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            if start != end:
+                logger.warning(
+                    f"In judgement {j[c_cognate_id]}, segment {start + 1} follows segment {end}, so the morpheme is non-contiguous"
+                )
+        if any(start < 0 or end > form.length for start, end in ranges):
+            logger.warning(
+                f"In judgement {j[c_cognate_id]}, segment slice {','.join(j[c_cognate_slice])} points outside valid range 1:{form.length}."
+            )
+            ranges = [(max(start, 0), min(end, form.length)) for start, end in ranges]
+        form.add(j[c_cognate_cognateset], ranges)
 
+    return intervals
 
-def network_of_overlaps(
-    which_segment_belongs_to_which_cognateset: t.Mapping[
-        types.Form_ID, t.List[t.Set[types.Cognateset_ID]]
+
+def segment_to_cognateset(
+    dataset: types.Wordlist[
+        types.Language_ID,
+        types.Form_ID,
+        types.Parameter_ID,
+        types.Cognate_ID,
+        types.Cognateset_ID,
     ],
+    cognatesets: t.Container[types.Cognateset_ID],
+    logger: cli.logging.Logger = cli.logger,
+) -> t.Mapping[types.Form_ID, t.List[t.Set[types.Cognateset_ID]]]:
+    """List the set of cognatesets of each segment of each form.
+
+    This expands the result of `morpheme_intervals`, which is much more
+    compact for long forms.
+
+    """
+    return {
+        form: intervals.segment_sets()
+        for form, intervals in morpheme_intervals(dataset, cognatesets, logger).items()
+    }
+
+
+def network_of_overlaps(
+    morpheme_intervals: t.Mapping[types.Form_ID, MorphemeIntervals],
     forms_cache: t.Optional[t.Mapping[types.Form_ID, types.Form]] = None,
+    logger: cli.logging.Logger = cli.logger,
 ) -> t.Set[t.Tuple[types.Cognateset_ID, types.Cognateset_ID]]:
+    """Find the pairs of cognatesets that share many segments in some form.
+
+    Two cognatesets are connected if, in some form, at least half the
+    segments of one of them are also in the other.
+
+    """
     mergers: t.Set[t.Tuple[types.Cognateset_ID, types.Cognateset_ID]] = set()
 
-    for form, cogsets in which_segment_belongs_to_which_cognateset.items():
-        if [cs for cs in cogsets if len(cs) > 1]:
+    for form, intervals in morpheme_intervals.items():
+        overlaps = list(intervals.overlaps())
+        if overlaps:
             logger.warning(
                 f"In form {form}, segments are associated with multiple cognate sets."
             )
-            for c1, c2 in itertools.combinations(sorted(set.union(*cogsets)), 2):
-                s1 = {i for i, cs in enumerate(cogsets) if c1 in cs}
-                s2 = {i for i, cs in enumerate(cogsets) if c2 in cs}
-                if s1 & s2:
-                    as_text = ",".join(indices_to_segment_slice(sorted(s1 & s2)))
-                    if forms_cache:
-                        as_text = "{} ({})".format(
-                            as_text,
-                            " ".join(
-                                forms_cache.get(form)["segments"][i]
-                                for i in sorted(s1 & s2)
-                            ),
-                        )
-                    logger.info(
-                        f"In form {form}, segments {as_text} are in both cognate sets {c1} and {c2}."
-                    )
-                    if len(s1 & s2) >= min(len(s1), len(s2)) / 2:
-                        mergers.add((c1, c2))
+        for c1, c2, shared in overlaps:
+            as_text = ",".join(f"{start + 1:d}:{end:d}" for start, end in shared)
+            if forms_cache:
+                segments = forms_cache.get(form)["segments"]
+                as_text = "{} ({})".format(
+                    as_text,
+                    " ".join(
+                        segments[i] for start, end in shared for i in range(start, end)
+                    ),
+                )
+            logger.info(
+                f"In form {form}, segments {as_text} are in both cognate sets {c1} and {c2}."
+            )
+            if (
+                ranges_length(shared)
+                >= min(
+                    ranges_length(intervals.ranges(c1)),
+                    ranges_length(intervals.ranges(c2)),
+                )
+                / 2
+            ):
+                mergers.add((c1, c2))
     return mergers
 
 
@@ -169,7 +208,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     logger = cli.setup_logging(args)
     dataset = pycldf.Dataset.from_metadata(args.metadata)
-    which_segment_belongs_to_which_cognateset = segment_to_cognateset(
+    intervals = morpheme_intervals(
         dataset=dataset,
         cognatesets=args.cognatesets,
         logger=logger,
@@ -181,8 +220,9 @@ if __name__ == "__main__":
 
     cluster_overlaps(
         network_of_overlaps(
-            which_segment_belongs_to_which_cognateset,
+            intervals,
             forms_cache=util.cache_table(dataset),
+            logger=logger,
         ),
         out,
     )
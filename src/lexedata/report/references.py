@@ -0,0 +1,191 @@
+"""Check that all references between the tables of a dataset resolve.
+
+pycldf's validator checks the foreign keys row by row, parsing every value of
+every column on the way. This report reads only the referenced and the
+referencing columns, as raw strings in chunks of rows, collects the values of
+each referenced column into a set once, and compares them with the values of
+each foreign key column (splitting list-valued columns at their separator) by
+set differences. Missing references are reported by table and column, with
+counts.
+
+"""
+
+import typing as t
+from collections import Counter
+from pathlib import Path
+
+import csvw
+import pycldf
+
+from lexedata import cli
+from lexedata.util.fs import read_column_chunks, table_dialect, trimmer
+
+
+class MissingReferences(t.NamedTuple):
+    table: str
+    column: str
+    target_table: str
+    target_column: str
+    values: t.Counter[t.Any]
+
+
+def references(
+    column: csvw.Column,
+    raw: t.Mapping[str, int],
+    trim: t.Optional[t.Callable[[str], str]] = str.strip,
+) -> t.Counter[t.Any]:
+    """Count the values referenced in a column, given counts of its raw strings.
+
+    Empty and null values are no references, list-valued columns are split at
+    their separator. Only the distinct values are parsed by the column's
+    datatype.
+
+    >>> column = csvw.Column.fromvalue({"name": "Parameter_ID", "separator": ";"})
+    >>> references(column, Counter(["a;b", " b", "", "c;;a"]))
+    Counter({'a': 2, 'b': 2, 'c': 1})
+
+    """
+    separator = column.inherit("separator")
+    counts: t.Counter[str] = Counter()
+    for value, n in raw.items():
+        if trim is not None:
+            value = trim(value)
+        if separator:
+            for part in value.split(separator):
+                counts[part] += n
+        else:
+            counts[value] += n
+    for value in {""} | set(column.inherit_null()):
+        counts.pop(value, None)
+    return parse_values(column, counts)
+
+
+def parse_values(column: csvw.Column, values: t.Counter[str]) -> t.Counter[t.Any]:
+    """Parse distinct raw values by the datatype of the column.
+
+    String columns (the usual case for IDs) need no parsing at all. Values that
+    cannot be parsed are kept as they are.
+
+    """
+    datatype = column.inherit("datatype")
+    if datatype is None or datatype.base == "string":
+        return values
+    parsed: t.Counter[t.Any] = Counter()
+    for value, count in values.items():
+        try:
+            parsed[datatype.read(value)] += count
+        except ValueError:
+            parsed[value] += count
+    return parsed
+
+
+def find_missing_references(
+    dataset: pycldf.Dataset,
+) -> t.List[MissingReferences]:
+    """Find all values of foreign key columns that reference nothing.
+
+    Every table is read once, and only its key and reference columns, of which
+    only the distinct values with their counts are kept. Return the missing
+    references of each foreign key that has any, in the order of tables and
+    foreign keys in the metadata. Multi-column foreign keys are not checked.
+
+    """
+    foreign_keys: t.List[t.Tuple[csvw.Table, str, str, str]] = []
+    needed: t.Dict[str, t.List[str]] = {}
+    for table in dataset.tables:
+        for key in table.tableSchema.foreignKeys:
+            try:
+                (column,) = key.columnReference
+                (target_column,) = key.reference.columnReference
+            except ValueError:
+                # Multi-column foreign key. We *could* check those, but we don't.
+                continue
+            target_table = dataset[str(key.reference.resource)].url.string
+            foreign_keys.append((table, column, target_table, target_column))
+            needed.setdefault(table.url.string, []).append(column)
+            needed.setdefault(target_table, []).append(target_column)
+
+    raw: t.Dict[t.Tuple[str, str], t.Counter[str]] = {}
+    for url, columns in cli.tq(
+        needed.items(), task="Reading the key columns", total=len(needed)
+    ):
+        columns = list(dict.fromkeys(columns))
+        counts: t.Dict[str, t.Counter[str]] = {c: Counter() for c in columns}
+        for chunk in read_column_chunks(dataset, dataset[url], columns):
+            for column, values in chunk.items():
+                counts[column].update(values)
+        for column, values in counts.items():
+            raw[url, column] = values
+
+    keys: t.Dict[t.Tuple[str, str], t.Set[t.Any]] = {}
+    missing_references = []
+    for table, column, target_table, target_column in foreign_keys:
+        if (target_table, target_column) not in keys:
+            target = dataset[target_table].get_column(target_column)
+            keys[target_table, target_column] = set(
+                references(
+                    target,
+                    raw[target_table, target_column],
+                    trim=trimmer(table_dialect(dataset, dataset[target_table])),
+                )
+            )
+        referenced = references(
+            table.get_column(column),
+            raw[table.url.string, column],
+            trim=trimmer(table_dialect(dataset, table)),
+        )
+        missing = referenced.keys() - keys[target_table, target_column]
+        if missing:
+            missing_references.append(
+                MissingReferences(
+                    table.url.string,
+                    column,
+                    target_table,
+                    target_column,
+                    Counter({value: referenced[value] for value in missing}),
+                )
+            )
+    return missing_references
+
+
+def check_references(
+    dataset: pycldf.Dataset, logger: cli.logging.Logger = cli.logger, examples=5
+) -> bool:
+    """Check that all references resolve, and report those that don't.
+
+    Return whether all references resolve.
+
+    """
+    valid = True
+    for missing in find_missing_references(dataset):
+        valid = False
+        logger.warning(
+            "In table %s, column %s: %d references (%d distinct values) to %s, column %s are missing, most often %s.",
+            missing.table,
+            missing.column,
+            sum(missing.values.values()),
+            len(missing.values),
+            missing.target_table,
+            missing.target_column,
+            ", ".join(str(value) for value, _ in missing.values.most_common(examples)),
+        )
+    return valid
+
+
+if __name__ == "__main__":
+    parser = cli.parser(__package__ + "." + Path(__file__).stem, description=__doc__)
+    parser.add_argument(
+        "--examples",
+        type=int,
+        default=5,
+        help="Number of missing values to list for each column (default: 5)",
+    )
+    args = parser.parse_args()
+    logger = cli.setup_logging(args)
+
+    dataset = pycldf.Dataset.from_metadata(args.metadata)
+
+    if check_references(dataset, logger=logger, examples=args.examples):
+        logger.info("All references resolve.")
+    else:
+        cli.Exit.INVALID_DATASET()
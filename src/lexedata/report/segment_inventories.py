@@ -5,17 +5,99 @@ Report the phonemes (or whatever is represented by the #segments column) for
 each language, each with frequencies and whether the segments are valid CLTS.
 """
 
+import contextlib
+import functools
 import typing as t
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from pathlib import Path
 
 import pycldf
 from tabulate import tabulate
 
 from lexedata import cli, types
-from lexedata.edit.add_segments import bipa
+from lexedata.edit.add_segments import get_bipa
+from lexedata.util.fs import read_column_chunks, table_dialect, trimmer
 
+R = t.TypeVar("R")
 
-def count_segments(
+CHUNK_SIZE = 1 << 16
+
+
+def merge_counts(
+    counts: t.MutableMapping[types.Language_ID, t.Counter[str]],
+    other: t.Mapping[types.Language_ID, t.Counter[str]],
+) -> t.MutableMapping[types.Language_ID, t.Counter[str]]:
+    """Add the segment counts of each language in `other` to `counts`.
+
+    >>> merge_counts({"l1": Counter("aab")}, {"l1": Counter("b"), "l2": Counter("c")})
+    {'l1': Counter({'a': 2, 'b': 2}), 'l2': Counter({'c': 1})}
+
+    """
+    for language, sounds in other.items():
+        try:
+            counts[language].update(sounds)
+        except KeyError:
+            counts[language] = Counter(sounds)
+    return counts
+
+
+def count_chunk(
+    chunk: t.Tuple[t.Sequence[types.Language_ID], t.Sequence[str]],
+    languages: t.Container[types.Language_ID],
+    separator: str = " ",
+    trim: t.Optional[t.Callable[[str], str]] = str.strip,
+) -> t.Dict[types.Language_ID, t.Counter[str]]:
+    """Count the segments of each language in a chunk of raw FormTable rows.
+
+    The chunk consists of the language IDs of the rows and their segments, as
+    strings with the segments joined by `separator`.
+
+    >>> count_chunk((["l1", "l2", "l1"], ["t a", "", " t e"]), {"l1", "l2"})
+    {'l1': Counter({'t': 2, 'a': 1, 'e': 1})}
+
+    """
+    by_language: t.Dict[types.Language_ID, t.List[str]] = {}
+    for language, segments in zip(*chunk):
+        if segments and language in languages:
+            try:
+                by_language[language].append(segments)
+            except KeyError:
+                by_language[language] = [segments]
+    counts = {}
+    for language, strings in by_language.items():
+        if trim is not None:
+            strings = list(map(trim, strings))
+        counts[language] = Counter(
+            filter(None, separator.join(strings).split(separator))
+        )
+    return counts
+
+
+def bounded_map(
+    pool: Executor,
+    function: t.Callable[[t.Tuple[t.Sequence[types.Language_ID], t.Sequence[str]]], R],
+    chunks: t.Iterable[t.Tuple[t.Sequence[types.Language_ID], t.Sequence[str]]],
+    window: int,
+) -> t.Iterator[t.Tuple[t.Sequence[types.Language_ID], R]]:
+    """Map a function over chunks in a pool, with at most `window` chunks in flight.
+
+    Unlike `pool.map`, this does not read all chunks before the first result
+    comes back. Yield the language IDs of each chunk with its result, in order.
+
+    """
+    pending: t.Deque[t.Tuple[t.Sequence[types.Language_ID], Future]] = deque()
+    for chunk in chunks:
+        pending.append((chunk[0], pool.submit(function, chunk)))
+        if len(pending) >= window:
+            ids, future = pending.popleft()
+            yield ids, future.result()
+    while pending:
+        ids, future = pending.popleft()
+        yield ids, future.result()
+
+
+def iter_segment_counts(
     dataset: types.Wordlist[
         types.Language_ID,
         types.Form_ID,
@@ -23,30 +105,103 @@ def count_segments(
         types.Cognate_ID,
         types.Cognateset_ID,
     ],
-    languages: t.Container[types.Language_ID],
-):
+    languages: t.Container[types.Language_ID] = types.WorldSet(),
+    jobs: int = 1,
+    chunksize: int = CHUNK_SIZE,
+) -> t.Iterator[t.Tuple[types.Language_ID, t.Counter[str]]]:
+    """Count the segments of each language, yielding each language when it is done.
+
+    Only the language and segments columns of the FormTable are read, first
+    the language column alone to find the last form of each language, then
+    both columns chunk by chunk. The chunks are counted, with more than one
+    job in a pool of processes with a few chunks in flight at a time, and the
+    counts of the chunks are merged in order. A language is yielded
+    as soon as the chunk with its last form has been merged, so languages come
+    in the order of their last form in the FormTable.
+
+    """
     c_f_language = dataset["FormTable", "languageReference"].name
     try:
-        c_f_segments = dataset["FormTable", "segments"].name
+        segments_column = dataset["FormTable", "segments"]
     except KeyError:
         cli.Exit.NO_SEGMENTS(
             """Segment invertories report requires your dataset to have segments in the FormTable.
         Run `lexedata.edit.add_segments` to automatically add segments based on your forms."""
         )
-    counter: t.MutableMapping[t.Counter[str]] = t.DefaultDict(t.Counter)
-    for form in cli.tq(
-        dataset["FormTable"],
-        total=dataset["FormTable"].common_props.get("dc:extent"),
-        task="Reading all forms",
-    ):
-        if form[c_f_language] in languages:
-            counter[form[c_f_language]].update(form[c_f_segments])
-    return counter
+    table = dataset["FormTable"]
+    trim = trimmer(table_dialect(dataset, table))
+
+    def language_ids(chunk: t.Dict[str, t.List[str]]) -> t.List[types.Language_ID]:
+        ids = chunk[c_f_language]
+        return ids if trim is None else list(map(trim, ids))
 
+    # A first pass over the language column finds the last form of each language
+    last: t.Dict[types.Language_ID, int] = {}
+    n_rows = 0
+    for chunk in read_column_chunks(dataset, table, [c_f_language], chunksize):
+        ids = language_ids(chunk)
+        for r, language in enumerate(ids, n_rows):
+            if language in languages:
+                last[language] = r
+        n_rows += len(ids)
+    finished = sorted(last, key=last.__getitem__, reverse=True)
 
+    count = functools.partial(
+        count_chunk,
+        languages=languages,
+        separator=segments_column.inherit("separator") or " ",
+        trim=trim,
+    )
+    chunks = (
+        (language_ids(chunk), chunk[segments_column.name])
+        for chunk in read_column_chunks(
+            dataset, table, [c_f_language, segments_column.name], chunksize
+        )
+    )
+    counts: t.Dict[types.Language_ID, t.Counter[str]] = {}
+    with contextlib.ExitStack() as stack:
+        if jobs > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+            results: t.Iterator[
+                t.Tuple[t.Sequence[types.Language_ID], t.Dict[str, t.Counter[str]]]
+            ] = bounded_map(pool, count, chunks, window=2 * jobs)
+        else:
+            results = ((chunk[0], count(chunk)) for chunk in chunks)
+        start = 0
+        for ids, chunk_counts in cli.tq(
+            results,
+            task="Counting the segments",
+            total=-(-n_rows // chunksize),
+        ):
+            merge_counts(counts, chunk_counts)
+            start += len(ids)
+            while finished and last[finished[-1]] < start:
+                language = finished.pop()
+                yield language, counts.pop(language, Counter())
+
+
+def count_segments(
+    dataset: types.Wordlist[
+        types.Language_ID,
+        types.Form_ID,
+        types.Parameter_ID,
+        types.Cognate_ID,
+        types.Cognateset_ID,
+    ],
+    languages: t.Container[types.Language_ID],
+    jobs: int = 1,
+) -> t.Dict[types.Language_ID, t.Counter[str]]:
+    """Count the segments of each language, using `jobs` processes."""
+    return dict(iter_segment_counts(dataset, languages, jobs=jobs))
+
+
+@functools.lru_cache(maxsize=None)
 def comment_on_sound(sound: str) -> str:
     """Return a comment on the sound, if necessary.
 
+    The comments are cached, so each sound is looked up in BIPA only once,
+    however many languages it occurs in.
+
     >>> comment_on_sound("a")
     ''
     >>> comment_on_sound("_")
@@ -55,13 +210,26 @@ def comment_on_sound(sound: str) -> str:
     'Invalid BIPA'
 
     """
-    if bipa[sound].type in {"vowel", "consonant", "tone"}:
+    sound_type = get_bipa()[sound].type
+    if sound_type in {"vowel", "consonant", "tone"}:
         return ""
-    if bipa[sound].type in {"marker"}:
+    if sound_type in {"marker"}:
         return "Marker"
     return "Invalid BIPA"
 
 
+def language_report(scounts: t.Counter[str]) -> str:
+    """Tabulate the segment counts of one language."""
+    return tabulate(
+        (
+            (sound, frequency, comment_on_sound(sound))
+            for sound, frequency in scounts.most_common()
+        ),
+        headers=["Sound", "Occurrences", "Comment"],
+        tablefmt="orgtbl",
+    )
+
+
 if __name__ == "__main__":
     parser = cli.parser(
         __package__ + "." + Path(__file__).stem,
@@ -73,42 +241,54 @@ if __name__ == "__main__":
         action=cli.SetOrFromFile,
         help="Restrict the report to these lanugage id(s).",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes to use for counting the segments (default: 1)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help="Print a separate table for each language as soon as its counts are complete, "
+        "in the order of the last form of each language in the FormTable, "
+        "instead of one table for all languages at the end",
+    )
     args = parser.parse_args()
     logger = cli.setup_logging(args)
 
     dataset = pycldf.Wordlist.from_metadata(args.metadata)
 
-    counts = count_segments(dataset, args.languages)
-
-    if len(counts) == 1:
-        # A single language
-        ((language, scounts),) = counts.items()
-        print(language)
-        print(
-            tabulate(
-                (
-                    (sound, frequency, comment_on_sound(sound))
-                    for sound, frequency in scounts.most_common()
-                ),
-                headers=["Sound", "Occurrences", "Comment"],
-                tablefmt="orgtbl",
-            )
-        )
+    if args.stream:
+        for language, scounts in iter_segment_counts(
+            dataset, args.languages, jobs=args.jobs
+        ):
+            print(language)
+            print(language_report(scounts), flush=True)
     else:
-        # Extended report
-        print(
-            tabulate(
-                (
+        counts = count_segments(dataset, args.languages, jobs=args.jobs)
+        if len(counts) == 1:
+            # A single language
+            ((language, scounts),) = counts.items()
+            print(language)
+            print(language_report(scounts))
+        else:
+            # Extended report
+            print(
+                tabulate(
                     (
-                        language_id if s == 0 else "",
-                        sound,
-                        frequency,
-                        comment_on_sound(sound),
-                    )
-                    for language_id, scounts in sorted(counts.items())
-                    for s, (sound, frequency) in enumerate(scounts.most_common())
-                ),
-                headers=["Sound", "Occurrences", "Comment"],
-                tablefmt="orgtbl",
+                        (
+                            language_id if s == 0 else "",
+                            sound,
+                            frequency,
+                            comment_on_sound(sound),
+                        )
+                        for language_id, scounts in sorted(counts.items())
+                        for s, (sound, frequency) in enumerate(scounts.most_common())
+                    ),
+                    headers=["Sound", "Occurrences", "Comment"],
+                    tablefmt="orgtbl",
+                )
             )
-        )
@@ -2,19 +2,18 @@
 import re
 import typing as t
 import unicodedata
-import zipfile
 
 import csvw
-import networkx
-import pkg_resources
-import unidecode as uni
 from lexedata.cli import logger, tq
-from lingpy.compare.strings import ldn_swap
 
 from ..types import KeyKeyDict
-from . import fs
+from . import cache, fs
 
-__all__ = ["fs", "KeyKeyDict"]
+# Importing lexedata.util must stay cheap, because every command line tool
+# does it. Heavy dependencies (LingPy, networkx, unidecode) are therefore
+# imported only in the functions that need them.
+
+__all__ = ["cache", "fs", "KeyKeyDict", "load_clics"]
 
 # Following https://github.com/cldf/cldf/#identifier and thus RFC2986,
 # URLs should be alphanumeric with underscores and hyphens, so we
@@ -24,6 +23,17 @@ ID_FORMAT = re.compile("[A-Za-z0-9_-]+")
 MI = t.TypeVar("MI")
 
 
+def load_clics():
+    """Load CLICS as networkx Graph.
+
+    See `lexedata.util.clics.load_clics`, which this imports on first use.
+
+    """
+    from .clics import load_clics
+
+    return load_clics()
+
+
 def ensure_list(maybe_string: t.Union[t.List[MI], MI, None]) -> t.List[MI]:
     if maybe_string is None:
         return []
@@ -65,36 +75,39 @@ def string_to_id(string: str) -> str:
     # We convert to lower case twice, because it can in principle happen that a
     # character without lowercase equivalent is mapped to an uppercase
     # character by unidecode, and we wouldn't want to lose that.
-    return "_".join(ID_FORMAT.findall(uni.unidecode(string.lower()).lower()))
+    from unidecode import unidecode
+
+    return "_".join(ID_FORMAT.findall(unidecode(string.lower()).lower()))
 
 
 def normalize_string(text: str):
     return unicodedata.normalize("NFC", text.strip())
 
 
+def transliterate(text: t.Optional[str]) -> str:
+    """Approximate a string by lower-case ASCII, for comparing strings.
+
+    >>> transliterate("E.ta.'kɾã")
+    "e.ta.'kra"
+
+    """
+    from unidecode import unidecode
+
+    return unidecode(text or "").lower()
+
+
 def edit_distance(text1: str, text2: str) -> float:
     # We request LingPy as dependency anyway, so use its implementation
+    from lingpy.compare.strings import ldn_swap
+
     if not text1 and not text2:
         return 0.3
-    text1 = uni.unidecode(text1 or "").lower()
-    text2 = uni.unidecode(text2 or "").lower()
+    text1 = transliterate(text1)
+    text2 = transliterate(text2)
     length = max(len(text1), len(text2))
     return ldn_swap(text1, text2, normalized=False) / length
 
 
-def load_clics():
-    """Load CLICS as networkx Graph.
-
-    Lexedata packages the CLICS colexification graph in GML format from
-    https://zenodo.org/record/3687530/files/clics/clics3-v1.1.zip?download=1
-
-    """
-    gml = zipfile.ZipFile(
-        pkg_resources.resource_stream("lexedata", "data/clics3-network.gml.zip")
-    ).open("graphs/network-3-families.gml", "r")
-    return networkx.parse_gml(line.decode("utf-8") for line in gml)
-
-
 def parse_segment_slices(
     segment_slices: t.Sequence[str], enforce_ordered=False
 ) -> t.Iterator[int]:
@@ -0,0 +1,143 @@
+"""Keep expensive derived data in the user's cache directory.
+
+Some resources lexedata uses, such as the CLICS colexification graph, take
+seconds to parse. The parsed objects are pickled into the user cache
+directory, under a name derived from a version stamp, so that they are rebuilt
+automatically whenever the stamp (e.g. size and modification time of the
+source file) changes.
+
+"""
+import hashlib
+import os
+import pickle
+import re
+import sys
+import tempfile
+import typing as t
+from pathlib import Path
+
+from lexedata.cli import logger
+
+T = t.TypeVar("T")
+
+
+def cache_dir() -> Path:
+    """Return the directory for lexedata's cache files.
+
+    This is the directory given in the environment variable LEXEDATA_CACHE_DIR,
+    or else a `lexedata` directory in the platform's user cache directory.
+
+    >>> os.environ["LEXEDATA_CACHE_DIR"] = "/tmp/lexedata-cache"
+    >>> cache_dir()
+    PosixPath('/tmp/lexedata-cache')
+    >>> del os.environ["LEXEDATA_CACHE_DIR"]
+
+    """
+    configured = os.environ.get("LEXEDATA_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData/Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library/Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "lexedata"
+
+
+def cache_file(name: str, stamp: t.Hashable) -> Path:
+    """Return the path of the cache file for `name` with version `stamp`.
+
+    The Python version and the pickle protocol are part of every stamp.
+
+    """
+    stamp = (stamp, sys.version_info[:2], pickle.HIGHEST_PROTOCOL)
+    digest = hashlib.sha1(repr(stamp).encode("utf-8")).hexdigest()[:16]
+    return cache_dir() / f"{name}-{digest}.pickle"
+
+
+def cache_files(name: str) -> t.List[Path]:
+    """List the cache files for `name`, with any stamp.
+
+    Only files named exactly like `cache_file` names them match, so the cache
+    files of other names that start with `name` are not included.
+
+    >>> import tempfile
+    >>> os.environ["LEXEDATA_CACHE_DIR"] = tempfile.mkdtemp()
+    >>> for n in ["a", "a-b"]:
+    ...     cache_file(n, 1).parent.mkdir(exist_ok=True)
+    ...     cache_file(n, 1).touch()
+    >>> [f.name for f in cache_files("a")] == [cache_file("a", 1).name]
+    True
+    >>> del os.environ["LEXEDATA_CACHE_DIR"]
+
+    """
+    pattern = re.compile(re.escape(name) + r"-[0-9a-f]{16}\.pickle")
+    try:
+        return [f for f in cache_dir().iterdir() if pattern.fullmatch(f.name)]
+    except FileNotFoundError:
+        return []
+
+
+def cached(
+    name: str,
+    stamp: t.Hashable,
+    build: t.Callable[[], T],
+    logger=logger,
+) -> T:
+    """Load an object from the cache, or build it and store it there.
+
+    If no cache file for `name` with this `stamp` exists, or it cannot be read,
+    call `build()` and pickle its result, atomically through a temporary file.
+    Cache files of `name` (and not of other names starting with `name`) with
+    other stamps are outdated and removed afterwards. Failing to write the cache is not an
+    error, the object is still returned.
+
+    >>> import tempfile
+    >>> os.environ["LEXEDATA_CACHE_DIR"] = tempfile.mkdtemp()
+    >>> cached("example", 1, lambda: {"built": True})
+    {'built': True}
+    >>> cached("example", 1, lambda: {"built": False})
+    {'built': True}
+    >>> cached("example", 2, lambda: {"built": False})
+    {'built': False}
+    >>> len(cache_files("example"))
+    1
+    >>> del os.environ["LEXEDATA_CACHE_DIR"]
+
+    """
+    path = cache_file(name, stamp)
+    try:
+        with path.open("rb") as cache:
+            return pickle.load(cache)
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        logger.warning("Cache file %s could not be read, rebuilding it.", path)
+
+    obj = build()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that concurrent processes never
+        # see a partially written cache.
+        handle, temporary = tempfile.mkstemp(
+            dir=path.parent, prefix=f"{name}-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(handle, "wb") as cache:
+                pickle.dump(obj, cache, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    except OSError:
+        logger.warning("Could not write cache file %s.", path)
+        return obj
+    for outdated in cache_files(name):
+        if outdated != path:
+            # Another process may be removing the same files.
+            try:
+                outdated.unlink(missing_ok=True)
+            except OSError:
+                pass
+    return obj
@@ -0,0 +1,283 @@
+"""Load the CLICS colexification graph and answer questions about it.
+
+Lexedata packages the CLICS colexification graph in GML format from
+https://zenodo.org/record/3687530/files/clics/clics3-v1.1.zip?download=1
+
+Parsing the GML is slow, so both the graph and the integer-indexed
+`ClicsIndex` built from it are loaded only once per process, and pickled
+copies are kept in the user cache directory (see `lexedata.util.cache`) for
+later runs.
+
+"""
+import functools
+import typing as t
+import zipfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import networkx
+
+from . import cache
+
+# Increase this when the cached representation of CLICS changes.
+CLICS_CACHE_VERSION = 2
+
+
+def clics_source() -> t.Tuple[Path, t.Hashable]:
+    """Find the packaged CLICS file, and a stamp identifying its version."""
+    import pkg_resources
+
+    path = Path(
+        pkg_resources.resource_filename("lexedata", "data/clics3-network.gml.zip")
+    )
+    source = path.stat()
+    return path, (
+        CLICS_CACHE_VERSION,
+        source.st_size,
+        source.st_mtime_ns,
+        networkx.__version__,
+    )
+
+
+def parse_clics(path: Path) -> networkx.Graph:
+    """Parse the CLICS graph from the zipped GML file."""
+    gml = zipfile.ZipFile(path).open("graphs/network-3-families.gml", "r")
+    return networkx.parse_gml(line.decode("utf-8") for line in gml)
+
+
+@functools.lru_cache(maxsize=None)
+def load_clics() -> networkx.Graph:
+    """Load CLICS as networkx Graph.
+
+    Every call returns the same graph object, so do not modify it.
+
+    """
+    path, stamp = clics_source()
+    return cache.cached("clics3-network", stamp, lambda: parse_clics(path))
+
+
+@functools.lru_cache(maxsize=None)
+def load_clics_index() -> "ClicsIndex":
+    """Load CLICS as ClicsIndex.
+
+    If the index is in the cache already, this does not need to load the
+    networkx graph at all.
+
+    """
+    _, stamp = clics_source()
+    return cache.cached("clics3-index", stamp, lambda: ClicsIndex(load_clics()))
+
+
+class ClicsIndex:
+    """An integer-indexed adjacency structure of the CLICS graph.
+
+    Nodes (Concepticon IDs, as strings) are numbered in graph order, and the
+    neighbours of node `i` are `neighbours[indptr[i]:indptr[i + 1]]`, in
+    compressed sparse row form.
+
+    >>> index = ClicsIndex(networkx.Graph([("1", "2"), ("2", "3"), ("4", "5")]))
+    >>> index.nodes
+    ['1', '2', '3', '4', '5']
+    >>> index.neighbours_of("2")
+    ['1', '3']
+
+    """
+
+    def __init__(self, graph: networkx.Graph):
+        self.nodes: t.List[str] = [str(node) for node in graph.nodes]
+        self.index: t.Dict[str, int] = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = array("l", [0])
+        self.neighbours = array("l")
+        for node in graph.nodes:
+            self.neighbours.extend(
+                sorted(self.index[str(other)] for other in graph.adj[node])
+            )
+            self.indptr.append(len(self.neighbours))
+        self.__setstate__(self.__dict__)
+
+    def __contains__(self, concept: object) -> bool:
+        return concept in self.index
+
+    def __getstate__(self):
+        # Do not pickle the memoised query results.
+        state = self.__dict__.copy()
+        del state["_connected"]
+        del state["_betweenness"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connected: t.Dict[t.FrozenSet[str], t.Optional[bool]] = {}
+        self._betweenness: t.Dict[t.FrozenSet[str], t.Dict[str, float]] = {}
+
+    def neighbours_of(self, concept: str) -> t.List[str]:
+        i = self.index[concept]
+        return [
+            self.nodes[j] for j in self.neighbours[self.indptr[i] : self.indptr[i + 1]]
+        ]
+
+    def induced_edges(self, nodes: t.AbstractSet[int]) -> t.Iterator[t.Tuple[int, int]]:
+        """Iterate over the edges of the subgraph induced by integer nodes."""
+        indptr = self.indptr
+        neighbours = self.neighbours
+        for i in nodes:
+            for j in neighbours[indptr[i] : indptr[i + 1]]:
+                if i < j and j in nodes:
+                    yield i, j
+
+    def connected(self, concepts: t.Iterable[str]) -> t.Optional[bool]:
+        """Check whether the concepts form a connected subgraph of CLICS.
+
+        Concepts that are not in CLICS are ignored. If none of the concepts
+        are, there is nothing to say, and the result is None. Results are
+        memoised by the set of concepts.
+
+        >>> index = ClicsIndex(networkx.Graph([("1", "2"), ("2", "3"), ("4", "5")]))
+        >>> index.connected(["1", "2", "3"])
+        True
+        >>> index.connected(["1", "3"])
+        False
+        >>> index.connected(["4", "5", "not in CLICS"])
+        True
+        >>> index.connected(["not in CLICS"])
+
+        """
+        key = frozenset(concepts)
+        try:
+            return self._connected[key]
+        except KeyError:
+            pass
+        nodes = {self.index[c] for c in key if c in self.index}
+        if not nodes:
+            result = None
+        else:
+            # Union-find over the edges of the induced subgraph
+            parent = {i: i for i in nodes}
+
+            def find(i: int) -> int:
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            components = len(nodes)
+            for i, j in self.induced_edges(nodes):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[root_i] = root_j
+                    components -= 1
+            result = components == 1
+        self._connected[key] = result
+        return result
+
+    def betweenness(self, concepts: t.Iterable[str]) -> t.Mapping[str, float]:
+        """Compute betweenness centralities within the subgraph of the concepts.
+
+        This is the normalized betweenness centrality of each concept in the
+        subgraph of CLICS induced by the concepts, as computed by
+        `networkx.betweenness_centrality`, using Brandes' algorithm on the
+        integer-indexed adjacency. Concepts that are not in CLICS are ignored.
+        Results are memoised by the set of concepts.
+
+        >>> index = ClicsIndex(networkx.Graph([("1", "2"), ("2", "3"), ("3", "4")]))
+        >>> index.betweenness(["1", "2", "3", "not in CLICS"])
+        {'1': 0.0, '2': 1.0, '3': 0.0}
+        >>> index.betweenness(["1", "2", "3", "4"]) == networkx.betweenness_centrality(
+        ...     networkx.Graph([("1", "2"), ("2", "3"), ("3", "4")]))
+        True
+
+        """
+        key = frozenset(concepts)
+        try:
+            return self._betweenness[key]
+        except KeyError:
+            pass
+        nodes = sorted(self.index[c] for c in key if c in self.index)
+        local = {i: k for k, i in enumerate(nodes)}
+        adjacency = [
+            [
+                local[j]
+                for j in self.neighbours[self.indptr[i] : self.indptr[i + 1]]
+                if j in local
+            ]
+            for i in nodes
+        ]
+        n = len(nodes)
+        centrality = [0.0] * n
+        for source in range(n):
+            # Count the shortest paths from source, breadth first …
+            visited = []
+            predecessors: t.List[t.List[int]] = [[] for _ in range(n)]
+            paths = [0.0] * n
+            paths[source] = 1.0
+            distance = [-1] * n
+            distance[source] = 0
+            queue = deque([source])
+            while queue:
+                v = queue.popleft()
+                visited.append(v)
+                for w in adjacency[v]:
+                    if distance[w] < 0:
+                        queue.append(w)
+                        distance[w] = distance[v] + 1
+                    if distance[w] == distance[v] + 1:
+                        paths[w] += paths[v]
+                        predecessors[w].append(v)
+            # … and accumulate the dependencies in reverse order.
+            dependency = [0.0] * n
+            while visited:
+                w = visited.pop()
+                coefficient = (1 + dependency[w]) / paths[w]
+                for v in predecessors[w]:
+                    dependency[v] += paths[v] * coefficient
+                if w != source:
+                    centrality[w] += dependency[w]
+        if n > 2:
+            scale = 1 / ((n - 1) * (n - 2))
+            centrality = [c * scale for c in centrality]
+        result = {self.nodes[i]: c for i, c in zip(nodes, centrality)}
+        self._betweenness[key] = result
+        return result
+
+    def precompute_betweenness(
+        self, concept_sets: t.Iterable[t.Iterable[str]], jobs: int = 1
+    ) -> None:
+        """Compute and memoise the betweenness centralities for many sets.
+
+        Every distinct set of concepts is computed only once. With more than
+        one job, the sets are distributed over a pool of processes, the
+        largest sets first.
+
+        """
+        keys = {frozenset(concepts) for concepts in concept_sets}
+        keys -= set(self._betweenness)
+        if jobs <= 1:
+            for key in keys:
+                self.betweenness(key)
+            return
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_initialize_worker, initargs=(self,)
+        ) as pool:
+            for key, result in pool.map(
+                _worker_betweenness,
+                sorted(keys, key=len, reverse=True),
+                chunksize=max(1, len(keys) // (8 * jobs)),
+            ):
+                self._betweenness[key] = result
+
+
+_worker_index: t.Optional[ClicsIndex] = None
+
+
+def _initialize_worker(index: ClicsIndex) -> None:
+    global _worker_index
+    _worker_index = index
+
+
+def _worker_betweenness(
+    key: t.FrozenSet[str],
+) -> t.Tuple[t.FrozenSet[str], t.Mapping[str, float]]:
+    assert _worker_index is not None
+    return key, _worker_index.betweenness(key)
@@ -1,14 +1,23 @@
+import contextlib
 import csv
+import io
+import itertools
+import operator
+import os
 import shutil
 import tempfile
 import typing as t
+import zipfile
 from pathlib import Path
 
+import csvw
 import pycldf
 
 from lexedata import types
 from lexedata.util.add_metadata import add_metadata
 
+CHUNK_SIZE = 1 << 16
+
 
 def new_wordlist(
     path: t.Optional[Path] = None, **data
@@ -113,3 +122,152 @@ def copy_dataset(original: Path, target: Path) -> pycldf.Dataset:
     shutil.copyfile(orig_bibpath, dataset.bibpath)
 
     return dataset
+
+
+def table_dialect(dataset: pycldf.Dataset, table: csvw.Table) -> csvw.Dialect:
+    """Find the CSV dialect of a table, which may be inherited from the dataset."""
+    return table.dialect or dataset.tablegroup.dialect or csvw.Dialect()
+
+
+def rewrite_table(
+    dataset: pycldf.Dataset, table: csvw.Table, rows: t.Iterable[t.Mapping[str, t.Any]]
+) -> int:
+    """Write rows to a table, while they may still be read from its file.
+
+    The rows are written to a temporary file next to the table's file, which
+    replaces it once all rows are written, so `rows` can lazily read the old
+    table. The table's dc:extent is updated, but the metadata is not written.
+    Return the number of rows written.
+
+    """
+    path = Path(table.url.resolve(dataset.directory))
+    handle, temporary = tempfile.mkstemp(
+        dir=path.parent, prefix=path.name, suffix=".tmp"
+    )
+    os.close(handle)
+    try:
+        count = table.write(rows, fname=Path(temporary))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    table.common_props["dc:extent"] = count
+    return count
+
+
+def open_table(
+    dataset: pycldf.Dataset, table: csvw.Table, stack: contextlib.ExitStack
+) -> t.TextIO:
+    """Open the file of a table for reading as text, in the table's encoding.
+
+    Like csvw, read the table from a zip archive next to the table's file, if
+    there is only the archive (as pycldf writes for zipped tables).
+
+    """
+    encoding = table_dialect(dataset, table).python_encoding
+    if encoding == "utf-8":
+        encoding = "utf-8-sig"
+    path = Path(table.url.resolve(dataset.directory))
+    if not path.exists():
+        archive = path.parent / (path.name + ".zip")
+        if archive.exists():
+            zipped = stack.enter_context(zipfile.ZipFile(archive))
+            member = [n for n in zipped.namelist() if n.endswith(path.name)][0]
+            return stack.enter_context(
+                io.TextIOWrapper(zipped.open(member), encoding=encoding, newline="")
+            )
+    return stack.enter_context(open(path, encoding=encoding, newline=""))
+
+
+def raw_rows(dataset: pycldf.Dataset, table: csvw.Table) -> t.Iterator[t.List[str]]:
+    """Iterate over the rows of a table file, as lists of untrimmed strings.
+
+    The file (or its zip archive, see `open_table`) is parsed by Python's csv
+    reader, which yields empty lists for blank rows. Skipped rows, comment
+    rows and skipped columns of the dialect are left out, the header is not.
+
+    """
+    dialect = table_dialect(dataset, table)
+    with contextlib.ExitStack() as stack:
+        handle = open_table(dataset, table, stack)
+        for _ in range(dialect.skipRows):
+            handle.readline()
+        rows = csv.reader(handle, **dialect.as_python_formatting_parameters())
+        comment = dialect.commentPrefix
+        skip = dialect.skipColumns
+        if not comment and not skip:
+            yield from rows
+            return
+        for row in rows:
+            if comment and row and row[0].startswith(comment):
+                continue
+            yield row[skip:]
+
+
+def read_column_chunks(
+    dataset: pycldf.Dataset,
+    table: csvw.Table,
+    columns: t.Sequence[str],
+    chunksize: int = CHUNK_SIZE,
+) -> t.Iterator[t.Dict[str, t.List[str]]]:
+    """Read some columns of a table as raw, untrimmed strings, chunk by chunk.
+
+    Each chunk holds the values of the columns asked for in up to `chunksize`
+    rows, without any parsing beyond the CSV dialect of the table. Blank rows
+    are skipped. A column that is not in the file is read as all empty.
+
+    """
+    dialect = table_dialect(dataset, table)
+    rows = raw_rows(dataset, table)
+    if dialect.header:
+        header = list(itertools.islice(rows, dialect.headerRowCount))
+        names = [
+            None if c is None else c.name
+            for c in (
+                table.tableSchema.get_column(dialect.trimmer(h))
+                for h in (header[0] if header else [])
+            )
+        ]
+    else:
+        names = [c.name for c in table.tableSchema.columns]
+    present = [c for c in columns if c in names]
+    if not present:
+        return
+    indices = [names.index(c) for c in present]
+    pick = operator.itemgetter(*indices)
+    padding = [""] * (max(indices) + 1)
+    while True:
+        chunk = list(itertools.islice(rows, chunksize))
+        if not chunk:
+            return
+        chunk = [row for row in chunk if row]
+        try:
+            picked = list(map(pick, chunk))
+        except IndexError:
+            # There are short rows, so pad all rows of this chunk.
+            picked = [pick(row + padding) for row in chunk]
+        if len(present) == 1:
+            values = {present[0]: picked}
+        else:
+            values = {c: list(v) for c, v in zip(present, zip(*picked))}
+        yield {c: values.get(c, [""] * len(picked)) for c in columns}
+
+
+def trimmer(dialect: csvw.Dialect) -> t.Optional[t.Callable[[str], str]]:
+    """Find the string method that trims values like the dialect does.
+
+    Unlike the dialect's own trimmer, these can be mapped over millions of
+    values without a Python function call for each.
+
+    >>> trimmer(csvw.Dialect(trim="start"))
+    <method 'lstrip' of 'str' objects>
+
+    """
+    return {
+        True: str.strip,
+        "true": str.strip,
+        False: None,
+        "false": None,
+        "start": str.lstrip,
+        "end": str.rstrip,
+    }[dialect.trim]
@@ -0,0 +1,219 @@
+"""Segment ranges of cognate judgements, form by form.
+
+A cognate judgement puts one or more ranges of the segments of a form into a
+cognateset. Instead of keeping a set of cognatesets for every single segment,
+`MorphemeIntervals` keeps the start and end of each range in arrays, sorted by
+start, together with the cognateset of each range. The queries for the
+cognatesets of a segment, for the segments not in any cognateset, and for the
+overlaps between cognatesets all work on these ranges directly, so their cost
+depends on the number of judgements of a form and not on its length.
+
+Ranges are pairs of Python indices, 0-based and excluding the end, unlike
+segment slices, which are 1-based and inclusive.
+
+"""
+
+import array
+import bisect
+import typing as t
+
+from lexedata import types
+
+Range = t.Tuple[int, int]
+
+
+def parse_segment_ranges(segment_slices: t.Sequence[str]) -> t.List[Range]:
+    """Parse a segment slice representation into ranges, in the given order.
+
+    >>> parse_segment_ranges(["1", "2:4", "3:3"])
+    [(0, 1), (1, 4), (2, 3)]
+    >>> parse_segment_ranges(["4:2"])
+    Traceback (most recent call last):
+    ...
+    ValueError: Segment slice 4:2 had start after end.
+
+    """
+    ranges = []
+    for startend in segment_slices:
+        start_str, _, end_str = startend.partition(":")
+        start = int(start_str)
+        end = int(end_str or start_str)
+        if end < start:
+            raise ValueError(f"Segment slice {startend} had start after end.")
+        ranges.append((start - 1, end))
+    return ranges
+
+
+def merge_ranges(ranges: t.Iterable[Range]) -> t.List[Range]:
+    """Merge ranges into sorted ranges that neither overlap nor touch.
+
+    >>> merge_ranges([(3, 5), (0, 2), (1, 3), (7, 8), (6, 6)])
+    [(0, 5), (7, 8)]
+
+    """
+    merged: t.List[Range] = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_ranges(a: t.Sequence[Range], b: t.Sequence[Range]) -> t.List[Range]:
+    """Intersect two lists of sorted, disjoint ranges.
+
+    >>> intersect_ranges([(0, 3), (5, 8)], [(2, 6), (7, 9)])
+    [(2, 3), (5, 6), (7, 8)]
+
+    """
+    shared = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            shared.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return shared
+
+
+def ranges_length(ranges: t.Iterable[Range]) -> int:
+    """Count the segments in disjoint ranges.
+
+    >>> ranges_length([(0, 3), (5, 6)])
+    4
+
+    """
+    return sum(end - start for start, end in ranges)
+
+
+class MorphemeIntervals:
+    """The ranges of segments of one form that are in cognatesets.
+
+    >>> form = MorphemeIntervals(6)
+    >>> form.add("s1", [(0, 3)])
+    >>> form.add("s2", [(2, 4)])
+    >>> form.add("s1", [(5, 6)])
+    >>> form
+    MorphemeIntervals(6, [(0, 3, 's1'), (2, 4, 's2'), (5, 6, 's1')])
+    >>> form.cognatesets_at(2) == {"s1", "s2"}
+    True
+    >>> form.ranges("s1")
+    [(0, 3), (5, 6)]
+    >>> list(form.uncovered())
+    [(4, 5)]
+    >>> list(form.overlaps())
+    [('s1', 's2', [(2, 3)])]
+
+    """
+
+    __slots__ = ("length", "starts", "ends", "cognatesets")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.starts = array.array("l")
+        self.ends = array.array("l")
+        self.cognatesets: t.List[types.Cognateset_ID] = []
+
+    @classmethod
+    def from_segment_sets(
+        cls, segments: t.Sequence[t.Iterable[types.Cognateset_ID]]
+    ) -> "MorphemeIntervals":
+        """Build the intervals from the set of cognatesets of each segment.
+
+        >>> MorphemeIntervals.from_segment_sets([{"s1"}, {"s1", "s2"}, set()])
+        MorphemeIntervals(3, [(0, 2, 's1'), (1, 2, 's2')])
+
+        """
+        indices: t.Dict[types.Cognateset_ID, t.List[Range]] = {}
+        for i, cognatesets in enumerate(segments):
+            for cognateset in cognatesets:
+                indices.setdefault(cognateset, []).append((i, i + 1))
+        form = cls(len(segments))
+        for cognateset in sorted(indices):
+            form.add(cognateset, indices[cognateset])
+        return form
+
+    def add(self, cognateset: types.Cognateset_ID, ranges: t.Iterable[Range]) -> None:
+        """Add ranges of segments that are in the cognateset."""
+        for start, end in merge_ranges(ranges):
+            i = bisect.bisect_right(self.starts, start)
+            self.starts.insert(i, start)
+            self.ends.insert(i, end)
+            self.cognatesets.insert(i, cognateset)
+
+    def __repr__(self) -> str:
+        return "{}({:d}, {!r})".format(
+            type(self).__name__,
+            self.length,
+            list(zip(self.starts, self.ends, self.cognatesets)),
+        )
+
+    def cognatesets_at(self, segment: int) -> t.Set[types.Cognateset_ID]:
+        """Find the cognatesets that the segment is in."""
+        return {
+            cognateset
+            for end, cognateset in zip(
+                self.ends[: bisect.bisect_right(self.starts, segment)],
+                self.cognatesets,
+            )
+            if end > segment
+        }
+
+    def segment_sets(self) -> t.List[t.Set[types.Cognateset_ID]]:
+        """List the set of cognatesets of each segment."""
+        segments: t.List[t.Set[types.Cognateset_ID]] = [
+            set() for _ in range(self.length)
+        ]
+        for start, end, cognateset in zip(self.starts, self.ends, self.cognatesets):
+            for i in range(start, end):
+                segments[i].add(cognateset)
+        return segments
+
+    def ranges(self, cognateset: types.Cognateset_ID) -> t.List[Range]:
+        """Find the sorted, disjoint ranges of segments in the cognateset."""
+        return merge_ranges(
+            (start, end)
+            for start, end, c in zip(self.starts, self.ends, self.cognatesets)
+            if c == cognateset
+        )
+
+    def uncovered(self) -> t.Iterator[Range]:
+        """Find the maximal ranges of segments that are in no cognateset."""
+        reach = 0
+        for start, end in zip(self.starts, self.ends):
+            if start > reach:
+                yield reach, start
+            reach = max(reach, end)
+        if reach < self.length:
+            yield reach, self.length
+
+    def overlaps(
+        self,
+    ) -> t.Iterator[t.Tuple[types.Cognateset_ID, types.Cognateset_ID, t.List[Range]]]:
+        """Find the pairs of cognatesets that share segments, and the shared ranges.
+
+        The pairs come sorted, and each pair is sorted.
+
+        """
+        pairs: t.Set[t.Tuple[types.Cognateset_ID, types.Cognateset_ID]] = set()
+        active: t.List[t.Tuple[int, types.Cognateset_ID]] = []
+        for start, end, cognateset in zip(self.starts, self.ends, self.cognatesets):
+            active = [(e, c) for e, c in active if e > start]
+            for _, other in active:
+                if other != cognateset:
+                    pairs.add(
+                        (other, cognateset)
+                        if other < cognateset
+                        else (cognateset, other)
+                    )
+            active.append((end, cognateset))
+        for c1, c2 in sorted(pairs):
+            yield c1, c2, intersect_ranges(self.ranges(c1), self.ranges(c2))
@@ -0,0 +1,155 @@
+"""Check and normalize the unicode of UTF-8 text files, fast.
+
+Most of the text in a CLDF dataset is ASCII, which is normalized in every
+normalization form. The files are therefore read as bytes, in chunks that end
+at a line break, and chunks that are pure ASCII are skipped at once. Of the
+other chunks, only the lines that contain non-ASCII bytes are decoded and
+checked or normalized. Line breaks never combine with neighbouring
+characters, so normalizing line by line gives the same result as normalizing
+the whole file.
+
+"""
+import functools
+import os
+import re
+import shutil
+import tempfile
+import typing as t
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 20
+
+NON_ASCII_LINE = re.compile(rb"[^\n]*[\x80-\xff][^\n]*")
+
+
+def line_chunks(handle: t.BinaryIO, size: int = CHUNK_SIZE) -> t.Iterator[bytes]:
+    """Read a binary file in chunks of about `size` bytes that end with a line break.
+
+    Only the last chunk may end without a line break. Lines longer than `size`
+    come as one chunk.
+
+    >>> import io
+    >>> list(line_chunks(io.BytesIO(b"ab\\ncd\\nef"), size=4))
+    [b'ab\\n', b'cd\\n', b'ef']
+
+    """
+    rest = b""
+    while True:
+        block = handle.read(size)
+        if not block:
+            if rest:
+                yield rest
+            return
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if cut:
+            yield block[:cut]
+        rest = block[cut:]
+
+
+def is_normalized(path: Path, form: str = "NFC", size: int = CHUNK_SIZE) -> bool:
+    """Check whether a UTF-8 file is in the given unicode normalization form.
+
+    Files that are not valid UTF-8 count as not normalized.
+
+    """
+    with path.open("rb") as handle:
+        for chunk in line_chunks(handle, size):
+            if chunk.isascii():
+                continue
+            for line in NON_ASCII_LINE.findall(chunk):
+                try:
+                    if not unicodedata.is_normalized(form, line.decode("utf-8")):
+                        return False
+                except UnicodeDecodeError:
+                    return False
+    return True
+
+
+def normalize_chunk(chunk: bytes, form: str = "NFC") -> bytes:
+    """Normalize the lines of a UTF-8 chunk that contain non-ASCII characters.
+
+    >>> normalize_chunk("A\\u0300\\nB\\n".encode("utf-8")).decode("utf-8")
+    'À\\nB\\n'
+
+    """
+    if chunk.isascii():
+        return chunk
+    return NON_ASCII_LINE.sub(
+        lambda line: unicodedata.normalize(form, line.group().decode("utf-8")).encode(
+            "utf-8"
+        ),
+        chunk,
+    )
+
+
+def normalize_file(path: Path, form: str = "NFC", size: int = CHUNK_SIZE) -> bool:
+    """Normalize a UTF-8 file in place, if necessary.
+
+    The normalized content is written to a temporary file next to the
+    original, which then replaces it, so the file is never seen half written.
+    Files that are already normalized are not written at all. Return whether
+    the file was changed.
+
+    """
+    output: t.Optional[t.BinaryIO] = None
+    done = 0
+    try:
+        with path.open("rb") as handle:
+            for chunk in line_chunks(handle, size):
+                normalized = normalize_chunk(chunk, form)
+                if output is None and normalized != chunk:
+                    # The first change: Copy everything before it.
+                    output = tempfile.NamedTemporaryFile(
+                        dir=path.parent, prefix=path.name, suffix=".tmp", delete=False
+                    )
+                    with path.open("rb") as original:
+                        remaining = done
+                        while remaining:
+                            block = original.read(min(size, remaining))
+                            output.write(block)
+                            remaining -= len(block)
+                if output is not None:
+                    output.write(normalized)
+                done += len(chunk)
+        if output is None:
+            return False
+        output.close()
+        shutil.copymode(path, output.name)
+        os.replace(output.name, path)
+        return True
+    except BaseException:
+        if output is not None:
+            output.close()
+            os.unlink(output.name)
+        raise
+
+
+def _map(
+    function: t.Callable[[Path], bool], paths: t.Sequence[Path], jobs: int
+) -> t.List[bool]:
+    if jobs <= 1 or len(paths) <= 1:
+        return [function(path) for path in paths]
+    # Largest files first, so that no big file is left over at the end.
+    order = sorted(range(len(paths)), key=lambda i: -paths[i].stat().st_size)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        results = dict(zip(order, pool.map(function, [paths[i] for i in order])))
+    return [results[i] for i in range(len(paths))]
+
+
+def unnormalized_files(
+    paths: t.Sequence[Path], form: str = "NFC", jobs: int = 1
+) -> t.List[Path]:
+    """Find the files that are not in the normalization form, using `jobs` processes."""
+    checks = _map(functools.partial(is_normalized, form=form), paths, jobs)
+    return [path for path, normalized in zip(paths, checks) if not normalized]
+
+
+def normalize_files(
+    paths: t.Sequence[Path], form: str = "NFC", jobs: int = 1
+) -> t.List[Path]:
+    """Normalize the files, using `jobs` processes, and return those that changed."""
+    changes = _map(functools.partial(normalize_file, form=form), paths, jobs)
+    return [path for path, changed in zip(paths, changes) if changed]
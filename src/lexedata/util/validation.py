@@ -0,0 +1,291 @@
+"""Run many validation checks over a dataset, reading each table only once.
+
+A check looks at the schema when it is created, tells which tables it wants to
+see (`Check.tables`), and is then shown every row of those tables. The engine
+in `run_checks` streams each table that any check is interested in exactly
+once, handing each row to all interested checks, and tables are streamed
+before the tables that reference them, so that a check on the CognateTable can
+rely on having seen the FormTable already.
+
+The log messages of the checks are held back while the tables are streamed,
+and then passed on check by check, in the order of the checks, just as if each
+check had read the dataset on its own.
+
+With more than one job, groups of tables are checked in a pool of processes.
+Tables end up in the same group when a check needs to see them together (like
+the FormTable and the CognateTable for the cognate judgements). The log
+messages of the workers are collected and passed on in the same order as with
+a single job.
+
+"""
+import itertools
+import logging
+import typing as t
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import csvw
+import pycldf
+
+from lexedata import cli
+
+
+class Check:
+    """A validation check that visits the rows of some tables.
+
+    Subclasses set `tables` to the URLs of the tables they want to see (or
+    `None` for all tables), set `valid` to False when they find a problem, and
+    override the `visit_row`, `end_table` and `finish` hooks as necessary.
+
+    A check that looks at each table on its own, without keeping any state
+    between tables except for `valid`, sets `independent_tables`, so that its
+    tables can be checked in different processes.
+
+    """
+
+    independent_tables = False
+
+    def __init__(
+        self, dataset: pycldf.Dataset, logger: cli.logging.Logger = cli.logger
+    ):
+        self.dataset = dataset
+        self.logger = logger
+        self.valid = True
+        self.tables: t.Optional[t.Set[str]] = set()
+
+    def wants(self, table: csvw.Table) -> bool:
+        return self.tables is None or table.url.string in self.tables
+
+    def visit_row(
+        self,
+        table: csvw.Table,
+        r: int,
+        row: t.Dict[str, t.Any],
+        fname: str,
+        line: int,
+    ) -> None:
+        """Look at row number `r` (counting from 1) of a table.
+
+        `fname` and `line` give the file and line number the row comes from.
+
+        """
+
+    def end_table(self, table: csvw.Table) -> None:
+        """Finish looking at a table, after all its rows have been visited."""
+
+    def finish(self) -> bool:
+        """Finish the check, after all tables are done, and return its result."""
+        return self.valid
+
+    def merge(self, other: "Check") -> None:
+        """Take over the state of a copy of this check run in another process."""
+        if self.independent_tables:
+            self.valid &= other.valid
+        else:
+            self.__dict__.update(other.__dict__)
+
+
+def streaming_order(dataset: pycldf.Dataset) -> t.List[csvw.Table]:
+    """Order the tables of the dataset such that referenced tables come first.
+
+    >>> from lexedata.util.fs import new_wordlist
+    >>> ds = new_wordlist(CognateTable=[], FormTable=[], LanguageTable=[])
+    >>> [table.url.string for table in streaming_order(ds)]
+    ['languages.csv', 'forms.csv', 'cognates.csv']
+
+    """
+    tables = {table.url.string: table for table in dataset.tables}
+    ordered: t.List[csvw.Table] = []
+    done: t.Set[str] = set()
+
+    def visit(url: str, path: t.Set[str]) -> None:
+        if url in done or url in path or url not in tables:
+            return
+        for key in tables[url].tableSchema.foreignKeys:
+            visit(str(key.reference.resource), path | {url})
+        done.add(url)
+        ordered.append(tables[url])
+
+    for url in tables:
+        visit(url, set())
+    return ordered
+
+
+def table_groups(
+    dataset: pycldf.Dataset, checks: t.Sequence[Check]
+) -> t.List[t.List[csvw.Table]]:
+    """Group the tables that some check needs to see in the same process.
+
+    Only tables that any check wants are included. Groups and the tables in
+    each group are in streaming order.
+
+    """
+    order = [
+        table
+        for table in streaming_order(dataset)
+        if any(check.wants(table) for check in checks)
+    ]
+    parent = {table.url.string: table.url.string for table in order}
+
+    def find(url: str) -> str:
+        while parent[url] != url:
+            url = parent[url]
+        return url
+
+    for check in checks:
+        if check.independent_tables:
+            continue
+        wanted = [table.url.string for table in order if check.wants(table)]
+        for url in wanted[1:]:
+            parent[find(url)] = find(wanted[0])
+
+    groups: t.Dict[str, t.List[csvw.Table]] = {}
+    for table in order:
+        groups.setdefault(find(table.url.string), []).append(table)
+    return list(groups.values())
+
+
+def stream_table(table: csvw.Table, checks: t.Sequence[Check]) -> None:
+    """Show all rows of the table to the checks."""
+    for r, (fname, line, row) in enumerate(table.iterdicts(with_metadata=True), 1):
+        for check in checks:
+            check.visit_row(table, r, row, fname, line)
+    for check in checks:
+        check.end_table(table)
+
+
+class _Recorder(logging.Handler):
+    """Keep log records, by the table that was being checked."""
+
+    def __init__(self):
+        super().__init__()
+        self.table: t.Optional[str] = None
+        self.records: t.Dict[t.Optional[str], t.List[logging.LogRecord]] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Make the record safe to send back to the main process.
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.setdefault(self.table, []).append(record)
+
+
+def _recording(check: Check) -> _Recorder:
+    """Make the check log to a new recorder instead of its logger."""
+    recorder = _Recorder()
+    logger = logging.Logger(check.logger.name, check.logger.getEffectiveLevel())
+    logger.addHandler(recorder)
+    check.logger = logger
+    return recorder
+
+
+def _stream_tables(
+    dataset: pycldf.Dataset,
+    checks: t.Sequence[Check],
+    urls: t.Sequence[str],
+    others: t.Sequence[_Recorder] = (),
+) -> t.List[t.Dict[t.Optional[str], t.List[logging.LogRecord]]]:
+    """Stream the tables to the checks, and return the log records of each check.
+
+    The `others` recorders are told which table is being checked, too.
+
+    """
+    loggers = [check.logger for check in checks]
+    recorders = [_recording(check) for check in checks]
+    try:
+        for url in urls:
+            table = dataset[url]
+            for recorder in itertools.chain(recorders, others):
+                recorder.table = url
+            stream_table(table, [check for check in checks if check.wants(table)])
+    finally:
+        for check, logger in zip(checks, loggers):
+            check.logger = logger
+    return [recorder.records for recorder in recorders]
+
+
+def _check_tables(
+    dataset: pycldf.Dataset,
+    checks: t.Sequence[Check],
+    urls: t.Sequence[str],
+    levels: t.Mapping[str, int],
+) -> t.Tuple[
+    t.Sequence[Check],
+    t.List[t.Dict[t.Optional[str], t.List[logging.LogRecord]]],
+    t.Dict[t.Optional[str], t.List[logging.LogRecord]],
+]:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    # Anything not logged by the checks themselves, e.g. by csvw
+    recorder = _Recorder()
+    root.addHandler(recorder)
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+    try:
+        check_records = _stream_tables(dataset, checks, urls, others=[recorder])
+    finally:
+        root.removeHandler(recorder)
+    return checks, check_records, recorder.records
+
+
+def run_checks(
+    dataset: pycldf.Dataset, checks: t.Sequence[Check], jobs: int = 1
+) -> bool:
+    """Run all the checks, streaming every table at most once.
+
+    Return whether all checks passed. Every check is run to the end, even if an
+    earlier one already failed.
+
+    The log messages of the checks come out check by check: First all messages
+    of the first check, table by table and row by row, then those of its
+    `finish`, then those of the next check, and so on.
+
+    With more than one job, the groups of tables that belong together (see
+    `table_groups`) are checked in a pool of processes. The log messages come
+    out exactly as with a single job.
+
+    """
+    urls = [
+        table.url.string
+        for table in streaming_order(dataset)
+        if any(check.wants(table) for check in checks)
+    ]
+    if jobs <= 1:
+        records = _stream_tables(dataset, checks, urls)
+    else:
+        names = {"lexedata"} | {check.logger.name for check in checks}
+        levels = {name: logging.getLogger(name).getEffectiveLevel() for name in names}
+        records = [{} for check in checks]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures: t.List[t.Tuple[t.List[int], Future]] = []
+            for tables in table_groups(dataset, checks):
+                indices = [
+                    i
+                    for i, check in enumerate(checks)
+                    if any(check.wants(table) for table in tables)
+                ]
+                future = pool.submit(
+                    _check_tables,
+                    dataset,
+                    [checks[i] for i in indices],
+                    [table.url.string for table in tables],
+                    levels,
+                )
+                futures.append((indices, future))
+            other_records: t.Dict[t.Optional[str], t.List[logging.LogRecord]] = {}
+            for indices, future in futures:
+                copies, check_records, others = future.result()
+                for i, copy, recorded in zip(indices, copies, check_records):
+                    checks[i].merge(copy)
+                    records[i].update(recorded)
+                other_records.update(others)
+        for url in urls:
+            for record in other_records.get(url, []):
+                logging.getLogger(record.name).handle(record)
+    results = []
+    for check, recorded in zip(checks, records):
+        for url in urls:
+            for record in recorded.get(url, []):
+                logging.getLogger(record.name).handle(record)
+        results.append(check.finish())
+    return all(results)
@@ -4,8 +4,8 @@ import re
 
 from lexedata.edit.add_singleton_cognatesets import (
     create_singletons,
-    uncoded_segments,
-    uncoded_forms,
+    covered_segments,
+    uncoded_ranges,
 )
 from lexedata import types
 from lexedata.util.fs import new_wordlist
@@ -129,7 +129,7 @@ def test_create_singletons_no_slices(caplog):
     )
     with caplog.at_level(logging.WARNING):
         cogsets, judgements = create_singletons(ds)
-    assert judgements == [
+    assert list(judgements) == [
         {"ID": "j1", "Form_ID": "f1", "Cognateset_ID": "s1", "Source": []},
         {"ID": "j2", "Form_ID": "f3", "Cognateset_ID": "s1", "Source": []},
         {"ID": "j3", "Form_ID": "f4", "Cognateset_ID": "s1", "Source": []},
@@ -244,7 +244,7 @@ def test_create_singletons_affix(caplog):
         {"ID": "s2", "Description": None, "Source": []},
         {"ID": "x_f2_1", "Description": None, "Source": None},
     ]
-    assert judgements == [
+    assert list(judgements) == [
         {
             "ID": "j1",
             "Form_ID": "f1",
@@ -343,7 +343,7 @@ def test_create_singletons_affix_by_segment(caplog):
         {"ID": "x_f4_1", "Description": None, "Source": None},
         {"ID": "x_f4_2", "Description": None, "Source": None},
     ]
-    assert judgements == [
+    assert list(judgements) == [
         {
             "ID": "j1",
             "Form_ID": "f1",
@@ -411,48 +411,6 @@ def test_create_singletons_affix_by_segment(caplog):
     ]
 
 
-def test_uncoded_segments():
-    segments = uncoded_segments(
-        {
-            "f1": [{}, {}, {"s1"}, {}],
-            "f2": [{"s1"}, {"s1"}, {"s1"}, {"s1"}],
-            "f3": [{}, {}, {"s1"}, {"s1"}],
-            "f4": [{"s1"}, {"s1"}, {"s1"}, {}],
-            "f5": [{"s1"}, {}, {"s1"}, {"s1"}],
-        }
-    )
-    assert list(segments) == [
-        ("f1", range(0, 2)),
-        ("f1", range(3, 4)),
-        ("f3", range(0, 2)),
-        ("f4", range(3, 4)),
-        ("f5", range(1, 2)),
-    ]
-
-
-def test_uncoded_forms():
-    segments = list(
-        uncoded_forms(
-            [
-                {"id": "na", "form": "-", "segments": []},
-                {"id": "missing", "form": "", "segments": []},
-                {"id": "f1", "form": "ex", "segments": ["e", "x"]},
-                {"id": "f2", "form": "test", "segments": ["t", "e", "s", "t"]},
-                {
-                    "id": "f3",
-                    "form": "longer",
-                    "segments": ["l", "o", "n", "g", "e", "r"],
-                },
-            ],
-            {"f2"},
-        )
-    )
-    assert list(segments) == [
-        ("f1", range(2)),
-        ("f3", range(6)),
-    ]
-
-
 def test_singletons():
     dataset, _ = copy_to_temp_no_bib(
         Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
@@ -561,3 +519,36 @@ def test_singletons():
             "Status_Column": "automatic singleton",
         },
     ]
+
+
+def test_covered_segments_bitmask(caplog):
+    ds = new_wordlist(
+        FormTable=[
+            {
+                "ID": "f1",
+                "Parameter_ID": "c1",
+                "Language_ID": "l1",
+                "Form": "test",
+                "Segments": ["t", "e", "s", "t"],
+            },
+        ],
+        CognateTable=[
+            {
+                "ID": "j1",
+                "Form_ID": "f1",
+                "Cognateset_ID": "s1",
+                "Segment_Slice": ["2"],
+            },
+            {"ID": "j2", "Form_ID": "f2", "Cognateset_ID": "s2", "Segment_Slice": []},
+            {
+                "ID": "j3",
+                "Form_ID": "f1",
+                "Cognateset_ID": "s3",
+                "Segment_Slice": ["1"],
+            },
+        ],
+    )
+    covered = covered_segments(ds, ds["CognateTable"], {"s1", "s2"})
+    assert covered == {"f1": 0b0010, "f2": -1}
+    assert list(uncoded_ranges(covered["f1"], 4)) == [range(0, 1), range(2, 4)]
+    assert list(uncoded_ranges(covered["f2"], 4)) == []
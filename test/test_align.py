@@ -0,0 +1,43 @@
+import logging
+from pathlib import Path
+
+from lexedata.edit.align import align_cognatesets, aligne_cognate_table
+from helper_functions import copy_to_temp
+
+
+def test_alignments_of_cognateset_have_equal_length():
+    dataset, _ = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    aligne_cognate_table(dataset)
+    c_cognateset = dataset["CognateTable", "cognatesetReference"].name
+    c_alignment = dataset["CognateTable", "alignment"].name
+    lengths = {}
+    for judgement in dataset["CognateTable"]:
+        lengths.setdefault(judgement[c_cognateset], set()).add(
+            len(judgement[c_alignment])
+        )
+    assert all(len(length) == 1 for length in lengths.values())
+
+
+def test_align_in_parallel():
+    alignments = []
+    for jobs in [1, 2]:
+        dataset, target = copy_to_temp(
+            Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+        )
+        aligne_cognate_table(dataset, jobs=jobs)
+        alignments.append(list(dataset["CognateTable"]))
+    assert alignments[0] == alignments[1]
+
+
+def test_aligning_restores_the_lingpy_log_level():
+    lingpy_logger = logging.getLogger("lingpy")
+    level = lingpy_logger.level
+    lingpy_logger.setLevel(logging.INFO)
+    try:
+        alignments = dict(align_cognatesets({"c1": [["t", "a"], ["t", "a", "k"]]}))
+        assert alignments == {"c1": [["t", "a", "-"], ["t", "a", "k"]]}
+        assert lingpy_logger.level == logging.INFO
+    finally:
+        lingpy_logger.setLevel(level)
@@ -0,0 +1,108 @@
+import importlib.util
+from pathlib import Path
+
+import openpyxl
+import pycldf
+
+from lexedata.benchmark.compare import compare_runs, default_baseline
+from lexedata.benchmark.history import append_run, new_run, read_runs
+from lexedata.benchmark.run import BENCHMARKS, Result, prepare, run_benchmark
+from lexedata.benchmark.synthetic import Shape, synthetic_wordlist
+from lexedata.report.references import find_missing_references
+
+TINY = Shape(languages=3, concepts=5, morphemes=2, affixes=2, overlapping=0.5)
+
+
+def test_synthetic_wordlist_is_consistent_and_reproducible(tmp_path):
+    dataset = synthetic_wordlist(tmp_path / "a", TINY, seed=3)
+    assert find_missing_references(dataset) == []
+    forms = list(dataset["FormTable"])
+    assert {f["Language_ID"] for f in forms} == {"l0", "l1", "l2"}
+    for judgement in dataset["CognateTable"]:
+        assert judgement["Segment_Slice"]
+    other = synthetic_wordlist(tmp_path / "b", TINY, seed=3)
+    assert list(other["FormTable"]) == forms
+    assert list(other["CognateTable"]) == list(dataset["CognateTable"])
+
+
+def test_synthetic_workbooks(tmp_path):
+    wordlist, rows = prepare(TINY, tmp_path)
+    assert rows["LanguageTable"] == 3
+    assert rows["FormTable"] == len(
+        list(
+            pycldf.Wordlist.from_metadata(wordlist / "Wordlist-metadata.json")[
+                "FormTable"
+            ]
+        )
+    )
+    long = openpyxl.load_workbook(tmp_path / "long.xlsx")
+    assert long.sheetnames == ["Language 0", "Language 1", "Language 2"]
+    assert sum(sheet.max_row - 1 for sheet in long.worksheets) == rows["FormTable"]
+
+
+def test_benchmarks_cover_all_command_line_tools():
+    src = Path(importlib.util.find_spec("lexedata").origin).parent
+    tools = {
+        f"lexedata.{package}.{path.stem}"
+        for package in ["edit", "exporter", "importer", "report"]
+        for path in (src / package).glob("*.py")
+        if not path.stem.startswith("_")
+        and 'if __name__ == "__main__":' in path.read_text(encoding="utf-8")
+    }
+    assert tools == {benchmark.module for benchmark in BENCHMARKS}
+
+
+def test_run_benchmark(tmp_path):
+    wordlist, rows = prepare(TINY, tmp_path)
+    (benchmark,) = [b for b in BENCHMARKS if b.name == "report.references"]
+    result = run_benchmark(benchmark, "tiny", wordlist, rows, repeat=2)
+    assert result.status == 0
+    assert result.rows == rows["FormTable"]
+    assert len(result.seconds) == len(result.peak_rss) == 2
+    assert all(memory > 0 for memory in result.peak_rss)
+    assert result.rows_per_second > 0
+
+
+def test_history_round_trip_and_regressions(tmp_path):
+    def result(benchmark, seconds, peak_rss, status=0):
+        return Result(benchmark, "small", 100, seconds, peak_rss, status)
+
+    old = new_run(
+        [
+            result("report.coverage", [1.0, 1.1, 1.0], [100, 100, 100]),
+            result("report.references", [1.0, 1.1, 1.0], [100, 100, 100]),
+            result("edit.align", [2.0, 2.0, 2.1], [100, 100, 100]),
+            result("edit.clean_forms", [1.0], [100]),
+        ]
+    )
+    new = new_run(
+        [
+            result("report.coverage", [1.5, 1.6, 1.5], [100, 100, 101]),
+            result("report.references", [1.0, 1.6, 1.0], [200, 200, 200]),
+            result("edit.align", [2.0, 2.0, 2.1], [100, 100, 100], status=1),
+            result("edit.clean_forms", [1.05], [100]),
+        ]
+    )
+    history = tmp_path / "history.jsonl"
+    append_run(history, old)
+    append_run(history, new)
+    runs = read_runs(history)
+    assert runs == [old, new]
+    assert default_baseline(runs, 1) == old
+    assert default_baseline(runs, 0) is None
+    # Identical runs are still told apart by their position
+    assert default_baseline([old, old], 1) is old
+
+    regressions = {
+        (c.benchmark, c.metric) for c in compare_runs(old, new) if c.regression
+    }
+    assert regressions == {
+        ("report.coverage", "seconds"),
+        ("report.references", "peak_rss"),
+        ("edit.align", "status"),
+    }
+    assert not any(
+        c.regression
+        for c in compare_runs(old, new, time_tolerance=1, memory_tolerance=1)
+        if c.metric != "status"
+    )
@@ -1,6 +1,13 @@
+import collections
+import json
 import logging
+import pstats
+import subprocess
+import sys
+from pathlib import Path
 
 import pytest
+from helper_functions import copy_to_temp
 
 from lexedata import cli
 
@@ -11,3 +18,92 @@ def test_exit(caplog):
             cli.Exit.INVALID_DATASET()
         assert "INVALID_DATASET" in caplog.text
     assert exit.value.code == 8
+
+
+def test_profile_option_defaults_to_module_name():
+    parser = cli.parser("lexedata.report.coverage", "Test")
+    args = parser.parse_args([])
+    assert not args.profile
+    assert args.profile_output == Path("lexedata.report.coverage.pstats")
+    args = parser.parse_args(["--profile", "--profile-output", "x.prof"])
+    assert args.profile
+    assert args.profile_output == Path("x.prof")
+
+
+def test_profile_does_not_take_positional_argument():
+    parser = cli.parser("lexedata.importer.cognates", "Test")
+    parser.add_argument("cogsets", nargs="?", type=Path, default=None)
+    args = parser.parse_args(["--profile", "cog.xlsx"])
+    assert args.profile
+    assert args.cogsets == Path("cog.xlsx")
+    assert args.profile_output == Path("lexedata.importer.cognates.pstats")
+
+
+def test_tq_records_phase_times(monkeypatch):
+    monkeypatch.setattr(cli, "phase_times", collections.defaultdict(float))
+    assert list(cli.tq([1, 2, 3], task="Counting")) == [1, 2, 3]
+    assert list(cli.tq(iter([1]), task="Counting")) == [1]
+    assert set(cli.phase_times) == {"Counting"}
+    assert cli.phase_times["Counting"] >= 0
+
+
+def test_profile_writes_stats_and_phases(tmp_path):
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "lexedata.report.references",
+            "--metadata",
+            str(target),
+            "--profile",
+            "--profile-output",
+            str(tmp_path / "references.pstats"),
+            "--profile-top",
+            "5",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert output.returncode == 0
+    assert pstats.Stats(str(tmp_path / "references.pstats")).total_calls > 0
+    phases = json.loads(
+        (tmp_path / "references.pstats.phases.json").read_text(encoding="utf-8")
+    )
+    assert "Total" in phases
+    assert "Wall time by phase:" in output.stderr
+
+
+def test_profile_leaves_positional_arguments_and_other_files_alone(tmp_path):
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    command = [
+        sys.executable,
+        "-m",
+        "lexedata.report.filter",
+        "--metadata",
+        str(target),
+        "--profile",
+        "ID",
+        ".",
+        "ParameterTable",
+    ]
+    output = subprocess.run(command, cwd=tmp_path, capture_output=True, text=True)
+    assert output.returncode == 0
+    assert not (tmp_path / "ID").exists()
+    assert output.stdout.strip()
+    assert (tmp_path / "lexedata.report.filter.pstats").exists()
+
+    workbook = tmp_path / "cog.xlsx"
+    workbook.write_bytes(b"PK\x03\x04 not a profile")
+    output = subprocess.run(
+        command + ["--profile-output", str(workbook)],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+    assert output.returncode == cli.Exit.CLI_ARGUMENT_ERROR
+    assert workbook.read_bytes() == b"PK\x03\x04 not a profile"
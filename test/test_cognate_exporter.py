@@ -201,6 +201,7 @@ def test_adding_singleton_cognatesets(caplog):
             status="NEW",
             by_segment=False,
         )
+        cogsets, judgements = list(cogsets), list(judgements)
         properties_as_key(cogsets, dataset["CognatesetTable"].tableSchema.columns)
         properties_as_key(judgements, dataset["CognateTable"].tableSchema.columns)
         forms = util.cache_table(dataset)
@@ -253,6 +254,7 @@ def test_adding_singleton_cognatesets_with_status(caplog):
             status="NEW",
             by_segment=True,
         )
+        cogsets, judgements = list(cogsets), list(judgements)
         properties_as_key(cogsets, dataset["CognatesetTable"].tableSchema.columns)
         properties_as_key(judgements, dataset["CognateTable"].tableSchema.columns)
         forms = util.cache_table(dataset)
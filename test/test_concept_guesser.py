@@ -12,9 +12,12 @@ from lexedata.edit.add_central_concepts import (
     add_central_concepts_to_cognateset_table,
 )
 from lexedata.edit.add_concepticon import (
+    GlossIndex,
     create_concepticon_for_concepts,
     add_concepticon_definitions,
     add_concepticon_names,
+    concepticon_stamp,
+    get_concepticon,
 )
 from lexedata.util.fs import copy_dataset
 
@@ -167,3 +170,47 @@ def test_add_concepticon_names_missing_column():
         assert dataset["ParameterTable", "Concepticon_Gloss"]
     except KeyError:
         pytest.fail("No column Concepticon_Gloss")
+
+
+def test_missing_concepticon_catalog_is_explained(monkeypatch, caplog):
+    import cldfcatalog
+
+    def no_catalog():
+        raise KeyError("concepticon")
+
+    monkeypatch.setattr(cldfcatalog.Config, "from_file", no_catalog)
+    get_concepticon.cache_clear()
+    concepticon_stamp.cache_clear()
+    try:
+        with pytest.raises(SystemExit):
+            concepticon_stamp()
+    finally:
+        get_concepticon.cache_clear()
+        concepticon_stamp.cache_clear()
+    assert "Failed to read the Concepticon catalog" in caplog.text
+
+
+def test_gloss_index_matches_like_concept_map2():
+    from pyconcepticon.glosses import concept_map2
+
+    targets = [
+        ("1", "hand"),
+        ("2", "arm, hand"),
+        ("3", "hand (of body)"),
+        ("4", "the hand"),
+        ("5", "foot"),
+        ("6", "leg"),
+        ("7", "foot; leg"),
+        ("8", "hand; arm"),
+        ("9", "hand, hand"),
+    ]
+    glosses = ["hand, arm", "foot; leg", "leg, foot", "arm", "hand", "tree"]
+    expected = {
+        i: (list(mapping.to_keys), int(mapping.similarity))
+        if hasattr(mapping, "to_keys")
+        else (list(mapping[0]), int(mapping[1]))
+        for i, mapping in concept_map2(
+            glosses, [gloss for _, gloss in targets], similarity_level=2, language="en"
+        ).items()
+    }
+    assert GlossIndex(targets, "en").match(glosses, "en") == expected
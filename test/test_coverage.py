@@ -1,11 +1,20 @@
 import re
 import math
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 
 import pytest
 
-from lexedata.report.coverage import coverage_report, coverage_report_concepts
+from lexedata.report.coverage import (
+    Missing,
+    coverage_matrix,
+    coverage_overlap,
+    coverage_report,
+    coverage_report_concepts,
+    greedy_covered_subset,
+)
 from lexedata.util.fs import copy_dataset
 from lexedata import util
 
@@ -132,3 +141,64 @@ def test_coverage_report_with_primary_concepts():
     )
     data = coverage_report(ds, only_coded=False)
     assert data == [["l1", "l1", 2, 2.0 / 3.0, 1.0], ["l2", "l2", 3, 1.0, 1.0]]
+
+
+def test_coverage_matrix():
+    ds = util.fs.new_wordlist(
+        FormTable=[
+            {"ID": "f1", "Language_ID": "l1", "Parameter_ID": "c1", "Form": "form"},
+            {"ID": "f2", "Language_ID": "l1", "Parameter_ID": "c1", "Form": "-"},
+            {"ID": "f4", "Language_ID": "l2", "Parameter_ID": "c2", "Form": "form"},
+        ],
+        ParameterTable=[{"ID": "c1"}, {"ID": "c2"}, {"ID": "c3"}],
+    )
+    matrix = coverage_matrix(ds, only_coded=False)
+    assert matrix.languages == ["l1", "l2"]
+    assert matrix.concepts == ["c1", "c2", "c3"]
+    assert matrix.counts.tolist() == [[2, 0, 0], [0, 1, 0]]
+    matrix = coverage_matrix(ds, missing=Missing.IGNORE, only_coded=False)
+    assert matrix.counts.tolist() == [[1, 0, 0], [0, 1, 0]]
+
+
+def test_coverage_overlap(cldf_wordlist):
+    matrix = coverage_matrix(cldf_wordlist, only_coded=False)
+    attested = matrix.attested().astype(int)
+    assert (coverage_overlap(matrix) == attested @ attested.T).all()
+    languages = matrix.languages[::-1]
+    overlap = coverage_overlap(matrix, languages)
+    assert overlap[0, 0] == attested[matrix.language_index[languages[0]]].sum()
+
+
+def test_greedy_covered_subset():
+    ds = util.fs.new_wordlist(
+        FormTable=[
+            {"ID": "f1", "Language_ID": "l1", "Parameter_ID": "c1", "Form": "a"},
+            {"ID": "f2", "Language_ID": "l1", "Parameter_ID": "c2", "Form": "a"},
+            {"ID": "f3", "Language_ID": "l2", "Parameter_ID": "c1", "Form": "a"},
+            {"ID": "f4", "Language_ID": "l2", "Parameter_ID": "c2", "Form": "a"},
+            {"ID": "f5", "Language_ID": "l2", "Parameter_ID": "c3", "Form": "a"},
+            {"ID": "f6", "Language_ID": "l3", "Parameter_ID": "c3", "Form": "a"},
+        ],
+    )
+    matrix = coverage_matrix(ds, only_coded=False)
+    assert greedy_covered_subset(matrix) == [("l2", 3), ("l1", 2), ("l3", 0)]
+    assert greedy_covered_subset(matrix, min_overlap=2) == [("l2", 3), ("l1", 2)]
+
+
+def test_coverage_cli_overlap_with_concept_report(cldf_wordlist):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "lexedata.report.coverage",
+            "--metadata",
+            str(cldf_wordlist.tablegroup._fname),
+            "--overlap",
+            "--concept-report",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert output.returncode == 0, output.stderr
+    assert "Concept_ID" in output.stdout
+    assert "Concepts in all languages so far" in output.stdout
@@ -3,8 +3,11 @@ from pathlib import Path
 import unicodedata
 import re
 
+import pytest
+
 from helper_functions import copy_to_temp
 import lexedata.report.extended_cldf_validate as validate
+from lexedata.util.validation import table_groups
 
 
 def test_check_foreignkeys_correct():
@@ -136,3 +139,105 @@ def test_check_judgements_no_segslice_no_alignment(caplog):
         assert validate.check_cognate_table(dataset=dataset)
     assert re.search("CognateTable.*no.*segmentSlice", caplog.text)
     assert re.search("CognateTable.*no.*alignment", caplog.text)
+
+
+def test_checks_read_each_table_once(monkeypatch):
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    streamed = []
+    original = type(dataset["FormTable"]).iterdicts
+
+    def iterdicts(table, *args, **kwargs):
+        streamed.append(table.url.string)
+        return original(table, *args, **kwargs)
+
+    monkeypatch.setattr(type(dataset["FormTable"]), "iterdicts", iterdicts)
+    checks = [
+        validate.NoSeparatorInIdsCheck(dataset),
+        validate.UnicodeCheck(dataset),
+        validate.CognateTableCheck(dataset),
+        validate.NaFormCheck(dataset),
+    ]
+    assert validate.run_checks(dataset, checks)
+    assert sorted(streamed) == sorted(set(streamed))
+    assert streamed.index("forms.csv") < streamed.index("cognate.csv")
+
+
+def test_checks_in_parallel_log_like_serial(caplog):
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    forms = list(dataset["FormTable"])
+    forms[0]["Form"] = unicodedata.normalize("NFD", "À")
+    dataset.write(FormTable=forms)
+    judgements = list(dataset["CognateTable"])
+    judgements[1]["Segment_Slice"] = ["1:99"]
+    dataset.write(CognateTable=judgements)
+
+    def messages(jobs):
+        caplog.clear()
+        checks = [
+            validate.NoSeparatorInIdsCheck(dataset),
+            validate.UnicodeCheck(dataset),
+            validate.CognateTableCheck(dataset),
+            validate.NaFormCheck(dataset),
+        ]
+        assert not validate.run_checks(dataset, checks, jobs=jobs)
+        return caplog.messages
+
+    serial = messages(1)
+    assert len(serial) == 2
+    assert messages(2) == serial
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_checks_log_check_by_check(caplog, jobs):
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    forms = list(dataset["FormTable"])
+    forms[0]["Form"] = unicodedata.normalize("NFD", "À")
+    dataset.write(FormTable=forms)
+    judgements = list(dataset["CognateTable"])
+    judgements[1]["Segment_Slice"] = ["1:99"]
+    dataset.write(CognateTable=judgements)
+
+    caplog.clear()
+    assert not validate.check_cognate_table(dataset)
+    assert not validate.check_unicode_data(dataset)
+    separately = caplog.messages
+    assert len(separately) == 2
+
+    caplog.clear()
+    # The FormTable is streamed before the CognateTable, but the messages of
+    # the cognate check come first, like above.
+    checks = [validate.CognateTableCheck(dataset), validate.UnicodeCheck(dataset)]
+    assert not validate.run_checks(dataset, checks, jobs=jobs)
+    assert caplog.messages == separately
+
+
+def test_table_groups_keep_forms_with_judgements():
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    groups = table_groups(
+        dataset,
+        [validate.UnicodeCheck(dataset), validate.CognateTableCheck(dataset)],
+    )
+    urls = [[table.url.string for table in group] for group in groups]
+    assert ["forms.csv", "cognate.csv"] in urls
+    assert len([url for group in urls for url in group]) == len(
+        {url for group in urls for url in group}
+    )
+
+
+def test_unicode_check_skips_normalized_files():
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    assert validate.UnicodeCheck(dataset).tables == set()
+    forms = list(dataset["FormTable"])
+    forms[0]["Comment"] = unicodedata.normalize("NFD", "À")
+    dataset.write(FormTable=forms)
+    assert validate.UnicodeCheck(dataset, jobs=2).tables == {"forms.csv"}
@@ -1,3 +1,4 @@
+import io
 import re
 from pathlib import Path
 from copy import deepcopy
@@ -6,6 +7,7 @@ import logging
 import pytest
 
 from lexedata.edit import merge_homophones
+from lexedata.report.homophones import list_homophones
 from helper_functions import copy_to_temp
 
 
@@ -508,6 +510,24 @@ def test_merge_3():
     # to increase coverage
 
 
+def test_merge_incomplete_group_keeps_forms(caplog):
+    dataset, _ = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    c_f_id = dataset["FormTable", "id"].name
+    ids = [f[c_f_id] for f in dataset["FormTable"]]
+    merged = [
+        f[c_f_id]
+        for f in merge_homophones.merge_forms(
+            data=dataset,
+            mergers=merge_homophones.default_mergers,
+            homophone_groups={ids[1]: [ids[1], "not_a_form"]},
+        )
+    ]
+    assert merged == ids
+    assert "not found" in caplog.text
+
+
 def test_parse_merge_override():
     assert ("Source", merge_homophones.union) == merge_homophones.parse_merge_override(
         "Source:union"
@@ -533,3 +553,29 @@ def test_merge_report_parser():
     changes in whitespace.
 
     """
+
+
+def test_merge_near_homophones_from_report():
+    dataset, _ = copy_to_temp(
+        Path(__file__).parent / "data/cldf/minimal/cldf-metadata.json"
+    )
+    dataset.add_columns("ParameterTable", "concepticonReference")
+    dataset.write(
+        FormTable=[
+            {
+                "ID": form,
+                "Language_ID": "L1",
+                "Concept_ID": concept,
+                "Form": form,
+                "Value": form,
+            }
+            for form, concept in [("ab", "C1"), ("ba", "C2"), ("mu", "C3")]
+        ],
+        ParameterTable=[
+            {"ID": c, "Name": c, "Concepticon_ID": None} for c in ["C1", "C2", "C3"]
+        ],
+    )
+    report = io.StringIO()
+    list_homophones(dataset, report, max_distance=0.5)
+    report.seek(0)
+    assert merge_homophones.parse_homophones_report(report) == {"ab": ["ab", "ba"]}
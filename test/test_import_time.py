@@ -0,0 +1,60 @@
+"""Guard the start-up time of the command line tools.
+
+Every command line tool imports `lexedata.util`, and many tools only need
+CLTS, Concepticon, LingPy or networkx for some of their functionality. These
+must be loaded on first use, not on import.
+
+"""
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = {
+    "cldfbench",
+    "lingpy",
+    "networkx",
+    "pkg_resources",
+    "pyconcepticon",
+    "unidecode",
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(" ".join(sys.modules))
+"""
+
+
+def import_in_subprocess(module: str):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.splitlines()
+    return float(output[0]), {m.split(".")[0] for m in output[1].split()}
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "lexedata.util",
+        "lexedata.report.filter",
+        "lexedata.edit.add_segments",
+        "lexedata.edit.add_concepticon",
+        "lexedata.report.segment_inventories",
+    ],
+)
+def test_import_does_not_load_heavy_dependencies(module):
+    _, loaded = import_in_subprocess(module)
+    assert not loaded & HEAVY_MODULES
+
+
+def test_filter_starts_quickly():
+    # Typically about a third of a second, mostly spent importing pycldf. The
+    # bound is generous, to not fail on slow machines.
+    seconds, _ = import_in_subprocess("lexedata.report.filter")
+    assert seconds < 1.5
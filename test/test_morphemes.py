@@ -1,4 +1,12 @@
-from lexedata.report.nonconcatenative_morphemes import cluster_overlaps
+import logging
+
+from lexedata.report.nonconcatenative_morphemes import (
+    cluster_overlaps,
+    morpheme_intervals,
+    network_of_overlaps,
+)
+from lexedata.util.fs import new_wordlist
+from lexedata import types
 from io import StringIO
 
 
@@ -16,3 +24,61 @@ def test_cluster():
         root2
     """.strip().split()
     )
+
+
+def test_overlapping_morphemes(caplog):
+    ds = new_wordlist(
+        FormTable=[
+            {
+                "ID": "f1",
+                "Parameter_ID": "c1",
+                "Language_ID": "l1",
+                "Form": "tesat",
+                "Segments": list("tesat"),
+            },
+            {
+                "ID": "f2",
+                "Parameter_ID": "c1",
+                "Language_ID": "l1",
+                "Form": "-",
+                "Segments": [],
+            },
+        ],
+        CognateTable=[
+            {
+                "ID": "j1",
+                "Form_ID": "f1",
+                "Cognateset_ID": "s1",
+                "Segment_Slice": ["1:3"],
+            },
+            {
+                "ID": "j2",
+                "Form_ID": "f1",
+                "Cognateset_ID": "s2",
+                "Segment_Slice": ["3:4"],
+            },
+            {
+                "ID": "j3",
+                "Form_ID": "f1",
+                "Cognateset_ID": "s3",
+                "Segment_Slice": ["1", "4:6"],
+            },
+            {"ID": "j4", "Form_ID": "f2", "Cognateset_ID": "s1", "Segment_Slice": "1"},
+        ],
+    )
+    with caplog.at_level(logging.INFO):
+        intervals = morpheme_intervals(ds, types.WorldSet())
+        assert list(intervals) == ["f1"]
+        assert intervals["f1"].segment_sets() == [
+            {"s1", "s3"},
+            {"s1"},
+            {"s1", "s2"},
+            {"s2", "s3"},
+            {"s3"},
+        ]
+        assert network_of_overlaps(intervals) == {("s1", "s2"), ("s2", "s3")}
+    assert (
+        "segment 4 follows segment 1, so the morpheme is non-contiguous" in caplog.text
+    )
+    assert "points outside valid range 1:5" in caplog.text
+    assert "segments 3:3 are in both cognate sets s1 and s2" in caplog.text
@@ -0,0 +1,62 @@
+import logging
+
+import csvw
+from pathlib import Path
+
+from helper_functions import copy_to_temp
+from lexedata.report.references import check_references, find_missing_references
+from lexedata.util.fs import read_column_chunks
+
+
+def test_all_references_resolve():
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    assert find_missing_references(dataset) == []
+    assert check_references(dataset)
+
+
+def test_missing_references_are_counted(caplog):
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    forms = list(dataset["FormTable"])
+    forms[0]["Parameter_ID"] = ["one", "unknown"]
+    forms[1]["Parameter_ID"] = ["unknown"]
+    dataset.write(FormTable=forms)
+    judgements = list(dataset["CognateTable"])
+    judgements[0]["Form_ID"] = "no_such_form"
+    dataset.write(CognateTable=judgements)
+
+    missing = {(m.table, m.column): m.values for m in find_missing_references(dataset)}
+    assert missing == {
+        ("forms.csv", "Parameter_ID"): {"unknown": 2},
+        ("cognate.csv", "Form_ID"): {"no_such_form": 1},
+    }
+
+    with caplog.at_level(logging.WARNING):
+        assert not check_references(dataset)
+    assert (
+        "In table forms.csv, column Parameter_ID: 2 references (1 distinct values) to concepts.csv, column ID are missing"
+        in caplog.text
+    )
+
+
+def test_read_column_chunks_follows_the_dialect():
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    table = dataset["ParameterTable"]
+    table.dialect = csvw.Dialect(commentPrefix="#")
+    path = table.url.resolve(dataset.directory)
+    header, *rows = path.read_text(encoding="utf-8").splitlines()
+    path.write_text(
+        "\n".join([header, "# a comment", rows[0], "", "short"] + rows[1:]) + "\n",
+        encoding="utf-8",
+    )
+    chunks = list(read_column_chunks(dataset, table, ["ID", "Name", "Nothing"], 2))
+    assert [len(chunk["ID"]) for chunk in chunks] == [1, 2, 2, 2, 2, 2]
+    ids = [i for chunk in chunks for i in chunk["ID"]]
+    assert ids == [rows[0].split(",")[0], "short"] + [r.split(",")[0] for r in rows[1:]]
+    assert [n for chunk in chunks for n in chunk["Name"]][1] == ""
+    assert {n for chunk in chunks for n in chunk["Nothing"]} == {""}
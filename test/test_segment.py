@@ -5,8 +5,9 @@ from lexedata.edit.add_segments import (
     segment_form,
     SegmentReport,
     add_segments_to_dataset,
+    fingerprints_file,
 )
-from lexedata.report.segment_inventories import count_segments
+from lexedata.report.segment_inventories import count_segments, iter_segment_counts
 
 from lexedata import util
 from test_excel_conversion import copy_to_temp
@@ -31,6 +32,18 @@ def test_prenasal_before_vowel(caplog):
     assert report("language") == expected_report
 
 
+def test_cached_segmentation_reports_every_time(caplog):
+    form = "-eᵐa"
+    report = SegmentReport()
+    first = segment_form(form, report, context_for_warnings="First: ")
+    second = segment_form(form, report, context_for_warnings="Second: ")
+    assert [str(s) for s in first] == [str(s) for s in second]
+    assert first is not second
+    assert re.search("First: Unknown sound .* encountered in -eᵐa", caplog.text)
+    assert re.search("Second: Unknown sound .* encountered in -eᵐa", caplog.text)
+    assert report("language") == [("language", "eᵐ", 2, "unknown pre-nasalization")]
+
+
 def test_segment_report():
     report1 = SegmentReport()
     report1.sounds["aʰ"].count = 1
@@ -90,6 +103,74 @@ def test_add_segments_to_dataset():
     # ]
 
 
+def test_add_segments_to_dataset_in_parallel(caplog):
+    results = []
+    for jobs in [1, 2]:
+        dataset, target = copy_to_temp(
+            Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+        )
+        caplog.clear()
+        report = add_segments_to_dataset(
+            dataset=dataset,
+            transcription=dataset.column_names.forms.form,
+            overwrite_existing=True,
+            replace_form=False,
+            logger=logger,
+            jobs=jobs,
+        )
+        results.append(
+            (
+                (target.parent / "forms.csv").read_text(encoding="utf-8"),
+                [r.message for r in caplog.records if r.levelname == "WARNING"],
+                {language: r(language) for language, r in report.items()},
+            )
+        )
+    assert results[0] == results[1]
+
+
+def test_add_segments_incrementally():
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    c_form = dataset.column_names.forms.form
+    add_segments_to_dataset(dataset, c_form, True, False, logger=logger)
+    assert not fingerprints_file(dataset).exists()
+    add_segments_to_dataset(
+        dataset, c_form, True, False, logger=logger, incremental=True
+    )
+    assert fingerprints_file(dataset).parent == target.parent
+    c_segments = dataset.column_names.forms.segments
+    forms = list(dataset["FormTable"])
+    forms[0][c_form] = "tatata"
+    forms[1][c_segments] = ["m", "a", "n", "u", "a", "l"]
+    dataset.write(FormTable=forms)
+    add_segments_to_dataset(
+        dataset, c_form, False, False, logger=logger, incremental=True
+    )
+    forms = list(dataset["FormTable"])
+    assert [str(s) for s in forms[0][c_segments]] == ["t", "a", "t", "a", "t", "a"]
+    assert forms[1][c_segments] == ["m", "a", "n", "u", "a", "l"]
+
+
+def test_add_segments_incrementally_without_fingerprints():
+    dataset, target = copy_to_temp(
+        Path(__file__).parent / "data/cldf/smallmawetiguarani/cldf-metadata.json"
+    )
+    c_form = dataset.column_names.forms.form
+    add_segments_to_dataset(dataset, c_form, True, False, logger=logger)
+    c_segments = dataset.column_names.forms.segments
+    forms = list(dataset["FormTable"])
+    forms[0][c_segments] = ["s", "t", "a", "l", "e"]
+    dataset.write(FormTable=forms)
+    # Without fingerprints, the stale segments cannot be told apart from
+    # current ones, so they are all re-segmented.
+    add_segments_to_dataset(
+        dataset, c_form, False, False, logger=logger, incremental=True
+    )
+    forms = list(dataset["FormTable"])
+    assert forms[0][c_segments] != ["s", "t", "a", "l", "e"]
+
+
 def test_segment_inventory_report(caplog):
     ds = util.fs.new_wordlist(
         FormTable=[
@@ -125,3 +206,43 @@ def test_segment_inventory_report(caplog):
             "x": 1,
         }
     }
+
+
+def test_segment_inventory_streams_languages_in_chunks():
+    ds = util.fs.new_wordlist(
+        FormTable=[
+            {
+                "ID": f"f{i}",
+                "Language_ID": language,
+                "Parameter_ID": "c1",
+                "Form": "ta",
+                "Segments": ["t", "a"],
+            }
+            for i, language in enumerate(["l1", "l2", "l1", "l3", "l3"])
+        ],
+    )
+    counts = list(iter_segment_counts(ds, {"l1", "l3"}, jobs=2, chunksize=2))
+    assert counts == [("l1", {"t": 2, "a": 2}), ("l3", {"t": 2, "a": 2})]
+    assert count_segments(ds, {"l1", "l2", "l3"}, jobs=2) == dict(
+        iter_segment_counts(ds, {"l1", "l2", "l3"}, chunksize=1)
+    )
+
+
+def test_segment_inventory_of_zipped_form_table():
+    forms = [
+        {
+            "ID": f"f{i}",
+            "Language_ID": language,
+            "Parameter_ID": "c1",
+            "Form": "ta",
+            "Segments": ["t", "a"],
+        }
+        for i, language in enumerate(["l1", "l2", "l1"])
+    ]
+    ds = util.fs.new_wordlist(FormTable=forms)
+    ds.write(FormTable=forms, zipped=["FormTable"])
+    assert not (ds.directory / "forms.csv").exists()
+    assert count_segments(ds, {"l1", "l2"}) == {
+        "l1": {"t": 2, "a": 2},
+        "l2": {"t": 1, "a": 1},
+    }
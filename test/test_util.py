@@ -21,3 +21,24 @@ def test_normal_table_names(wordlist, caplog):
     with caplog.at_level(logging.WARNING):
         assert normalize_table_name("NonExistingTable", wordlist) is None
     assert "Could not find table NonExistingTable" in caplog.text
+
+
+def test_normalize_files_rewrites_only_changed_files(tmp_path):
+    import unicodedata
+
+    from lexedata.util.normalization import normalize_files, unnormalized_files
+
+    text = "ID,Form\nf1,ab\nf2,{}\n"
+    normal = tmp_path / "normal.csv"
+    normal.write_text(text.format("à"), encoding="utf-8")
+    decomposed = tmp_path / "decomposed.csv"
+    decomposed.write_text(
+        text.format(unicodedata.normalize("NFD", "à")), encoding="utf-8"
+    )
+    before = normal.stat().st_mtime_ns, normal.stat().st_ino
+
+    assert unnormalized_files([normal, decomposed]) == [decomposed]
+    assert normalize_files([normal, decomposed], jobs=2) == [decomposed]
+    assert decomposed.read_text(encoding="utf-8") == text.format("à")
+    assert (normal.stat().st_mtime_ns, normal.stat().st_ino) == before
+    assert unnormalized_files([normal, decomposed]) == []